@@ -4,6 +4,10 @@ Audit the timeline of regime assignments to verify correctness
 import pandas as pd
 import numpy as np
 from pathlib import Path
+import sys
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from core.lookback_tensor import relative_momentum_frame
 
 base = Path(__file__).parent.parent
 
@@ -24,7 +28,7 @@ df['Return_mom'] = df['Close_mom'].pct_change()
 df['Return_val'] = df['Close_val'].pct_change()
 df['Quarter'] = df['Date'].dt.to_period('Q')
 
-df['RelMom_6M'] = df['Close_mom'].pct_change(6) - df['Close_val'].pct_change(6)
+df['RelMom_6M'] = relative_momentum_frame(df)['RelMom_6M']
 
 quarterly = df.groupby('Quarter').last()
 quarterly['regime'] = np.where(quarterly['RelMom_6M'] > 0, 'momentum', 'value')
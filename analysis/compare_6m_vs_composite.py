@@ -5,23 +5,13 @@ Quarterly 75/25 allocation
 import pandas as pd
 import numpy as np
 from pathlib import Path
-from scipy.optimize import newton
+import sys
 import warnings
 warnings.filterwarnings('ignore')
 
-def calculate_xirr(cash_flows, guess=0.1):
-    cash_flows = sorted(cash_flows, key=lambda x: x[0])
-    start_date = cash_flows[0][0]
-    amounts = [cf[1] for cf in cash_flows]
-    days = [(cf[0] - start_date).days for cf in cash_flows]
-    def xnpv(rate):
-        return sum([a / (1 + rate) ** (d / 365.0) for a, d in zip(amounts, days)])
-    def xnpv_deriv(rate):
-        return sum([-a * d / 365.0 / (1 + rate) ** (d / 365.0 + 1) for a, d in zip(amounts, days)])
-    try:
-        return newton(xnpv, guess, fprime=xnpv_deriv, maxiter=100) * 100
-    except:
-        return 0.0
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from core.lookback_tensor import composite, relative_momentum_frame
+from core.xirr import calculate_xirr
 
 def run_quarterly_strategy(mom_file, val_file, w6m=1.0, w3m=0.0, sip=10000):
     mom_df = pd.read_csv(mom_file)
@@ -37,12 +27,13 @@ def run_quarterly_strategy(mom_file, val_file, w6m=1.0, w3m=0.0, sip=10000):
     df['Return_val'] = df['Close_val'].pct_change()
     df['Quarter'] = df['Date'].dt.to_period('Q')
     
-    # Compute signals
-    df['RelMom_6M'] = df['Close_mom'].pct_change(6) - df['Close_val'].pct_change(6)
-    df['RelMom_3M'] = df['Close_mom'].pct_change(3) - df['Close_val'].pct_change(3)
+    # Compute signals (all lookbacks from one return tensor)
+    rel = relative_momentum_frame(df)
+    df['RelMom_6M'] = rel['RelMom_6M']
+    df['RelMom_3M'] = rel['RelMom_3M']
     
     # Composite with custom weights
-    df['RelMom_Signal'] = w6m * df['RelMom_6M'] + w3m * df['RelMom_3M']
+    df['RelMom_Signal'] = composite(rel, {6: w6m, 3: w3m})
     
     # Quarterly decision
     quarterly = df.groupby('Quarter').last()
@@ -5,23 +5,13 @@ Both Nifty 200 and Nifty 500
 import pandas as pd
 import numpy as np
 from pathlib import Path
-from scipy.optimize import newton
+import sys
 import warnings
 warnings.filterwarnings('ignore')
 
-def calculate_xirr(cash_flows, guess=0.1):
-    cash_flows = sorted(cash_flows, key=lambda x: x[0])
-    start_date = cash_flows[0][0]
-    amounts = [cf[1] for cf in cash_flows]
-    days = [(cf[0] - start_date).days for cf in cash_flows]
-    def xnpv(rate):
-        return sum([a / (1 + rate) ** (d / 365.0) for a, d in zip(amounts, days)])
-    def xnpv_deriv(rate):
-        return sum([-a * d / 365.0 / (1 + rate) ** (d / 365.0 + 1) for a, d in zip(amounts, days)])
-    try:
-        return newton(xnpv, guess, fprime=xnpv_deriv, maxiter=100) * 100
-    except:
-        return 0.0
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from core.lookback_tensor import composite, relative_momentum_frame
+from core.xirr import calculate_xirr
 
 def run_strategy(mom_file, val_file, signal_type='6M', sip=10000):
     mom_df = pd.read_csv(mom_file)
@@ -36,17 +26,13 @@ def run_strategy(mom_file, val_file, signal_type='6M', sip=10000):
     df['Return_mom'] = df['Close_mom'].pct_change()
     df['Return_val'] = df['Close_val'].pct_change()
     
-    # Compute signals
-    df['RelMom_3M'] = df['Close_mom'].pct_change(3) - df['Close_val'].pct_change(3)
-    df['RelMom_6M'] = df['Close_mom'].pct_change(6) - df['Close_val'].pct_change(6)
-    df['RelMom_9M'] = df['Close_mom'].pct_change(9) - df['Close_val'].pct_change(9)
+    # Compute signals (all lookbacks from one return tensor)
+    rel = relative_momentum_frame(df)
+    for col in ['RelMom_3M', 'RelMom_6M', 'RelMom_9M']:
+        df[col] = rel[col]
     
     # Composite: 50% 6M + 25% 9M + 25% 3M
-    df['RelMom_Composite'] = (
-        0.50 * df['RelMom_6M'] +
-        0.25 * df['RelMom_9M'] +
-        0.25 * df['RelMom_3M']
-    )
+    df['RelMom_Composite'] = composite(rel, {6: 0.50, 9: 0.25, 3: 0.25})
     
     if signal_type == '6M':
         signal_col = 'RelMom_6M'
@@ -6,25 +6,14 @@ Both Nifty 200 and Nifty 500
 import pandas as pd
 import numpy as np
 from pathlib import Path
+import sys
 import warnings
 warnings.filterwarnings('ignore')
 
-def calculate_xirr(cash_flows, guess=0.1):
-    from scipy.optimize import newton
-    cash_flows = sorted(cash_flows, key=lambda x: x[0])
-    start_date = cash_flows[0][0]
-    amounts = [cf[1] for cf in cash_flows]
-    days = [(cf[0] - start_date).days for cf in cash_flows]
-    
-    def xnpv(rate):
-        return sum([a / (1 + rate) ** (d / 365.0) for a, d in zip(amounts, days)])
-    def xnpv_deriv(rate):
-        return sum([-a * d / 365.0 / (1 + rate) ** (d / 365.0 + 1) for a, d in zip(amounts, days)])
-    
-    try:
-        return newton(xnpv, guess, fprime=xnpv_deriv, maxiter=100) * 100
-    except:
-        return 0.0
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from core.lookback_tensor import relative_momentum_frame
+from core.xirr import calculate_xirr
+from core.sweep_store import SweepStore, code_version, data_hash
 
 def run_quarterly_rotation(mom_file, val_file, lookback_months, sip=10000):
     """Run quarterly alpha rotation with specified lookback"""
@@ -43,7 +32,7 @@ def run_quarterly_rotation(mom_file, val_file, lookback_months, sip=10000):
     df['Quarter'] = df['Date'].dt.to_period('Q')
     
     # Relative momentum with specified lookback
-    df['RelMom'] = df['Close_mom'].pct_change(lookback_months) - df['Close_val'].pct_change(lookback_months)
+    df['RelMom'] = relative_momentum_frame(df, lookbacks=[lookback_months]).iloc[:, 0]
     
     # Quarter-end decisions
     quarterly = df.groupby('Quarter').last()
@@ -108,17 +97,21 @@ def main():
     configs = [
         {
             'name': 'NIFTY 200',
+            'universe': 'nifty200',
             'mom_file': base / 'nifty200' / 'output' / 'monthly' / 'nifty200_momentum_30_monthly.csv',
             'val_file': base / 'nifty200' / 'output' / 'monthly' / 'nifty200_value_30_monthly.csv',
         },
         {
             'name': 'NIFTY 500',
+            'universe': 'nifty500',
             'mom_file': base / 'nifty500' / 'output' / 'monthly' / 'nifty500_momentum_50_monthly.csv',
             'val_file': base / 'nifty500' / 'output' / 'monthly' / 'nifty500_value_50_monthly.csv',
         },
     ]
     
     lookbacks = [3, 6]
+    store = SweepStore()
+    code = code_version(Path(__file__), base / 'core' / 'xirr.py')
     
     for config in configs:
         print(f"\n{'='*80}")
@@ -127,9 +120,13 @@ def main():
         print(f"\n{'Metric':<22s}  {'3M Lookback':>14s}  {'6M Lookback':>14s}  {'Delta':>10s}")
         print("-" * 65)
         
-        results = {}
-        for lb in lookbacks:
-            results[lb] = run_quarterly_rotation(config['mom_file'], config['val_file'], lb)
+        # Configs already in the store (same data + code) are not re-run
+        grid = [{'lookback_months': lb} for lb in lookbacks]
+        swept, computed = store.sweep(
+            'quarterly_rotation', config['universe'], grid,
+            lambda lookback_months: run_quarterly_rotation(config['mom_file'], config['val_file'], lookback_months),
+            data_hash(config['mom_file'], config['val_file']), code)
+        results = dict(zip(lookbacks, swept))
         
         r3 = results[3]
         r6 = results[6]
@@ -148,6 +145,9 @@ def main():
         
         for label, v3, v6, delta in rows:
             print(f"{label:<22s}  {v3:>14s}  {v6:>14s}  {delta:>10s}")
+        print(f"\n💾 {computed} computed, {len(grid) - computed} from the sweep store")
+    
+    store.close()
 
 if __name__ == "__main__":
     main()
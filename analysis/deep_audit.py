@@ -5,23 +5,13 @@ Nifty 500 strategy vs pure momentum, pure value, 50/50 blend
 import pandas as pd
 import numpy as np
 from pathlib import Path
-from scipy.optimize import newton
+import sys
 import warnings
 warnings.filterwarnings('ignore')
 
-def calculate_xirr(cash_flows, guess=0.1):
-    cash_flows = sorted(cash_flows, key=lambda x: x[0])
-    start_date = cash_flows[0][0]
-    amounts = [cf[1] for cf in cash_flows]
-    days = [(cf[0] - start_date).days for cf in cash_flows]
-    def xnpv(rate):
-        return sum([a / (1 + rate) ** (d / 365.0) for a, d in zip(amounts, days)])
-    def xnpv_deriv(rate):
-        return sum([-a * d / 365.0 / (1 + rate) ** (d / 365.0 + 1) for a, d in zip(amounts, days)])
-    try:
-        return newton(xnpv, guess, fprime=xnpv_deriv, maxiter=100) * 100
-    except:
-        return 0.0
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from core.lookback_tensor import relative_momentum_frame
+from core.xirr import calculate_xirr
 
 base = Path(__file__).parent.parent
 
@@ -47,7 +37,7 @@ for universe, mom_file, val_file in [
     df['Return_5050'] = 0.5 * df['Return_mom'] + 0.5 * df['Return_val']
     
     # Strategy
-    df['RelMom_6M'] = df['Close_mom'].pct_change(6) - df['Close_val'].pct_change(6)
+    df['RelMom_6M'] = relative_momentum_frame(df)['RelMom_6M']
     df['regime'] = np.where(df['RelMom_6M'] > 0, 'momentum', 'value')
     df['regime'] = df['regime'].shift(1).fillna('value')
     df['w_mom'] = np.where(df['regime'] == 'momentum', 1.0, 0.0)
@@ -6,19 +6,21 @@ import pandas as pd
 import numpy as np
 from pathlib import Path
 import sys
+sys.path.insert(0, str(Path(__file__).parent.parent))
 sys.path.insert(0, str(Path(__file__).parent.parent / 'nifty200' / 'analysis'))
 from nifty200_portfolio_strategy import PortfolioStrategy
+from core.sweep_store import SweepStore, code_version, data_hash
+
+def portfolio_file(universe):
+    if universe == 'nifty200':
+        return Path(__file__).parent.parent / 'nifty200' / 'output' / 'monthly' / 'portfolio_ratio_trend_75_25.csv'
+    return Path(__file__).parent.parent / 'nifty500' / 'output' / 'monthly' / 'nifty500_portfolio_ratio_trend_75_25.csv'
 
 def test_ma_parameters(exit_ma, entry_ma, universe='nifty200'):
     """Test a specific MA parameter combination"""
     
-    if universe == 'nifty200':
-        data_file = Path(__file__).parent.parent / 'nifty200' / 'output' / 'monthly' / 'portfolio_ratio_trend_75_25.csv'
-    else:
-        data_file = Path(__file__).parent.parent / 'nifty500' / 'output' / 'monthly' / 'nifty500_portfolio_ratio_trend_75_25.csv'
-    
     # Load data
-    df = pd.read_csv(data_file)
+    df = pd.read_csv(portfolio_file(universe))
     df['Date'] = pd.to_datetime(df['Date'])
     df = df.sort_values('Date').reset_index(drop=True)
     
@@ -111,20 +113,25 @@ def main():
         (6, 4),    # Very responsive
     ]
     
-    results_200 = []
-    results_500 = []
-    
-    print("\n🔍 Testing Nifty 200...")
-    for exit_ma, entry_ma in params_to_test:
-        result = test_ma_parameters(exit_ma, entry_ma, 'nifty200')
-        results_200.append(result)
-        print(f"  {exit_ma}/{entry_ma}: CAGR={result['cagr']:.2f}% | DD={result['max_dd']:.2f}% | MAR={result['mar_ratio']:.2f} | 2012={result['ret_2012']:.1f}%")
-    
-    print("\n🔍 Testing Nifty 500...")
-    for exit_ma, entry_ma in params_to_test:
-        result = test_ma_parameters(exit_ma, entry_ma, 'nifty500')
-        results_500.append(result)
-        print(f"  {exit_ma}/{entry_ma}: CAGR={result['cagr']:.2f}% | DD={result['max_dd']:.2f}% | MAR={result['mar_ratio']:.2f} | 2012={result['ret_2012']:.1f}%")
+    # Results are kept in the sweep store; configs already run on the same
+    # data and code are read back instead of recomputed
+    grid = [{'exit_ma': exit_ma, 'entry_ma': entry_ma} for exit_ma, entry_ma in params_to_test]
+    code = code_version(Path(__file__))
+    results = {}
+    
+    with SweepStore() as store:
+        for universe, label in (('nifty200', 'Nifty 200'), ('nifty500', 'Nifty 500')):
+            print(f"\n🔍 Testing {label}...")
+            results[universe], computed = store.sweep(
+                'portfolio_ma_filter', universe, grid,
+                lambda exit_ma, entry_ma: test_ma_parameters(exit_ma, entry_ma, universe),
+                data_hash(portfolio_file(universe)), code)
+            for result in results[universe]:
+                print(f"  {result['exit_ma']}/{result['entry_ma']}: CAGR={result['cagr']:.2f}% | DD={result['max_dd']:.2f}% | MAR={result['mar_ratio']:.2f} | 2012={result['ret_2012']:.1f}%")
+            print(f"  💾 {computed} computed, {len(grid) - computed} from the sweep store")
+    
+    results_200 = results['nifty200']
+    results_500 = results['nifty500']
     
     # Create comparison table
     print("\n" + "="*80)
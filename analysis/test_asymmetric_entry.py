@@ -6,23 +6,13 @@ Entry: 6M MA (aggressive)
 import pandas as pd
 import numpy as np
 from pathlib import Path
-from scipy.optimize import newton
+import sys
 import warnings
 warnings.filterwarnings('ignore')
 
-def calculate_xirr(cash_flows, guess=0.1):
-    cash_flows = sorted(cash_flows, key=lambda x: x[0])
-    start_date = cash_flows[0][0]
-    amounts = [cf[1] for cf in cash_flows]
-    days = [(cf[0] - start_date).days for cf in cash_flows]
-    def xnpv(rate):
-        return sum([a / (1 + rate) ** (d / 365.0) for a, d in zip(amounts, days)])
-    def xnpv_deriv(rate):
-        return sum([-a * d / 365.0 / (1 + rate) ** (d / 365.0 + 1) for a, d in zip(amounts, days)])
-    try:
-        return newton(xnpv, guess, fprime=xnpv_deriv, maxiter=100) * 100
-    except:
-        return 0.0
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from core.lookback_tensor import composite, relative_momentum_frame
+from core.xirr import calculate_xirr
 
 def run_strategy(mom_file, val_file, exit_ma=10, entry_ma=10, sip=10000):
     mom_df = pd.read_csv(mom_file)
@@ -39,9 +29,10 @@ def run_strategy(mom_file, val_file, exit_ma=10, entry_ma=10, sip=10000):
     df['Quarter'] = df['Date'].dt.to_period('Q')
     
     # Signals
-    df['RelMom_6M'] = df['Close_mom'].pct_change(6) - df['Close_val'].pct_change(6)
-    df['RelMom_3M'] = df['Close_mom'].pct_change(3) - df['Close_val'].pct_change(3)
-    df['RelMom_Signal'] = 0.7 * df['RelMom_6M'] + 0.3 * df['RelMom_3M']
+    rel = relative_momentum_frame(df)
+    df['RelMom_6M'] = rel['RelMom_6M']
+    df['RelMom_3M'] = rel['RelMom_3M']
+    df['RelMom_Signal'] = composite(rel, {6: 0.7, 3: 0.3})
     
     # Quarterly decision
     quarterly = df.groupby('Quarter').last()
@@ -0,0 +1,127 @@
+"""
+Benchmark Datasets
+Bundled data plus synthetic momentum/value pairs scaled to 10×, 100×, 1000×
+
+A scale of S means S times the bundled data volume. Histories are stretched
+up to MAX_HISTORY times (≈210 years of trading days, which still fits in
+pandas' datetime64[ns] range) and the remainder of the scale comes from more
+index pairs:
+
+    scale    history    index pairs
+        1    bundled    1
+       10        10×    1
+      100        10×    10
+     1000        10×    100
+
+Synthetic pairs come from one of two sources, both seeded:
+  bootstrap  block bootstrap of the bundled daily momentum/value returns
+             (same blocks for both legs, so their correlation is preserved)
+  regime     the regime-switching generator in core/synthetic_data.py
+and are written as NSE-format yearly CSV shards to a cache directory so CSV
+consolidation reads exactly what the loaders expect.
+"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+BASE_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(BASE_DIR))
+sys.path.insert(0, str(BASE_DIR / "nifty500" / "analysis"))
+
+from core.synthetic_data import generate_closes, write_nse_shards
+from nifty500_sip_returns import SIPAnalyzer
+
+DATA_DIR = BASE_DIR / "data"
+CACHE_DIR = Path(__file__).parent / ".cache"
+
+BASE_PAIR = ('nifty500mom50', 'nifty500val50')
+MAX_HISTORY = 10
+BLOCK_DAYS = 21
+SOURCES = ('bootstrap', 'regime')
+
+
+def scale_shape(scale):
+    """(history multiplier, number of index pairs) for a scale factor"""
+    history = min(scale, MAX_HISTORY)
+    return history, max(1, scale // history)
+
+
+def load_bundled_pair():
+    """Daily closes of the bundled NIFTY500 momentum / value indices, aligned"""
+    analyzer = SIPAnalyzer(DATA_DIR)
+    mom = analyzer.read_and_consolidate_index_data(BASE_PAIR[0])[['Date', 'Close']]
+    val = analyzer.read_and_consolidate_index_data(BASE_PAIR[1])[['Date', 'Close']]
+    return pd.merge(mom, val, on='Date', suffixes=('_mom', '_val')).reset_index(drop=True)
+
+
+def bootstrap_pair(base, history, seed):
+    """Daily (Date, Close_mom, Close_val) history× as long as base"""
+    rng = np.random.default_rng(seed)
+    log_returns = np.diff(np.log(base[['Close_mom', 'Close_val']].to_numpy()), axis=0)
+
+    n_days = len(base) * history
+    n_blocks = -(-n_days // BLOCK_DAYS)
+    starts = rng.integers(0, len(log_returns) - BLOCK_DAYS, n_blocks)
+    rows = (starts[:, None] + np.arange(BLOCK_DAYS)).ravel()[:n_days - 1]
+
+    closes = np.vstack([
+        base[['Close_mom', 'Close_val']].to_numpy()[:1],
+        base[['Close_mom', 'Close_val']].to_numpy()[0] * np.exp(np.cumsum(log_returns[rows], axis=0)),
+    ])
+    dates = pd.bdate_range(base['Date'].iloc[0], periods=n_days)
+    return pd.DataFrame({'Date': dates, 'Close_mom': closes[:, 0].round(2), 'Close_val': closes[:, 1].round(2)})
+
+
+def regime_pairs(base, history, n_pairs, seed):
+    """Pairs from the regime-switching generator, spanning history× the bundled years"""
+    first, last = base['Date'].iloc[0].year, base['Date'].iloc[-1].year
+    dates, series, _ = generate_closes(2 * n_pairs, (last - first + 1) * history,
+                                       start_year=first, seed=seed)
+    closes = [c for _, c in series.values()]
+    return [pd.DataFrame({'Date': dates, 'Close_mom': closes[2 * i].round(2),
+                          'Close_val': closes[2 * i + 1].round(2)})
+            for i in range(n_pairs)]
+
+
+def daily_pairs(scale, seed=42, source='bootstrap'):
+    """List of daily momentum/value pair frames for a scale"""
+    if source not in SOURCES:
+        raise ValueError(f"source must be one of {SOURCES}, got {source!r}")
+    base = load_bundled_pair()
+    if scale == 1:
+        return [base]
+    history, n_pairs = scale_shape(scale)
+    if source == 'regime':
+        return regime_pairs(base, history, n_pairs, seed)
+    return [bootstrap_pair(base, history, seed + i) for i in range(n_pairs)]
+
+
+def monthly_pair(daily):
+    """Month-end closes (Date, Close_mom, Close_val) like the monthly CSVs"""
+    monthly = daily.groupby(daily['Date'].dt.to_period('M')).last()
+    return monthly.reset_index(drop=True)
+
+
+# ============================================================================
+# NSE-FORMAT SHARDS
+# ============================================================================
+
+def csv_folders(scale, seed=42, source='bootstrap', pairs=None):
+    """(data folder, [index folder names]) holding the scale's CSV shards"""
+    if scale == 1:
+        return DATA_DIR, list(BASE_PAIR)
+
+    root = CACHE_DIR / f"{source}_scale_{scale}_seed_{seed}"
+    history, n_pairs = scale_shape(scale)
+    folders = [f"bench{kind}{i:04d}" for i in range(n_pairs) for kind in ('mom', 'val')]
+    marker = root / ".complete"
+    if not marker.exists():
+        for i, daily in enumerate(pairs or daily_pairs(scale, seed, source)):
+            for kind in ('mom', 'val'):
+                name = f"bench{kind}{i:04d}"
+                write_nse_shards(root / name, name.upper(), daily['Date'], daily[f'Close_{kind}'])
+        marker.touch()
+    return root, folders
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Startup Import-Time Benchmark
+Measures how long each pipeline entry module takes to import
+
+Each module is imported in a fresh interpreter with `python -X importtime`;
+the per-module timings are summarized into the total, the slowest top-level
+packages and a check that heavy optional libraries (plotly, scipy) are not
+pulled in at import time.
+
+Usage:
+    python3 benchmarks/import_time.py
+    python3 benchmarks/import_time.py --repeat 5 --budget-ms 600
+"""
+
+import argparse
+import subprocess
+import sys
+from pathlib import Path
+
+BASE_DIR = Path(__file__).parent.parent
+
+# (module, directory that has to be on sys.path)
+ENTRY_MODULES = [
+    ('core.xirr', '.'),
+    ('core.universe_pipeline', '.'),
+    ('core.orchestrator', '.'),
+    ('core.cli', '.'),
+    ('nifty500_sip_returns', 'nifty500/analysis'),
+    ('nifty500_calculate_ratio', 'nifty500/analysis'),
+    ('nifty500_portfolio_strategy', 'nifty500/analysis'),
+    ('nifty500_portfolio_analytics', 'nifty500/analysis'),
+    ('nifty200_portfolio_strategy', 'nifty200/analysis'),
+    ('nifty200_portfolio_analytics', 'nifty200/analysis'),
+    ('nifty500cash_strategy', 'nifty500cash/analysis'),
+    ('scenario_api', 'dashboard'),
+    ('daemon', 'dashboard'),            # thin client: standard library only
+]
+
+# Libraries that only specific code paths need
+LAZY_PACKAGES = ('plotly', 'scipy')
+
+
+def parse_importtime(stderr):
+    """Parse `-X importtime` output into {module: (self_us, cumulative_us)}"""
+    timings = {}
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        fields = line[len('import time:'):].split('|')
+        if len(fields) != 3:
+            continue
+        self_us, cumulative_us, name = fields
+        timings[name.strip()] = (int(self_us), int(cumulative_us))
+    return timings
+
+
+def measure(module, path):
+    """Import one module in a fresh interpreter and return its timings"""
+    code = f"import sys; sys.path.insert(0, {str(BASE_DIR / path)!r}); import {module}"
+    proc = subprocess.run([sys.executable, '-X', 'importtime', '-c', code],
+                          cwd=BASE_DIR, capture_output=True, text=True)
+    if proc.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{proc.stderr[-2000:]}")
+    return parse_importtime(proc.stderr)
+
+
+def summarize(timings, module):
+    """Total time for the module, slowest top-level packages, lazy packages loaded"""
+    packages = {}
+    for name, (self_us, _) in timings.items():
+        top = name.split('.')[0]
+        packages[top] = packages.get(top, 0) + self_us
+
+    return {
+        'total_ms': sum(self_us for self_us, _ in timings.values()) / 1000,
+        'module_ms': timings.get(module, (0, 0))[1] / 1000,
+        'packages': sorted(packages.items(), key=lambda kv: -kv[1]),
+        'lazy_loaded': sorted(p for p in LAZY_PACKAGES if p in packages),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import-time benchmark for pipeline entry modules")
+    parser.add_argument('--repeat', type=int, default=3, help="runs per module (best is reported)")
+    parser.add_argument('--top', type=int, default=3, help="slowest packages to list per module")
+    parser.add_argument('--budget-ms', type=float, default=None, help="fail if any module is slower")
+    args = parser.parse_args()
+
+    print("\n" + "=" * 80)
+    print("IMPORT-TIME BENCHMARK (python -X importtime, best of "
+          f"{args.repeat})")
+    print("=" * 80)
+    print(f"\n{'Entry module':<32s} {'Process':>9s} {'Module':>9s}  Slowest packages")
+    print("-" * 80)
+
+    failures = []
+    for module, path in ENTRY_MODULES:
+        runs = [summarize(measure(module, path), module) for _ in range(args.repeat)]
+        best = min(runs, key=lambda r: r['total_ms'])
+        slowest = ', '.join(f"{name} {us / 1000:.0f}ms" for name, us in best['packages'][:args.top])
+        print(f"{module:<32s} {best['total_ms']:>7.0f}ms {best['module_ms']:>7.0f}ms  {slowest}")
+
+        if best['lazy_loaded']:
+            failures.append(f"{module} imports {', '.join(best['lazy_loaded'])} at startup")
+        if args.budget_ms is not None and best['total_ms'] > args.budget_ms:
+            failures.append(f"{module} took {best['total_ms']:.0f}ms (budget {args.budget_ms:.0f}ms)")
+
+    print()
+    if failures:
+        for failure in failures:
+            print(f"   ❌ {failure}")
+        sys.exit(1)
+    print(f"   ✅ No entry module loads {' / '.join(LAZY_PACKAGES)} at import time")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,370 @@
+#!/usr/bin/env python3
+"""
+Pipeline Benchmark Suite
+Times the hot paths on bundled data and synthetic 10× / 100× / 1000× datasets
+
+Benchmarks (each over every index pair of the dataset):
+  csv_consolidation     read + concat + parse yearly NSE shards
+  resampling            daily → month-end and weekly closes
+  compute_signals       MOMCASH momentum state variables
+  calculate_risk_score  MOMCASH risk score + allocation
+  xirr                  XIRR of a monthly SIP
+  sip                   SIP units / value / drawdown on a strategy NAV
+  rolling_cagr          1/3/5/10Y rolling CAGR table
+  dashboard_export      portfolio analytics → dashboard JSON
+
+Runs offline. Results are appended to benchmarks/history.json together with
+the git commit, and compared against the latest run with the same scales,
+benchmarks, seed and source to flag regressions.
+A case whose time, extrapolated linearly from the previous scale, exceeds
+--budget seconds is skipped (recorded as skipped).
+
+Usage:
+    python3 benchmarks/run_benchmarks.py                         # scales 1 10 100 1000
+    python3 benchmarks/run_benchmarks.py --scales 1 10 --only xirr sip
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+import pandas as pd
+
+# Time the computation itself, not stage-cache hits (core/memo.py)
+os.environ.setdefault("SMART_BETA_CACHE", "0")
+
+BENCH_DIR = Path(__file__).parent
+BASE_DIR = BENCH_DIR.parent
+sys.path.insert(0, str(BASE_DIR))
+sys.path.insert(0, str(BASE_DIR / "nifty500"))
+sys.path.insert(0, str(BASE_DIR / "nifty500" / "analysis"))
+sys.path.insert(0, str(BASE_DIR / "nifty500cash" / "analysis"))
+sys.path.insert(0, str(BENCH_DIR))
+
+import datasets
+from core.xirr import calculate_xirr
+from nifty500_sip_returns import SIPAnalyzer
+from nifty500_calculate_ratio import RatioAnalyzer
+from nifty500_portfolio_strategy import PortfolioStrategy
+from nifty500_portfolio_analytics import PortfolioAnalytics
+from nifty500_returns_analysis import compute_rolling_cagrs
+from nifty500cash_strategy import MOMCASHStrategy
+
+HISTORY_FILE = BENCH_DIR / "history.json"
+DEFAULT_SCALES = [1, 10, 100, 1000]
+REGRESSION_RATIO = 1.25
+
+
+class BenchContext:
+    """Lazily built inputs for one scale, shared by all benchmarks"""
+
+    def __init__(self, scale, seed=42, source='bootstrap'):
+        self.scale = scale
+        self.seed = seed
+        self.source = source
+        self._cache = {}
+
+    def _get(self, key, build):
+        if key not in self._cache:
+            self._cache[key] = build()
+        return self._cache[key]
+
+    @property
+    def daily(self):
+        return self._get('daily', lambda: datasets.daily_pairs(self.scale, self.seed, self.source))
+
+    @property
+    def monthly(self):
+        return self._get('monthly', lambda: [datasets.monthly_pair(d) for d in self.daily])
+
+    @property
+    def csv_folders(self):
+        return self._get('csv', lambda: datasets.csv_folders(self.scale, self.seed, self.source, self.daily))
+
+    @property
+    def signals(self):
+        def build():
+            strategy = MOMCASHStrategy(BASE_DIR / "data")
+            with contextlib.redirect_stdout(io.StringIO()):
+                return [strategy.compute_signals(m[['Date', 'Close_mom']].copy()) for m in self.monthly]
+        return self._get('signals', build)
+
+    @property
+    def scratch(self):
+        """Temporary output directory, removed by close()"""
+        return Path(self._get('scratch', lambda: tempfile.TemporaryDirectory(prefix="bench_")).name)
+
+    def close(self):
+        if 'scratch' in self._cache:
+            self._cache.pop('scratch').cleanup()
+
+    @property
+    def portfolios(self):
+        def build():
+            strategy = PortfolioStrategy(BASE_DIR / "data")
+            with contextlib.redirect_stdout(io.StringIO()):
+                return [strategy.build_portfolio(m.copy()) for m in self.monthly]
+        return self._get('portfolios', build)
+
+
+# ============================================================================
+# BENCHMARKS — each returns (callable, rows processed)
+# ============================================================================
+
+def bench_csv_consolidation(ctx):
+    data_folder, folders = ctx.csv_folders
+    analyzer = SIPAnalyzer(data_folder)
+
+    def run():
+        for folder in folders:
+            analyzer.read_and_consolidate_index_data(folder)
+    return run, sum(len(d) for d in ctx.daily) * 2
+
+
+def bench_resampling(ctx):
+    sip = SIPAnalyzer(BASE_DIR / "data")
+    ratio = RatioAnalyzer(BASE_DIR / "data", html_mode='none')
+    frames = [(d[['Date', 'Close_mom']].rename(columns={'Close_mom': 'Close'}),
+               d[['Date', 'Close_val']].rename(columns={'Close_val': 'Close'})) for d in ctx.daily]
+
+    def run():
+        for mom, val in frames:
+            sip.get_monthly_closes(mom.copy())
+            sip.get_monthly_closes(val.copy())
+            ratio.build_ratio_frame(mom.copy(), val.copy())
+    return run, sum(len(d) for d in ctx.daily) * 2
+
+
+def bench_compute_signals(ctx):
+    strategy = MOMCASHStrategy(BASE_DIR / "data")
+    frames = [m[['Date', 'Close_mom']] for m in ctx.monthly]
+
+    def run():
+        for frame in frames:
+            strategy.compute_signals(frame.copy())
+    return run, sum(len(f) for f in frames)
+
+
+def bench_calculate_risk_score(ctx):
+    strategy = MOMCASHStrategy(BASE_DIR / "data")
+    frames = ctx.signals
+
+    def run():
+        for frame in frames:
+            strategy.calculate_risk_score(frame.copy())
+    return run, sum(len(f) for f in frames)
+
+
+def bench_xirr(ctx):
+    flows = []
+    for m in ctx.monthly:
+        units = (10000 / m['Close_mom']).sum()
+        flows.append([(d, -10000.0) for d in m['Date']] +
+                     [(m['Date'].iloc[-1], units * m['Close_mom'].iloc[-1])])
+
+    def run():
+        for cash_flows in flows:
+            calculate_xirr(cash_flows)
+    return run, sum(len(f) for f in flows)
+
+
+def bench_sip(ctx):
+    strategy = PortfolioStrategy(BASE_DIR / "data")
+    portfolios = ctx.portfolios
+
+    def run():
+        for df in portfolios:
+            strategy.run_sip_on_portfolio(df, 'benchmark')
+    return run, sum(len(p) for p in portfolios)
+
+
+def bench_rolling_cagr(ctx):
+    frames = [m[['Date', 'Close_mom']].rename(columns={'Close_mom': 'Close'}) for m in ctx.monthly]
+
+    def run():
+        for frame in frames:
+            compute_rolling_cagrs(frame)
+    return run, sum(len(f) for f in frames)
+
+
+def bench_dashboard_export(ctx):
+    portfolios = ctx.portfolios
+    out_dir = ctx.scratch
+
+    def run():
+        for i, df in enumerate(portfolios):
+            analytics = PortfolioAnalytics(df)
+            analytics.build_master_dataframe()
+            analytics.export_dashboard_data(out_dir / f"dashboard_{i}.json")
+    return run, sum(len(p) for p in portfolios)
+
+
+BENCHMARKS = {
+    'csv_consolidation': bench_csv_consolidation,
+    'resampling': bench_resampling,
+    'compute_signals': bench_compute_signals,
+    'calculate_risk_score': bench_calculate_risk_score,
+    'xirr': bench_xirr,
+    'sip': bench_sip,
+    'rolling_cagr': bench_rolling_cagr,
+    'dashboard_export': bench_dashboard_export,
+}
+
+
+# ============================================================================
+# RUNNER
+# ============================================================================
+
+def time_case(run, repeat):
+    """Best and median wall time; slow cases (>1s) are run once"""
+    times = []
+    with contextlib.redirect_stdout(io.StringIO()):
+        for _ in range(repeat):
+            start = time.perf_counter()
+            run()
+            times.append(time.perf_counter() - start)
+            if times[0] > 1.0:
+                break
+    times.sort()
+    return times[0], times[len(times) // 2], len(times)
+
+
+def git_revision():
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=BASE_DIR,
+                                capture_output=True, text=True, check=True).stdout.strip()
+        dirty = subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'], cwd=BASE_DIR,
+                               capture_output=True, text=True, check=True).stdout.strip()
+        return commit + ('-dirty' if dirty else '')
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def load_history():
+    if HISTORY_FILE.exists():
+        with open(HISTORY_FILE) as f:
+            return json.load(f)
+    return []
+
+
+def run_suite(scales, names, repeat=3, budget=60.0, seed=42, source='bootstrap'):
+    """Run the selected benchmarks; returns {bench: {scale: result}}"""
+    results = {name: {} for name in names}
+    for scale in scales:
+        history, pairs = datasets.scale_shape(scale)
+        print(f"\n📏 Scale {scale}× ({'bundled data' if scale == 1 else f'{history}× history, {pairs} pair(s)'})")
+        ctx = BenchContext(scale, seed, source)
+
+        try:
+            for name in names:
+                previous = [(s, r) for s, r in results[name].items() if 'best_s' in r]
+                if previous:
+                    prev_scale, prev = previous[-1]
+                    predicted = prev['best_s'] * scale / prev_scale
+                    if predicted > budget:
+                        results[name][scale] = {'skipped': f"predicted {predicted:.0f}s > budget {budget:.0f}s"}
+                        print(f"   ⏭️  {name:<22s} skipped (predicted {predicted:.0f}s)")
+                        continue
+
+                run, rows = BENCHMARKS[name](ctx)
+                best, median, runs = time_case(run, repeat)
+                results[name][scale] = {'best_s': round(best, 6), 'median_s': round(median, 6),
+                                        'runs': runs, 'rows': rows}
+                print(f"   ⏱️  {name:<22s} {best:>10.4f}s  ({rows:,} rows, {rows / best:,.0f} rows/s)")
+        finally:
+            ctx.close()
+    return results
+
+
+def run_config(entry):
+    """(seed, source, benchmarks, scales) of a history entry; derived from its
+    results for entries written before they were recorded"""
+    results = entry.get('results', {})
+    scales = entry.get('scales') or {int(s) for by_scale in results.values() for s in by_scale}
+    return (entry.get('seed'), entry.get('source', 'bootstrap'),
+            tuple(sorted(set(entry.get('benchmarks') or results))), tuple(sorted(set(scales))))
+
+
+def baseline(history, config):
+    """Latest history entry run with the same configuration, or None"""
+    for entry in reversed(history):
+        if run_config(entry) == config:
+            return entry
+    return None
+
+
+def compare(results, previous_run):
+    """Print cases slower than REGRESSION_RATIO× the previous run of the same configuration"""
+    if not previous_run:
+        print("\n📊 No previous run with the same scales / benchmarks / seed / source to compare with")
+        return []
+    regressions = []
+    for name, by_scale in results.items():
+        for scale, result in by_scale.items():
+            before = previous_run['results'].get(name, {}).get(str(scale), {})
+            if 'best_s' in result and 'best_s' in before and before['best_s'] > 0:
+                ratio = result['best_s'] / before['best_s']
+                if ratio >= REGRESSION_RATIO:
+                    regressions.append((name, scale, ratio))
+    print(f"\n📊 Compared with {previous_run.get('commit') or 'previous run'} "
+          f"({previous_run['timestamp']}):")
+    if not regressions:
+        print(f"   ✅ No case slower than {REGRESSION_RATIO:.2f}×")
+    for name, scale, ratio in regressions:
+        print(f"   ⚠️  {name} @ {scale}×: {ratio:.2f}× slower")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pipeline benchmark suite")
+    parser.add_argument('--scales', type=int, nargs='+', default=DEFAULT_SCALES)
+    parser.add_argument('--only', nargs='+', choices=list(BENCHMARKS), default=list(BENCHMARKS))
+    parser.add_argument('--repeat', type=int, default=3, help="runs per case (best is recorded)")
+    parser.add_argument('--budget', type=float, default=60.0, help="skip cases predicted slower (s)")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--source', choices=datasets.SOURCES, default='bootstrap',
+                        help="synthetic data: bootstrap of bundled returns or regime-switching generator")
+    parser.add_argument('--no-save', action='store_true', help="do not append to history.json")
+    args = parser.parse_args()
+
+    print("\n" + "=" * 80)
+    print("PIPELINE BENCHMARKS")
+    print("=" * 80)
+
+    results = run_suite(sorted(args.scales), args.only, args.repeat, args.budget, args.seed, args.source)
+
+    history = load_history()
+    config = (args.seed, args.source, tuple(sorted(set(args.only))), tuple(sorted(set(args.scales))))
+    regressions = compare(results, baseline(history, config))
+
+    if not args.no_save:
+        history.append({
+            'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            'commit': git_revision(),
+            'python': platform.python_version(),
+            'pandas': pd.__version__,
+            'platform': platform.platform(),
+            'seed': args.seed,
+            'source': args.source,
+            'benchmarks': sorted(set(args.only)),
+            'scales': sorted(set(args.scales)),
+            'results': {name: {str(s): r for s, r in by_scale.items()} for name, by_scale in results.items()},
+        })
+        with open(HISTORY_FILE, 'w') as f:
+            json.dump(history, f, indent=2)
+        print(f"\n✅ Appended results to {HISTORY_FILE}")
+
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
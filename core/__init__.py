@@ -0,0 +1,5 @@
+"""
+Shared engines for the smart beta pipelines
+Universe-independent building blocks used by the nifty200 / nifty500 /
+nifty500cash scripts, the dashboard server and the analysis tools.
+"""
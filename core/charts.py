@@ -0,0 +1,69 @@
+"""
+Chart Export
+Writes Plotly figures as JSON and (optionally) HTML sharing one plotly.js bundle
+
+fig.write_html() inlines the whole plotly.js library (~3.5 MB) into every
+file. Instead, plotly.min.js is written once into dashboard/static/ and each
+HTML page references it by relative path, so adding charts costs only their
+data. The dashboard itself renders from the JSON, so HTML can be skipped.
+
+HTML modes:
+  'shared'  HTML referencing dashboard/static/plotly.min.js (default)
+  'inline'  standalone HTML with plotly.js embedded (old behaviour)
+  'none'    JSON only
+"""
+
+import os
+from pathlib import Path
+
+BASE_DIR = Path(__file__).parent.parent
+STATIC_DIR = BASE_DIR / "dashboard" / "static"
+PLOTLY_BUNDLE = STATIC_DIR / "plotly.min.js"
+
+HTML_MODES = ('shared', 'inline', 'none')
+
+
+def ensure_plotly_bundle(bundle=PLOTLY_BUNDLE):
+    """Write plotly.min.js unless the file already holds this plotly version"""
+    from plotly.offline import get_plotlyjs, get_plotlyjs_version
+
+    bundle = Path(bundle)
+    header = f"plotly.js v{get_plotlyjs_version()}"
+    if bundle.exists():
+        with open(bundle, encoding='utf-8') as f:
+            if header in f.read(512):
+                return bundle
+
+    bundle.parent.mkdir(parents=True, exist_ok=True)
+    # Per-process temp name: parallel stages may all be writing the bundle
+    tmp = bundle.with_name(f".{bundle.name}.{os.getpid()}.tmp")
+    with open(tmp, 'w', encoding='utf-8') as f:
+        f.write(get_plotlyjs())
+    os.replace(tmp, bundle)
+    print(f"✅ Wrote shared plotly.js bundle to: {bundle}")
+    return bundle
+
+
+def export_figure(fig, json_file, html_mode='shared'):
+    """Save fig as JSON, plus HTML according to html_mode; returns written paths"""
+    if html_mode not in HTML_MODES:
+        raise ValueError(f"html_mode must be one of {HTML_MODES}, got {html_mode!r}")
+
+    json_file = Path(json_file)
+    with open(json_file, 'w') as f:
+        f.write(fig.to_json())
+    written = [json_file]
+
+    if html_mode == 'none':
+        return written
+
+    html_file = json_file.with_suffix('.html')
+    if html_mode == 'shared':
+        bundle = ensure_plotly_bundle()
+        # A src ending in .js makes plotly emit <script src=...> instead of the library
+        src = Path(os.path.relpath(bundle, html_file.parent)).as_posix()
+        fig.write_html(html_file, include_plotlyjs=src)
+    else:
+        fig.write_html(html_file)
+    written.append(html_file)
+    return written
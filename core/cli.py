@@ -0,0 +1,405 @@
+#!/usr/bin/env python3
+"""
+Smart Beta CLI
+One entry point for every pipeline stage, run in-process on shared data
+
+Subcommands:
+  ingest                CSV shards → panel store (creates it, or appends new days)
+  resample              daily → month-end closes (<universe>/output/monthly/)
+  ratio                 weekly momentum/value ratio + chart
+  strategy rotation     Simple Momentum (gain/loss) rotation backtest
+  strategy momcash      MOMCASH risk-score backtest on the nifty500 momentum index
+  analytics             index SIP dashboard, portfolio analytics, rolling CAGRs
+                        (and the MOMCASH dashboard for nifty500)
+  sweep                 Simple Momentum gain/loss threshold grid (cached in the sweep store)
+  serve                 dashboard server, or the warm daemon with --daemon
+  bench                 benchmark suite, or the import-time check with --imports
+  run-all               resample → ratio → rotation → momcash → analytics
+
+Every universe step takes --universe (default: all with data) and --jobs N
+(universes run in parallel worker processes). Within one invocation each
+universe's daily data is read once and shared by all of its steps, and later
+steps reuse earlier results (analytics uses the rotation portfolio frame,
+MOMCASH uses the nifty500 month-end closes) instead of re-reading CSVs.
+
+Usage:
+    python3 core/cli.py run-all --jobs 8
+    python3 core/cli.py strategy rotation --universe nifty200
+    python3 core/cli.py strategy momcash
+    python3 core/cli.py analytics --universe nifty500 --panel data_panel
+    python3 core/cli.py sweep --universe nifty500 --gains 10 15 20 25 --losses -20 -15 -10
+    python3 core/cli.py ingest --out data_panel
+    python3 core/cli.py serve --port 8000
+    python3 core/cli.py bench -- --scales 1 10 --only xirr sip
+"""
+
+import argparse
+import contextlib
+import io
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+BASE_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(BASE_DIR))
+sys.path.insert(0, str(BASE_DIR / "nifty500"))
+sys.path.insert(0, str(BASE_DIR / "nifty500" / "analysis"))
+sys.path.insert(0, str(BASE_DIR / "nifty500cash" / "analysis"))
+
+from core.profiling import profile_run
+from core.universe import DATA_DIR, UNIVERSES, available_universes, get_universe
+
+# Universe whose momentum index MOMCASH trades
+MOMCASH_UNIVERSE = 'nifty500'
+MOMCASH_OUTPUT = BASE_DIR / "nifty500cash" / "output"
+
+# run-all order; each step pulls in what it needs from earlier ones
+STEPS = ('resample', 'ratio', 'rotation', 'momcash', 'analytics')
+
+DEFAULT_GAINS = [10, 15, 20, 25, 30]
+DEFAULT_LOSSES = [-25, -20, -15, -10, -5]
+
+
+# ============================================================================
+# SESSION (one universe, data loaded once)
+# ============================================================================
+
+class UniverseSession:
+    """A loaded UniversePipeline plus the results of steps already run"""
+
+    def __init__(self, name, monthly_sip=10000, panel=None):
+        from core.universe_pipeline import UniversePipeline
+
+        self.pipeline = UniversePipeline(name, monthly_sip=monthly_sip, panel=panel)
+        self.name = name
+        self.monthly_sip = monthly_sip
+        self._results = {}
+
+    def _get(self, key, build):
+        if key not in self._results:
+            self._results[key] = build()
+        return self._results[key]
+
+    def loaded(self):
+        return self._get('load', lambda: self.pipeline.load(write_monthly=False))
+
+    def resample(self):
+        self.loaded()
+        return self._get('resample', self.pipeline.save_monthly)
+
+    def ratio(self):
+        self.loaded()
+        return self._get('ratio', self.pipeline.run_ratio)
+
+    def rotation(self):
+        """(results, portfolio_df) of the Simple Momentum backtest"""
+        self.loaded()
+        return self._get('rotation', self.pipeline.run_strategy)
+
+    def momcash(self):
+        """(comparisons, portfolio_df) of MOMCASH on this universe's momentum index"""
+        if self.name != MOMCASH_UNIVERSE:
+            raise ValueError(f"MOMCASH runs on {MOMCASH_UNIVERSE}, not {self.name}")
+        self.loaded()
+
+        def build():
+            from nifty500cash_strategy import MOMCASHStrategy
+
+            strategy = MOMCASHStrategy(DATA_DIR, monthly_sip=self.monthly_sip)
+            comparisons, portfolio_df, _ = strategy.run_strategy(self.pipeline.monthly['momentum'])
+            strategy.display_results(comparisons)
+            return comparisons, portfolio_df
+
+        return self._get('momcash', build)
+
+    def analytics(self):
+        """Index SIP dashboard, portfolio analytics and rolling CAGRs (+ MOMCASH dashboard)"""
+        def build():
+            self.pipeline.run_index_sip(self.ratio())
+            _, portfolio_df = self.rotation()
+            self.pipeline.run_analytics(portfolio_df)
+            self.pipeline.run_returns_analysis()
+            if self.name == MOMCASH_UNIVERSE:
+                self.momcash()   # reuses the run-all result, else backtests and writes the CSV
+                from nifty500cash_analytics import MOMCASHAnalytics
+
+                # From the CSV just written, so the JSON matches nifty500cash_analytics.py exactly
+                analytics = MOMCASHAnalytics(MOMCASH_OUTPUT / "monthly" / "nifty500cash_momcash_portfolio.csv",
+                                             monthly_sip=self.monthly_sip)
+                analytics.export_dashboard_data(MOMCASH_OUTPUT / "nifty500cash_dashboard.json")
+
+        return self._get('analytics', build)
+
+    def sweep(self, gains, losses):
+        """Simple Momentum backtest for every (gain, loss) threshold pair
+
+        Pairs already in the sweep store for the same month-end data and
+        strategy code are read back instead of recomputed.
+        """
+        import nifty500_portfolio_strategy
+        from core.sweep_store import SweepStore, code_version, data_hash
+        from core.tax_lots import after_tax
+
+        self.loaded()
+        merged = self.pipeline.merged_monthly()
+
+        def run(gain, loss, sip):
+            strategy = nifty500_portfolio_strategy.PortfolioStrategy(
+                self.pipeline.data_folder, monthly_sip=sip, gain_threshold=gain, loss_threshold=loss)
+            with contextlib.redirect_stdout(io.StringIO()):
+                portfolio_df = strategy.build_portfolio(merged)
+                results, _ = strategy.run_sip_on_portfolio(portfolio_df, f"{gain}/{loss}")
+            switches = int((portfolio_df['regime'] != portfolio_df['regime'].shift()).sum() - 1)
+            taxed, _ = after_tax(portfolio_df, sip)
+            return {'gain': gain, 'loss': loss, 'sip_xirr': results['sip_xirr'],
+                    'index_cagr': results['index_cagr'], 'max_drawdown': results['max_drawdown'],
+                    'mar_ratio': results['mar_ratio'], 'switches': switches,
+                    'post_tax_xirr': taxed['post_tax_xirr'], 'tax_drag': taxed['tax_drag']}
+
+        grid = [{'gain': gain, 'loss': loss, 'sip': self.monthly_sip} for gain in gains for loss in losses]
+        code = code_version(nifty500_portfolio_strategy.__file__, BASE_DIR / "core" / "xirr.py",
+                            BASE_DIR / "core" / "tax_lots.py")
+        with SweepStore() as store:
+            rows, computed = store.sweep('simple_momentum', self.name, grid, run, data_hash(merged), code)
+        print(f"   💾 {self.name}: {computed} computed, {len(grid) - computed} from the sweep store")
+        return sorted(rows, key=lambda r: -r['sip_xirr'])
+
+
+def summarize(session, steps):
+    """Headline numbers of the steps that ran"""
+    summary = {'universe': session.name, 'steps': list(steps)}
+    if 'rotation' in session._results:
+        results, portfolio_df = session._results['rotation']
+        summary['rotation'] = {'months': len(portfolio_df), 'sip_xirr': results['sip_xirr'],
+                               'index_cagr': results['index_cagr'], 'max_drawdown': results['max_drawdown']}
+    if 'momcash' in session._results:
+        results = session._results['momcash'][0]['momcash']
+        summary['momcash'] = {'sip_xirr': results['sip_xirr'], 'index_cagr': results['index_cagr'],
+                              'max_drawdown': results['max_drawdown']}
+    return summary
+
+
+def run_steps(name, steps, monthly_sip=10000, panel=None, sweep=None, verbose=True):
+    """Worker entry point: run the steps for one universe on a single session"""
+    from core import memo
+
+    start = time.perf_counter()
+    memo.reset_stats()
+    session = UniverseSession(name, monthly_sip, panel)
+    output = contextlib.nullcontext() if verbose else contextlib.redirect_stdout(io.StringIO())
+
+    with profile_run(f"{name}_cli", session.pipeline.universe.output_dir), output:
+        for step in steps:
+            getattr(session, step)()
+        summary = summarize(session, steps)
+        if sweep:
+            summary['sweep'] = session.sweep(*sweep)
+    summary['cache'] = memo.stats()
+
+    summary['elapsed'] = time.perf_counter() - start
+    return summary
+
+
+# ============================================================================
+# DISPATCH
+# ============================================================================
+
+def resolve_universes(names, panel=None):
+    if names:
+        for name in names:
+            get_universe(name)
+        return list(names)
+    if panel:
+        from core.panel_store import PanelStore
+
+        store = PanelStore(panel)
+        return [name for name, u in UNIVERSES.items() if u.mom_folder in store and u.val_folder in store]
+    return available_universes()
+
+
+def steps_for(universe, steps):
+    """MOMCASH only applies to its own universe; drop it elsewhere"""
+    return [s for s in steps if s != 'momcash' or universe == MOMCASH_UNIVERSE]
+
+
+def run_universes(plan, jobs=None, monthly_sip=10000, panel=None, sweep=None, verbose=False):
+    """Run {universe: steps}; serially in this process for --jobs 1 or one universe"""
+    summaries = {}
+
+    def report(name, summary):
+        summaries[name] = summary
+        if isinstance(summary, Exception):
+            print(f"   ❌ {name:<12s} failed: {type(summary).__name__}: {summary}")
+            return
+        line = f"   ✅ {name:<12s} {', '.join(summary['steps']) or 'loaded'}"
+        for key in ('rotation', 'momcash'):
+            if key in summary:
+                r = summary[key]
+                line += f" | {key} XIRR {r['sip_xirr']:.2f}% CAGR {r['index_cagr']:.2f}%"
+        if summary['cache']:
+            from core.memo import format_stats
+            line += f" | cache {format_stats(summary['cache'])}"
+        print(f"{line} | {summary['elapsed']:.1f}s")
+
+    if jobs == 1 or len(plan) == 1:
+        for name, steps in plan.items():
+            try:
+                report(name, run_steps(name, steps, monthly_sip, panel, sweep, verbose=True))
+            except Exception as e:
+                report(name, e)
+        return summaries
+
+    with ProcessPoolExecutor(max_workers=jobs or len(plan)) as pool:
+        futures = {pool.submit(run_steps, name, steps, monthly_sip, panel, sweep, verbose): name
+                   for name, steps in plan.items()}
+        for future in as_completed(futures):
+            try:
+                report(futures[future], future.result())
+            except Exception as e:
+                report(futures[future], e)
+    return summaries
+
+
+def print_sweep(summaries, top):
+    for name, summary in summaries.items():
+        if isinstance(summary, Exception):
+            continue
+        rows = summary['sweep']
+        print(f"\n📊 {name}: {len(rows)} threshold pairs (top {min(top, len(rows))} by SIP XIRR)")
+        print(f"   {'Gain':>6s} {'Loss':>6s} {'XIRR':>8s} {'PostTax':>8s} {'CAGR':>8s} {'MaxDD':>9s} "
+              f"{'MAR':>6s} {'Sw':>4s}")
+        for r in rows[:top]:
+            print(f"   {r['gain']:>6g} {r['loss']:>6g} {r['sip_xirr']:>7.2f}% {r['post_tax_xirr']:>7.2f}% "
+                  f"{r['index_cagr']:>7.2f}% {r['max_drawdown']:>8.2f}% {r['mar_ratio']:>6.2f} {r['switches']:>4d}")
+
+
+def cmd_ingest(args):
+    from core.panel_store import PanelStore, append_from_shards, ingest
+
+    if (args.out / "meta.json").exists():
+        store = PanelStore(args.out, mode='r')
+        added = append_from_shards(store)
+        print(f"✅ Appended {added} day(s): {store}")
+    else:
+        store = ingest(args.out, DATA_DIR, dtype=args.dtype)
+        print(f"✅ {store}")
+    return 0
+
+
+def cmd_universe_steps(args, steps, sweep=None):
+    names = resolve_universes(args.universe, args.panel)
+    if steps == ['momcash']:
+        if args.universe and MOMCASH_UNIVERSE not in args.universe:
+            raise ValueError(f"MOMCASH runs on {MOMCASH_UNIVERSE}")
+        names = [MOMCASH_UNIVERSE]
+    plan = {name: steps_for(name, steps) for name in names}
+
+    print("\n" + "=" * 80)
+    print(f"SMART BETA: {' → '.join(steps) or 'sweep'} | {', '.join(plan)}")
+    print("=" * 80)
+
+    summaries = run_universes(plan, args.jobs, args.sip, args.panel, sweep, args.verbose)
+    if sweep:
+        print_sweep(summaries, args.top)
+    return 1 if any(isinstance(s, Exception) for s in summaries.values()) else 0
+
+
+def cmd_serve(args):
+    sys.path.insert(0, str(BASE_DIR / "dashboard"))
+    if args.daemon:
+        from daemon import serve
+
+        serve(args.socket, args.port)
+    else:
+        from serve_dashboard import main as serve_dashboard
+
+        serve_dashboard(args.port or 8000)
+    return 0
+
+
+def cmd_bench(args):
+    """Hand the remaining arguments to the benchmark script's own parser"""
+    sys.path.insert(0, str(BASE_DIR / "benchmarks"))
+    if args.imports:
+        from import_time import main as bench_main
+    else:
+        from run_benchmarks import main as bench_main
+
+    extra = args.extra[1:] if args.extra[:1] == ['--'] else args.extra
+    sys.argv = [sys.argv[0]] + extra
+    bench_main()
+    return 0
+
+
+def build_parser():
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument('--universe', '-u', nargs='+', metavar='NAME',
+                        help=f"default: all with data ({', '.join(UNIVERSES)})")
+    common.add_argument('--jobs', '-j', type=int, default=None, help="worker processes (one per universe)")
+    common.add_argument('--panel', type=Path, help="panel store to read daily closes from")
+    common.add_argument('--sip', type=float, default=10000, help="monthly SIP amount")
+    common.add_argument('--verbose', '-v', action='store_true', help="show step output from workers")
+
+    parser = argparse.ArgumentParser(description="Smart beta pipeline CLI")
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    p = sub.add_parser('ingest', help="CSV shards → panel store")
+    p.add_argument('--out', type=Path, default=BASE_DIR / "data_panel")
+    p.add_argument('--dtype', default='float64', choices=['float32', 'float64'])
+
+    for name, help_text in (('resample', "daily → month-end closes"),
+                            ('ratio', "weekly momentum/value ratio"),
+                            ('analytics', "dashboards and rolling CAGRs")):
+        sub.add_parser(name, parents=[common], help=help_text)
+
+    p = sub.add_parser('strategy', parents=[common], help="strategy backtest")
+    p.add_argument('strategy', choices=['rotation', 'momcash'])
+
+    p = sub.add_parser('sweep', parents=[common], help="Simple Momentum threshold grid")
+    p.add_argument('--gains', type=float, nargs='+', default=DEFAULT_GAINS)
+    p.add_argument('--losses', type=float, nargs='+', default=DEFAULT_LOSSES)
+    p.add_argument('--top', type=int, default=10, help="rows to print per universe")
+
+    p = sub.add_parser('run-all', parents=[common], help="every step, data loaded once per universe")
+    p.add_argument('--steps', nargs='+', choices=STEPS, default=list(STEPS))
+
+    p = sub.add_parser('serve', help="dashboard server / warm daemon")
+    p.add_argument('--port', type=int, default=None, help="HTTP port (dashboard default 8000)")
+    p.add_argument('--daemon', action='store_true', help="warm daemon (Unix socket unless --port)")
+    p.add_argument('--socket', type=Path, help="daemon socket path")
+
+    p = sub.add_parser('bench', help="benchmarks (extra arguments are passed through)")
+    p.add_argument('--imports', action='store_true', help="import-time check instead of the suite")
+    p.add_argument('extra', nargs=argparse.REMAINDER)
+
+    return parser
+
+
+def main():
+    parser = build_parser()
+    args = parser.parse_args()
+
+    try:
+        if args.command == 'ingest':
+            status = cmd_ingest(args)
+        elif args.command == 'serve':
+            status = cmd_serve(args)
+        elif args.command == 'bench':
+            status = cmd_bench(args)
+        elif args.command == 'strategy':
+            status = cmd_universe_steps(args, [args.strategy])
+        elif args.command == 'sweep':
+            status = cmd_universe_steps(args, [], sweep=(args.gains, args.losses))
+        elif args.command == 'run-all':
+            status = cmd_universe_steps(args, [s for s in STEPS if s in args.steps])
+        else:
+            status = cmd_universe_steps(args, [args.command])
+    except ValueError as e:
+        print(f"❌ {e}")
+        status = 1
+    sys.exit(status)
+
+
+if __name__ == "__main__":
+    main()
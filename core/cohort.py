@@ -0,0 +1,330 @@
+#!/usr/bin/env python3
+"""
+Investor Cohort Simulator
+Every investor's SIP against one NAV series, for books of 10⁵-10⁶ plans
+
+run_sip_on_portfolio answers "what did a ₹10K SIP from the first month do";
+a book of investors has as many start dates, amounts and step-ups as it has
+investors. Here the book is a columnar table, one row per contribution plan:
+
+    investor_id    any label
+    start          first contribution month (YYYY-MM or a date)
+    sip            monthly amount in the first year
+    step_up_pct    optional, raised by this % every step_every months (default 0)
+    step_every     optional, months between step-ups (default 12)
+    stop           optional, last month is the one before this (holdings are kept)
+
+Plans are evaluated in chunks of investors as months × investors arrays:
+
+    amount[m, i]   = sip_i × (1 + step_i)^((month_m - start_i) // every_i)  while active
+    units[m, i]    = Σ_{k≤m} amount[k, i] / nav[k]
+    value[m, i]    = units[m, i] × nav[m]
+
+giving each investor's units, invested capital, current value, XIRR (one
+vectorized Newton solve per chunk, core.xirr.xirr_columns, started from a
+holding-period estimate so it converges in a few steps) and worst investor
+drawdown (value vs invested capital, as run_sip_on_portfolio's
+max_investor_drawdown). Memory is bounded by the chunk size, not the book;
+chunks can run in worker processes. A month with no NAV in the series gets
+no contribution; months before the series' first NAV are not invested.
+
+Usage:
+    python3 core/cohort.py --synthetic 1000000 --jobs 4         # seeded random book
+    python3 core/cohort.py --book plans.csv --series MOMCASH --out results.csv
+    python3 core/cohort.py --synthetic 200000 --save-book plans.csv
+    python3 core/cohort.py --book plans.csv --nav my_strategy.csv   # Date, NAV (or Close)
+"""
+
+import argparse
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+BASE_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(BASE_DIR))
+
+from core.universe import DATA_DIR, UNIVERSES
+from core.xirr import xirr_columns
+
+CHUNK_SIZE = 10_000           # investors per chunk (~25 MB per months × investors array)
+STEP_EVERY = 12               # months between step-ups
+UNDER_WATER_DD = -20.0        # "deep" investor drawdown threshold, %
+PERCENTILES = (5, 25, 50, 75, 95)
+
+
+# ============================================================================
+# PLANS
+# ============================================================================
+
+def month_codes(values):
+    """year × 12 + month - 1 for dates / 'YYYY-MM' strings (NaN / NaT → NaN)"""
+    dates = pd.DatetimeIndex(pd.to_datetime(pd.Series(values), errors='raise'))
+    return (dates.year * 12 + dates.month - 1).to_numpy(dtype=float)
+
+
+def plan_arrays(plans):
+    """Column arrays of a plan table: start / stop month codes, sip, step-up rate, every"""
+    for column in ('start', 'sip'):
+        if column not in plans:
+            raise ValueError(f"Plan table needs a '{column}' column")
+    n = len(plans)
+    if not n:
+        raise ValueError("Plan table has no plans")
+    stop = month_codes(plans['stop']) if 'stop' in plans else np.full(n, np.nan)
+    arrays = {
+        'start': month_codes(plans['start']),
+        'stop': np.where(np.isnan(stop), np.inf, stop),
+        'sip': plans['sip'].to_numpy(dtype=float),
+        'step': plans['step_up_pct'].fillna(0).to_numpy(dtype=float) / 100 if 'step_up_pct' in plans
+        else np.zeros(n),
+        'every': plans['step_every'].fillna(STEP_EVERY).to_numpy(dtype=float) if 'step_every' in plans
+        else np.full(n, float(STEP_EVERY)),
+    }
+    if np.isnan(arrays['start']).any():
+        raise ValueError("Every plan needs a start month")
+    if (arrays['sip'] < 0).any() or (arrays['every'] < 1).any():
+        raise ValueError("sip must be >= 0 and step_every >= 1")
+    return arrays
+
+
+def synthetic_book(n, dates, seed=42):
+    """n random plans starting within the series' dates (for benchmarks and what-ifs)
+
+    Start months uniform over all but the last year, SIPs log-normal around
+    ₹10K in ₹500 steps, step-ups of 0/5/10/15%, and one investor in five
+    stopping after 1-10 years.
+    """
+    rng = np.random.default_rng(seed)
+    first, last = month_codes(pd.DatetimeIndex(dates)[[0, -1]]).astype(int)
+    start = rng.integers(first, max(first + 1, last - 11), n)
+    stop = start + rng.integers(12, 121, n)
+    stops = (rng.random(n) < 0.2) & (stop <= last)
+
+    def to_month(code):
+        return pd.to_datetime({'year': code // 12, 'month': code % 12 + 1, 'day': 1})
+
+    return pd.DataFrame({
+        'investor_id': np.arange(1, n + 1),
+        'start': to_month(start),
+        'sip': np.maximum(500, np.round(rng.lognormal(np.log(10000), 0.7, n) / 500) * 500),
+        'step_up_pct': rng.choice([0.0, 5.0, 10.0, 15.0], n, p=[0.5, 0.2, 0.2, 0.1]),
+        'stop': to_month(np.where(stops, stop, start)).where(stops),
+    })
+
+
+# ============================================================================
+# ENGINE
+# ============================================================================
+
+def simulate_chunk(codes, days, nav, plan):
+    """Per-investor results for one chunk of plans (dict of investor vectors)
+
+    codes: M month codes of the NAV rows, days: M day offsets, nav: M NAVs
+    plan:  plan_arrays() of this chunk
+    """
+    codes = codes[:, None]
+    active = (codes >= plan['start']) & (codes < plan['stop'])
+    steps = np.floor_divide(codes - plan['start'], plan['every']).clip(min=0)
+    amount = np.where(active, plan['sip'] * (1 + plan['step']) ** steps, 0.0)   # M×C
+    del active, steps
+
+    invested = np.cumsum(amount, axis=0)
+    units = np.cumsum(amount / nav[:, None], axis=0)
+    value = units * nav[:, None]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        investor_dd = np.fmin.reduce(np.where(invested > 0, (value - invested) / invested * 100, np.nan), axis=0)
+    # Copies, so a chunk's results do not keep its M×C arrays alive
+    final_units, final_invested, final_value = units[-1].copy(), invested[-1].copy(), value[-1].copy()
+    del units, value, invested
+
+    # Newton from the rate that grows the money-weighted average holding
+    # period's capital into the final value
+    years = (days[-1] - days) / 365.0
+    with np.errstate(divide='ignore', invalid='ignore'):
+        held = (amount * years[:, None]).sum(axis=0) / final_invested
+        guess = np.clip((final_value / final_invested) ** (1 / np.maximum(held, 1 / 12)) - 1, -0.9, 5.0)
+    guess = np.nan_to_num(guess, nan=0.1)
+    # Days counted back from the valuation date: the NPV there, value minus
+    # compounded contributions, is concave and decreasing in the rate, so
+    # Newton converges from either side of the root
+    flows = np.concatenate([-amount, final_value[None]])
+    flow_days = np.broadcast_to((np.append(days, days[-1]) - days[-1])[:, None], flows.shape)
+    xirr = xirr_columns(flow_days, flows, guess=guess)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        started = final_invested > 0
+        return {
+            'units': final_units,
+            'invested': final_invested,
+            'value': final_value,
+            'gain_pct': np.where(started, (final_value / final_invested - 1) * 100, np.nan),
+            'xirr': np.where(started, xirr, np.nan),
+            'max_investor_drawdown': investor_dd,
+            'contributions': (amount > 0).sum(axis=0),
+        }
+
+
+def _run_chunk(args):
+    return simulate_chunk(*args)
+
+
+def simulate_book(plans, dates, nav, chunk_size=CHUNK_SIZE, jobs=1):
+    """Results frame (one row per plan, in plan order) for a book against one NAV series
+
+    dates / nav: month-end dates and NAVs of the series (NaN NAV months are dropped)
+    jobs:        worker processes for the chunks (1 = in-process)
+    """
+    nav = np.asarray(nav, dtype=float)
+    dates = pd.DatetimeIndex(dates)[~np.isnan(nav)]
+    nav = nav[~np.isnan(nav)]
+    codes = month_codes(dates)
+    days = (dates - dates[0]).days.to_numpy().astype(float)
+
+    arrays = plan_arrays(plans)
+    bounds = range(0, len(plans), chunk_size)
+    tasks = ((codes, days, nav, {k: v[i:i + chunk_size] for k, v in arrays.items()}) for i in bounds)
+    if jobs and jobs > 1 and len(bounds) > 1:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            chunks = list(pool.map(_run_chunk, tasks))
+    else:
+        chunks = [_run_chunk(task) for task in tasks]
+
+    results = pd.DataFrame({k: np.concatenate([c[k] for c in chunks]) for k in chunks[0]})
+    if 'investor_id' in plans:
+        results.insert(0, 'investor_id', plans['investor_id'].to_numpy())
+    results.insert(1 if 'investor_id' in plans else 0, 'start', plans['start'].to_numpy())
+    return results
+
+
+# ============================================================================
+# AGGREGATES
+# ============================================================================
+
+def summarize(results):
+    """(book totals and distributions, per start-year cohort frame) over investors who have started"""
+    live = results[results['invested'] > 0]
+    under_water = live['value'] < live['invested']
+    overall = {
+        'investors': len(live),
+        'not_started': len(results) - len(live),
+        'invested': live['invested'].sum(),
+        'value': live['value'].sum(),
+        'under_water_pct': under_water.mean() * 100,
+        'deep_drawdown_pct': (live['max_investor_drawdown'] <= UNDER_WATER_DD).mean() * 100,
+        'xirr_unsolved': int(live['xirr'].isna().sum()),
+    }
+    for metric in ('xirr', 'gain_pct', 'max_investor_drawdown'):
+        values = np.nanpercentile(live[metric], PERCENTILES)
+        overall.update({f'{metric}_p{p}': v for p, v in zip(PERCENTILES, values)})
+
+    year = pd.to_datetime(live['start']).dt.year.rename('start_year')
+    cohorts = live.assign(under_water=under_water * 100.0).groupby(year).agg(
+        investors=('invested', 'size'), invested=('invested', 'sum'), value=('value', 'sum'),
+        median_xirr=('xirr', 'median'), under_water_pct=('under_water', 'mean'),
+        median_worst_dd=('max_investor_drawdown', 'median'))
+    return overall, cohorts
+
+
+# ============================================================================
+# DATA
+# ============================================================================
+
+def load_series(universe, series, nav_csv=None, data_folder=DATA_DIR):
+    """(name, month-end dates, NAVs) of a universe series or a Date / NAV (or Close) CSV"""
+    if nav_csv:
+        df = pd.read_csv(nav_csv)
+        column = 'NAV' if 'NAV' in df else 'Close'
+        return Path(nav_csv).stem, pd.DatetimeIndex(pd.to_datetime(df['Date'])), df[column].to_numpy(dtype=float)
+
+    from core.contributions import monthly_navs
+
+    navs, dates = monthly_navs(universe, data_folder)
+    if series not in navs:
+        raise ValueError(f"Unknown series {series!r}; available: {list(navs.columns)}")
+    keep = navs[series].notna()
+    return series, pd.DatetimeIndex(dates.loc[keep, series]), navs.loc[keep, series].to_numpy()
+
+
+def read_book(path):
+    path = Path(path)
+    return pd.read_parquet(path) if path.suffix == '.parquet' else pd.read_csv(path)
+
+
+# ============================================================================
+# MAIN
+# ============================================================================
+
+def main():
+    parser = argparse.ArgumentParser(description="SIP outcomes for a book of investor plans")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument('--book', type=Path, help="plan table (.csv or .parquet)")
+    source.add_argument('--synthetic', type=int, metavar='N', help="generate N random plans")
+    parser.add_argument('--universe', default='nifty500', choices=list(UNIVERSES))
+    parser.add_argument('--series', default='Simple Momentum',
+                        help="index or strategy NAV of the universe (e.g. MOMCASH, 'Nifty 500 Momentum')")
+    parser.add_argument('--nav', type=Path, help="NAV CSV (Date, NAV or Close) instead of a universe series")
+    parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE)
+    parser.add_argument('--jobs', type=int, default=1, help="worker processes")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--save-book', type=Path, help="write the synthetic plans to this CSV")
+    parser.add_argument('--out', type=Path, help="write per-investor results to this CSV")
+    args = parser.parse_args()
+
+    try:
+        name, dates, nav = load_series(args.universe, args.series, args.nav)
+    except ValueError as e:
+        parser.error(str(e))
+
+    if args.book:
+        plans = read_book(args.book)
+    else:
+        plans = synthetic_book(args.synthetic, dates, args.seed)
+        if args.save_book:
+            plans.to_csv(args.save_book, index=False)
+            print(f"💾 Saved {len(plans):,} plans to: {args.save_book}")
+
+    start = time.perf_counter()
+    try:
+        results = simulate_book(plans, dates, nav, args.chunk_size, args.jobs)
+    except ValueError as e:
+        parser.error(str(e))
+    elapsed = time.perf_counter() - start
+    overall, cohorts = summarize(results)
+
+    print("\n" + "=" * 90)
+    print(f"👥 COHORT: {len(plans):,} plans vs {name} ({len(nav)} months, "
+          f"{dates[0]:%Y-%m} to {dates[-1]:%Y-%m}) in {elapsed:.2f}s")
+    print("=" * 90)
+    not_started = f" ({overall['not_started']:,} not started)" if overall['not_started'] else ''
+    print(f"   Investors:       {overall['investors']:,}{not_started}")
+    print(f"   Invested:        ₹{overall['invested']:,.0f}")
+    print(f"   Current value:   ₹{overall['value']:,.0f}")
+    print(f"   Under water:     {overall['under_water_pct']:.2f}% of investors (value < invested)")
+    print(f"   Worst DD ≤ {UNDER_WATER_DD:.0f}%:  {overall['deep_drawdown_pct']:.2f}% of investors at some point")
+    if overall['xirr_unsolved']:
+        print(f"   ⚠️  XIRR did not converge for {overall['xirr_unsolved']:,} investors")
+
+    print(f"\n   {'Percentile':<22s}" + ''.join(f"{f'p{p}':>10s}" for p in PERCENTILES))
+    print("   " + "-" * (22 + 10 * len(PERCENTILES)))
+    for metric, label in (('xirr', 'XIRR'), ('gain_pct', 'Gain on invested'),
+                          ('max_investor_drawdown', 'Worst investor DD')):
+        print(f"   {label:<22s}" + ''.join(f"{overall[f'{metric}_p{p}']:>9.2f}%" for p in PERCENTILES))
+
+    print(f"\n   {'Start':<6s} {'Investors':>10s} {'Invested':>18s} {'Value':>18s} {'Med XIRR':>9s} "
+          f"{'Under water':>12s} {'Med worst DD':>13s}")
+    print("   " + "-" * 92)
+    for year, row in cohorts.iterrows():
+        print(f"   {year:<6d} {row['investors']:>10,.0f} ₹{row['invested']:>17,.0f} ₹{row['value']:>17,.0f} "
+              f"{row['median_xirr']:>8.2f}% {row['under_water_pct']:>11.2f}% {row['median_worst_dd']:>12.2f}%")
+
+    if args.out:
+        results.to_csv(args.out, index=False)
+        print(f"\n✅ Saved {len(results):,} investor rows to: {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,417 @@
+#!/usr/bin/env python3
+"""
+Constituent-Level Index Replication
+Rebuilds momentum / value factor indices from stock prices
+
+The stock universe is a (days × stocks) float32 price panel kept in a
+PanelStore (core/panel_store.py) and opened memory-mapped, so a 20-year × 500-stock panel (~10 MB)
+never has to be parsed from CSV again and only the rows a rebalance touches
+are paged in. At each semi-annual rebalance (last trading day of June and
+December, on signals from the end of May and November, as NSE does):
+
+  Momentum  6M and 12M price returns divided by the annualized volatility of
+            1Y daily log returns, z-scored across stocks and averaged 50/50
+  Value     average z-score of earnings, book and dividend yields (E/P, B/P,
+            D/P) — needs the fundamentals arrays in the panel
+
+The average z becomes NSE's normalized score (1 + z if z ≥ 0, else
+1 / (1 − z)), the top `size` stocks are picked with np.argpartition and
+weighted by normalized score with a per-stock cap. Holdings drift with
+prices until the next rebalance, giving a daily index NAV (base 1000).
+
+Free-float market caps are not in the panel, so weights are score-weighted
+rather than score × market cap; tracking error against the official series
+reflects that.
+
+The NAV is written as NSE-format yearly shards plus a monthly CSV (Date,
+Close, YearMonth), so the ratio / SIP / strategy scripts read it exactly as
+they read an official index.
+
+Usage:
+    python3 core/constituents.py synth --out data_synthetic/panel500 --stocks 500 --years 20
+    python3 core/constituents.py build prices.csv --out data_synthetic/panel_nse
+    python3 core/constituents.py backtest data_synthetic/panel500 --out data_synthetic/rep500
+    python3 core/constituents.py backtest panel_nse --compare nifty500 --pipeline
+"""
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+BASE_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(BASE_DIR))
+
+from core.panel_store import PRIMARY_FIELD, PanelStore
+from core.synthetic_data import generate_stock_panel, write_nse_shards
+from core.universe import DATA_DIR, Universe, get_universe
+
+TRADING_DAYS = 252
+STYLES = ('momentum', 'value')
+FUNDAMENTALS = ('ep', 'bp', 'dp')
+REBALANCE_MONTHS = (6, 12)
+
+
+# ============================================================================
+# PRICE PANEL
+# ============================================================================
+
+class StockPanel:
+    """Daily closes (T×N float32) with dates, symbols and optional yields"""
+
+    def __init__(self, dates, symbols, closes, fundamentals=None):
+        self.dates = pd.DatetimeIndex(dates)
+        self.symbols = list(symbols)
+        self.closes = closes
+        self.fundamentals = fundamentals or {}
+        if closes.shape != (len(self.dates), len(self.symbols)):
+            raise ValueError(f"closes shape {closes.shape} does not match "
+                             f"{len(self.dates)} dates × {len(self.symbols)} symbols")
+
+    @property
+    def shape(self):
+        return self.closes.shape
+
+    def save(self, folder):
+        """Write the panel as a PanelStore (closes plus any yield fields)"""
+        fields = {PRIMARY_FIELD: self.closes, **self.fundamentals}
+        return PanelStore.create(folder, self.dates, self.symbols, fields, dtype='float32')
+
+    @classmethod
+    def load(cls, folder):
+        """Open a saved panel; price and yield arrays stay memory-mapped"""
+        return cls.from_store(PanelStore(folder))
+
+    @classmethod
+    def from_store(cls, store, start=None, end=None):
+        """Panel over a PanelStore date range (views into the memmaps, no copy)"""
+        rows = store.rows(start, end)
+        fundamentals = {name: store[name][rows] for name in FUNDAMENTALS if name in store.fields}
+        return cls(store.dates[rows], store.symbols, store.closes[rows], fundamentals)
+
+    @classmethod
+    def from_csv(cls, csv_file):
+        """Panel from a long CSV: Date, Symbol, Close [, EP, BP, DP]"""
+        df = pd.read_csv(csv_file)
+        df.columns = [c.strip() for c in df.columns]
+        df['Date'] = pd.to_datetime(df['Date'])
+        wide = df.pivot_table(index='Date', columns='Symbol', aggfunc='last').sort_index()
+
+        closes = wide['Close'].to_numpy(dtype=np.float32)
+        symbols = [str(s) for s in wide['Close'].columns]
+        fundamentals = {}
+        for name in FUNDAMENTALS:
+            column = name.upper()
+            if column in df.columns:
+                values = wide[column].reindex(columns=wide['Close'].columns)
+                # Yields are reported infrequently: carry the last value forward
+                fundamentals[name] = values.ffill().to_numpy(dtype=np.float32)
+        return cls(wide.index, symbols, closes, fundamentals)
+
+
+# ============================================================================
+# SCORING
+# ============================================================================
+
+def rebalance_schedule(dates, months=REBALANCE_MONTHS):
+    """(signal rows, rebalance rows): month-ends before and of each rebalance month"""
+    dates = pd.DatetimeIndex(dates)
+    period = dates.year * 12 + dates.month
+    month_end = np.flatnonzero(np.append(period[1:] != period[:-1], True))
+
+    rebalance = month_end[np.isin(dates.month[month_end], months)]
+    # The signal is the previous month-end; skip a rebalance without one
+    position = np.searchsorted(month_end, rebalance)
+    has_signal = position > 0
+    return month_end[position[has_signal] - 1], rebalance[has_signal]
+
+
+def zscore(values):
+    """Cross-sectional z-score ignoring NaNs (NaN stays NaN)"""
+    mean = np.nanmean(values)
+    std = np.nanstd(values)
+    if not np.isfinite(std) or std == 0:
+        return np.where(np.isnan(values), np.nan, 0.0)
+    return (values - mean) / std
+
+
+def normalized_score(z):
+    """NSE normalized factor score: 1 + z above zero, 1 / (1 - z) below"""
+    return np.where(z >= 0, 1 + z, 1 / (1 - np.minimum(z, 0)))
+
+
+def momentum_z(closes, row, lookbacks=(126, 252), vol_days=TRADING_DAYS):
+    """Average z-score of risk-adjusted lookback returns at one signal row"""
+    window = max(max(lookbacks), vol_days)
+    if row < window:
+        return np.full(closes.shape[1], np.nan)
+    prices = np.asarray(closes[row - window:row + 1], dtype=np.float64)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        log_returns = np.diff(np.log(prices[-vol_days - 1:]), axis=0)
+        vol = log_returns.std(axis=0, ddof=1) * np.sqrt(TRADING_DAYS)
+        # Eligibility: a full year of prices (NaN anywhere → NaN vol)
+        vol[~(vol > 0)] = np.nan
+        scores = [zscore((prices[-1] / prices[-1 - days] - 1) / vol) for days in lookbacks]
+    return np.mean(scores, axis=0)
+
+
+def value_z(fundamentals, row):
+    """Average z-score of E/P, B/P, D/P at one signal row"""
+    missing = [name for name in FUNDAMENTALS if name not in fundamentals]
+    if missing:
+        raise ValueError(f"value scoring needs {', '.join(missing)} in the panel")
+    scores = [zscore(np.asarray(fundamentals[name][row], dtype=np.float64)) for name in FUNDAMENTALS]
+    return np.mean(scores, axis=0)
+
+
+def select_top(scores, size):
+    """Column indices of the `size` highest scores (fewer if fewer are valid)"""
+    valid = np.flatnonzero(np.isfinite(scores))
+    if len(valid) <= size:
+        return valid
+    top = np.argpartition(-scores[valid], size - 1)[:size]
+    return np.sort(valid[top])
+
+
+def cap_weights(weights, cap):
+    """Scale weights to sum to 1 with no weight above cap, redistributing excess"""
+    weights = np.asarray(weights, dtype=np.float64) / np.sum(weights)
+    cap = max(cap, 1.0 / len(weights))
+    capped = np.zeros(len(weights), dtype=bool)
+    while True:
+        over = (weights > cap + 1e-12) & ~capped
+        if not over.any():
+            return weights
+        capped |= over
+        excess = np.sum(weights[capped] - cap)
+        weights[capped] = cap
+        free = ~capped
+        weights[free] += excess * weights[free] / weights[free].sum()
+
+
+# ============================================================================
+# BACKTEST
+# ============================================================================
+
+class ConstituentBacktest:
+    """Semi-annual factor index replication over a StockPanel"""
+
+    def __init__(self, panel, style='momentum', size=50, cap=0.05, base=1000.0):
+        if style not in STYLES:
+            raise ValueError(f"style must be one of {STYLES}, got {style!r}")
+        self.panel = panel
+        self.style = style
+        self.size = size
+        self.cap = cap
+        self.base = base
+
+    def scores(self, row):
+        if self.style == 'momentum':
+            return momentum_z(self.panel.closes, row)
+        return value_z(self.panel.fundamentals, row)
+
+    def run(self):
+        """Returns (NAV frame with Date, Close; holdings list per rebalance)"""
+        closes = self.panel.closes
+        signals, rebalances = rebalance_schedule(self.panel.dates)
+
+        rebalance_info = []
+        for signal, rebalance in zip(signals, rebalances):
+            # Either style: a pick must still trade on the rebalance day, or its
+            # NaN entry price would carry into the NAV
+            z = np.where(np.isnan(closes[rebalance]), np.nan, self.scores(signal))
+            picks = select_top(z, self.size)
+            if len(picks):
+                rebalance_info.append((signal, rebalance, picks,
+                                       cap_weights(normalized_score(z[picks]), self.cap)))
+        if not rebalance_info:
+            raise ValueError("no rebalance had enough history to score stocks")
+
+        start = rebalance_info[0][1]
+        nav = np.full(len(self.panel.dates) - start, np.nan)
+        level = self.base
+        holdings = []
+        for i, (signal, rebalance, picks, weights) in enumerate(rebalance_info):
+            end = rebalance_info[i + 1][1] if i + 1 < len(rebalance_info) else len(nav) + start - 1
+            # Only the held columns are read; forward-fill from the signal row
+            # so a suspended stock holds its last price
+            block = pd.DataFrame(np.asarray(closes[signal:end + 1, picks], dtype=np.float64)).ffill()
+            block = block.to_numpy()[rebalance - signal:]
+
+            units = level * weights / block[0]
+            path = block @ units
+            nav[rebalance - start:end - start + 1] = path
+            level = path[-1]
+            holdings.append({
+                'date': self.panel.dates[rebalance].strftime('%Y-%m-%d'),
+                'symbols': [self.panel.symbols[j] for j in picks],
+                'weights': np.round(weights, 6).tolist(),
+            })
+
+        df = pd.DataFrame({'Date': self.panel.dates[start:], 'Close': np.round(nav, 2)})
+        return df, holdings
+
+
+def compare_with_official(replica, official):
+    """Tracking statistics of a replicated daily NAV against an official series
+
+    Both frames have Date, Close; only common dates are used.
+    """
+    merged = pd.merge(replica[['Date', 'Close']], official[['Date', 'Close']],
+                      on='Date', suffixes=('_rep', '_off')).dropna()
+    if len(merged) < 2:
+        raise ValueError("replica and official series do not overlap")
+    returns = merged[['Close_rep', 'Close_off']].pct_change().dropna()
+    years = (merged['Date'].iloc[-1] - merged['Date'].iloc[0]).days / 365.25
+
+    def cagr(column):
+        return float(((merged[column].iloc[-1] / merged[column].iloc[0]) ** (1 / years) - 1) * 100)
+
+    active = returns['Close_rep'] - returns['Close_off']
+    return {
+        'start': merged['Date'].iloc[0].strftime('%Y-%m-%d'),
+        'end': merged['Date'].iloc[-1].strftime('%Y-%m-%d'),
+        'days': len(merged),
+        'correlation': round(float(returns['Close_rep'].corr(returns['Close_off'])), 4),
+        'tracking_error': round(float(active.std() * np.sqrt(TRADING_DAYS) * 100), 2),
+        'replica_cagr': round(cagr('Close_rep'), 2),
+        'official_cagr': round(cagr('Close_off'), 2),
+        'cagr_difference': round(cagr('Close_rep') - cagr('Close_off'), 2),
+    }
+
+
+# ============================================================================
+# EXPORT
+# ============================================================================
+
+def export_index(nav, universe, style, data_folder):
+    """Write a replicated NAV as an official-looking index of `universe`
+
+    Shards go to <data_folder>/<mom|val folder>/ and the month-end closes to
+    the universe's monthly CSV, the same files the analysis scripts read.
+    """
+    folder = universe.mom_folder if style == 'momentum' else universe.val_folder
+    index_name = f"{universe.label.upper()} {style.upper()} {universe.size}"
+    write_nse_shards(Path(data_folder) / folder, index_name, nav['Date'], nav['Close'])
+
+    monthly = nav.groupby(nav['Date'].dt.to_period('M')).last().reset_index(drop=True)
+    monthly['YearMonth'] = monthly['Date'].dt.to_period('M')
+    csv_file = universe.mom_monthly_csv if style == 'momentum' else universe.val_monthly_csv
+    csv_file.parent.mkdir(parents=True, exist_ok=True)
+    monthly.to_csv(csv_file, index=False)
+    return csv_file
+
+
+def load_official(universe, style, data_folder=DATA_DIR):
+    sys.path.insert(0, str(BASE_DIR / "nifty500" / "analysis"))
+    from nifty500_sip_returns import SIPAnalyzer
+
+    folder = universe.mom_folder if style == 'momentum' else universe.val_folder
+    return SIPAnalyzer(data_folder).read_and_consolidate_index_data(folder)[['Date', 'Close']]
+
+
+# ============================================================================
+# CLI
+# ============================================================================
+
+def cmd_synth(args):
+    start = time.perf_counter()
+    dates, closes, fundamentals = generate_stock_panel(args.stocks, args.years, args.start_year, args.seed)
+    symbols = [f"STK{j:04d}" for j in range(args.stocks)]
+    StockPanel(dates, symbols, closes, fundamentals).save(args.out)
+    print(f"✅ {len(dates):,} days × {args.stocks} stocks written to {args.out} "
+          f"({time.perf_counter() - start:.1f}s)")
+
+
+def cmd_build(args):
+    panel = StockPanel.from_csv(args.csv)
+    panel.save(args.out)
+    extra = f" + {', '.join(panel.fundamentals)}" if panel.fundamentals else ""
+    print(f"✅ {panel.shape[0]:,} days × {panel.shape[1]} stocks{extra} written to {args.out}")
+
+
+def cmd_backtest(args):
+    panel = StockPanel.from_store(PanelStore(args.panel), args.start, args.end)
+    styles = [s for s in STYLES if s == 'momentum' or panel.fundamentals]
+    if len(styles) < len(STYLES):
+        print("⚠️  No E/P, B/P, D/P arrays in the panel — replicating momentum only")
+
+    official = get_universe(args.compare) if args.compare else None
+    out = Path(args.out) if args.out else None
+    universe = Universe(args.prefix, f"Replicated {args.prefix.upper()}", args.size,
+                        base_dir=out or BASE_DIR)
+
+    print("\n" + "=" * 80)
+    print(f"CONSTITUENT REPLICATION — {panel.shape[1]} stocks × {panel.shape[0]:,} days, "
+          f"top {args.size}, cap {args.cap:.0%}")
+    print("=" * 80)
+
+    for style in styles:
+        start = time.perf_counter()
+        nav, holdings = ConstituentBacktest(panel, style, args.size, args.cap).run()
+        years = (nav['Date'].iloc[-1] - nav['Date'].iloc[0]).days / 365.25
+        cagr = ((nav['Close'].iloc[-1] / nav['Close'].iloc[0]) ** (1 / years) - 1) * 100
+        print(f"\n📈 {style.title()}: {len(holdings)} rebalances, {nav['Date'].iloc[0]:%Y-%m-%d} "
+              f"to {nav['Date'].iloc[-1]:%Y-%m-%d}, CAGR {cagr:.2f}% ({time.perf_counter() - start:.2f}s)")
+
+        if official:
+            stats = compare_with_official(nav, load_official(official, style))
+            print(f"   vs official {official.label} {style}: correlation {stats['correlation']:.3f}, "
+                  f"tracking error {stats['tracking_error']:.2f}%, "
+                  f"CAGR {stats['replica_cagr']:.2f}% vs {stats['official_cagr']:.2f}%")
+
+        if out:
+            csv_file = export_index(nav, universe, style, out)
+            with open(universe.output_dir / f"{universe.name}_{style}_holdings.json", 'w') as f:
+                json.dump(holdings, f, indent=2)
+            print(f"   ✅ Shards in {out / (universe.mom_folder if style == 'momentum' else universe.val_folder)}, "
+                  f"monthly closes in {csv_file}")
+
+    if args.pipeline:
+        if not out or len(styles) < len(STYLES):
+            print("\n⚠️  --pipeline needs --out and both momentum and value indices")
+            return
+        from core.universe_pipeline import UniversePipeline
+        summary = UniversePipeline(universe, out).run()
+        print(f"\n✅ Pipeline on replicated indices: SIP XIRR {summary['sip_xirr']:.2f}%, "
+              f"outputs in {universe.output_dir}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Constituent-level factor index replication")
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    synth = sub.add_parser('synth', help="generate a synthetic stock panel")
+    synth.add_argument('--out', type=Path, default=BASE_DIR / "data_synthetic" / "panel")
+    synth.add_argument('--stocks', type=int, default=500)
+    synth.add_argument('--years', type=int, default=20)
+    synth.add_argument('--start-year', type=int, default=2005)
+    synth.add_argument('--seed', type=int, default=0)
+
+    build = sub.add_parser('build', help="build a panel from a long CSV (Date, Symbol, Close[, EP, BP, DP])")
+    build.add_argument('csv', type=Path)
+    build.add_argument('--out', type=Path, required=True)
+
+    backtest = sub.add_parser('backtest', help="replicate momentum/value indices from a panel")
+    backtest.add_argument('panel', type=Path)
+    backtest.add_argument('--start', help="first date of the panel to use")
+    backtest.add_argument('--end', help="last date of the panel to use")
+    backtest.add_argument('--size', type=int, default=50, help="stocks per index")
+    backtest.add_argument('--cap', type=float, default=0.05, help="max weight per stock")
+    backtest.add_argument('--prefix', default='rep500', help="universe name for exported indices")
+    backtest.add_argument('--out', type=Path, help="data folder for NSE shards + outputs")
+    backtest.add_argument('--compare', help="registered universe whose official indices to compare with")
+    backtest.add_argument('--pipeline', action='store_true',
+                          help="run the full universe pipeline on the exported indices")
+
+    args = parser.parse_args()
+    {'synth': cmd_synth, 'build': cmd_build, 'backtest': cmd_backtest}[args.command](args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,256 @@
+#!/usr/bin/env python3
+"""
+Contribution Schedules
+SIP with step-ups, pauses, top-ups and inflation-indexed amounts, vectorized
+
+SIPAnalyzer.calculate_sip_returns and run_sip_on_portfolio invest a constant
+monthly_sip. Here a contribution schedule is an array of monthly amounts, and
+a set of schedules is an S×M matrix; NAV series are an M×N matrix on the
+same month-ends. Every (schedule, series) pair is evaluated at once by
+broadcasting to S×M×N:
+
+    units[s, m, n]    = Σ_{k≤m} amount[s, k] / nav[k, n]
+    value[s, m, n]    = units[s, m, n] × nav[m, n]
+    invested[s, m]    = Σ_{k≤m} amount[s, k]
+
+and XIRR for all S×N cash-flow series comes from one vectorized Newton solve
+(core.xirr.xirr_columns). With a constant schedule the units, value and
+drawdowns are the same computation as the existing SIP code and XIRR agrees
+to solver tolerance.
+
+Schedules are built from a base amount and a spec of comma-separated terms:
+
+    stepup=10            +10% every 12 months (stepup=10:6 → every 6 months)
+    inflation=6          indexed to 6% annual inflation, compounded monthly
+    pause=36:48          nothing invested in months 36-47 (0 = first month)
+    topup=120:500000     one-off 500000 in month 120 (repeatable)
+
+Usage:
+    python3 core/contributions.py                           # nifty500 indices + strategies
+    python3 core/contributions.py --universe nifty200 --sip 25000
+    python3 core/contributions.py --schedule constant --schedule "stepup=10,pause=24:36"
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+BASE_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(BASE_DIR))
+
+from core.universe import DATA_DIR, UNIVERSES, get_universe
+from core.xirr import xirr_columns
+
+DEFAULT_SCHEDULES = ['constant', 'stepup=10', 'inflation=6', 'pause=36:48', 'topup=120:500000']
+
+
+# ============================================================================
+# SCHEDULES
+# ============================================================================
+
+def constant(months, amount):
+    return np.full(months, float(amount))
+
+
+def step_up(months, amount, pct, every=12):
+    """amount raised by pct% every `every` months"""
+    if every < 1:
+        raise ValueError(f"step-up interval must be at least 1 month, got {every}")
+    return float(amount) * (1 + pct / 100.0) ** (np.arange(months) // every)
+
+
+def inflation_indexed(months, amount, annual_pct=None, index=None):
+    """amount kept constant in real terms: a flat annual rate or a price-index array"""
+    if index is not None:
+        index = np.asarray(index, dtype=float)[:months]
+        return float(amount) * index / index[0]
+    return float(amount) * (1 + annual_pct / 100.0) ** (np.arange(months) / 12.0)
+
+
+def pause(schedule, start, stop):
+    """No contribution in months [start, stop)"""
+    schedule = np.array(schedule, dtype=float)
+    if not 0 <= start < len(schedule) or stop <= start:
+        raise ValueError(f"pause {start}:{stop} must start within months 0-{len(schedule) - 1} "
+                         f"and end after it starts")
+    schedule[start:stop] = 0.0
+    return schedule
+
+
+def top_up(schedule, month, amount):
+    """One-off extra contribution in a given month"""
+    schedule = np.array(schedule, dtype=float)
+    if not 0 <= month < len(schedule):
+        raise ValueError(f"top-up month {month} is outside months 0-{len(schedule) - 1}")
+    schedule[month] += amount
+    return schedule
+
+
+def parse_schedule(spec, months, amount):
+    """Monthly amounts for a spec such as 'stepup=10,pause=24:36,topup=60:100000'"""
+    schedule = constant(months, amount)
+    if spec.strip() in ('', 'constant'):
+        return schedule
+
+    terms = [t.strip().partition('=') for t in spec.split(',') if t.strip()]
+    # Amount-shaping terms first, then pauses and top-ups on the result
+    for key, _, value in sorted(terms, key=lambda t: t[0] not in ('stepup', 'inflation')):
+        args = [float(v) for v in value.split(':')] if value else []
+        if key == 'stepup' and len(args) in (1, 2):
+            schedule = schedule / amount * step_up(months, amount, args[0], int(args[1]) if len(args) > 1 else 12)
+        elif key == 'inflation' and len(args) == 1:
+            schedule = schedule / amount * inflation_indexed(months, amount, args[0])
+        elif key == 'pause' and len(args) == 2:
+            schedule = pause(schedule, int(args[0]), int(args[1]))
+        elif key == 'topup' and len(args) == 2:
+            schedule = top_up(schedule, int(args[0]), args[1])
+        else:
+            raise ValueError(f"Cannot parse schedule term {key}={value!r} in {spec!r}")
+    return schedule
+
+
+def schedule_matrix(specs, months, amount):
+    """S×M amounts for a list of specs (or {name: array} of ready-made schedules)"""
+    if isinstance(specs, dict):
+        return list(specs), np.vstack([np.asarray(s, dtype=float)[:months] for s in specs.values()])
+    return list(specs), np.vstack([parse_schedule(spec, months, amount) for spec in specs])
+
+
+# ============================================================================
+# ENGINE
+# ============================================================================
+
+def run_schedules(dates, navs, schedules, paths=False):
+    """SIP for every schedule × NAV series
+
+    dates:     contribution dates, M vector or M×N (each series' own month-ends)
+    navs:      M×N NAVs (or M vector); NaN where a series has no NAV that
+               month (no contribution is made then), last row complete
+    schedules: S×M monthly amounts (or M vector)
+
+    Returns {metric: S×N array}: units, invested, value, gain_pct, xirr,
+    max_drawdown (portfolio value from its peak), max_investor_drawdown
+    (value vs invested capital), max_equity_multiple_dd (value / invested from
+    its peak, as SIPAnalyzer.calculate_invested_capital_drawdown). With
+    paths=True also the S×M×N units, value and invested paths.
+    """
+    navs = np.asarray(navs, dtype=float)
+    navs = navs[:, None] if navs.ndim == 1 else navs
+    amounts = np.atleast_2d(np.asarray(schedules, dtype=float))
+    if amounts.shape[1] != len(navs):
+        raise ValueError(f"Schedules cover {amounts.shape[1]} months, NAVs {len(navs)}")
+    if np.isnan(navs[-1]).any():
+        raise ValueError("Every series needs a NAV in the last month")
+
+    listed = ~np.isnan(navs)
+    paid = np.where(listed[None], amounts[:, :, None], 0.0)                  # S×M×N
+    units = np.cumsum(np.divide(paid, navs[None], out=np.zeros_like(paid), where=listed[None]), axis=1)
+    value = units * navs[None]
+    invested = np.cumsum(paid, axis=1)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        peak = np.fmax.accumulate(value, axis=1)
+        drawdown = (value - peak) / peak * 100
+        investor_dd = np.where(invested > 0, (value - invested) / invested * 100, np.nan)
+        multiple = np.where(invested > 0, value / invested, np.nan)
+        multiple_peak = np.fmax.accumulate(multiple, axis=1)
+        multiple_dd = (multiple - multiple_peak) / multiple_peak * 100
+
+    # Day offsets per series (flows of 0 in months without a NAV carry no weight)
+    dates = pd.DataFrame(np.asarray(dates).reshape(len(navs), -1)).apply(pd.to_datetime)
+    day = dates.apply(lambda d: (d - d.min()).dt.days).fillna(0).to_numpy()
+    day = np.broadcast_to(day, navs.shape)
+    flows = np.concatenate([-paid.transpose(1, 0, 2), value[:, -1][None]])   # (M+1)×S×N
+    flow_days = np.concatenate([day, day[-1:]])[:, None, :]
+    xirr = xirr_columns(np.broadcast_to(flow_days, flows.shape), flows)
+
+    result = {
+        'units': units[:, -1],
+        'invested': invested[:, -1],
+        'value': value[:, -1],
+        'gain_pct': (value[:, -1] - invested[:, -1]) / invested[:, -1] * 100,
+        'xirr': xirr,
+        'max_drawdown': np.nanmin(drawdown, axis=1),
+        'max_investor_drawdown': np.nanmin(investor_dd, axis=1),
+        'max_equity_multiple_dd': np.nanmin(multiple_dd, axis=1),
+    }
+    if paths:
+        result.update({'units_path': units, 'value_path': value, 'invested_path': invested})
+    return result
+
+
+# ============================================================================
+# DATA
+# ============================================================================
+
+def monthly_navs(universe, data_folder=DATA_DIR):
+    """(navs, dates): month-end NAVs of the universe's indices and strategies
+
+    Both frames are indexed by month. Each index keeps its own month-end
+    dates; the strategies run on the two indices' common month-end dates (as
+    the published backtests do), so they have no row in a month where the
+    indices' last trading days differ.
+    """
+    from core.sip_timing import strategy_portfolios
+
+    u = get_universe(universe)
+    frames = {}
+    for label, path in ((f'{u.label} Momentum', u.mom_monthly_csv), (f'{u.label} Value', u.val_monthly_csv)):
+        df = pd.read_csv(path, usecols=['Date', 'Close'])
+        frames[label] = df.rename(columns={'Close': 'NAV'}).assign(Date=pd.to_datetime(df['Date']))
+
+    mom, val = frames.values()
+    merged = pd.merge(mom.rename(columns={'NAV': 'Close_mom'}), val.rename(columns={'NAV': 'Close_val'}),
+                      on='Date', how='inner')
+    portfolios = strategy_portfolios(universe, merged, data_folder,
+                                     mom=mom.rename(columns={'NAV': 'Close'}))
+    for name, portfolio in portfolios.items():
+        frames[name] = portfolio[['Date', 'Portfolio_NAV']].rename(columns={'Portfolio_NAV': 'NAV'})
+
+    navs, dates = {}, {}
+    for name, df in frames.items():
+        df = df.set_index(df['Date'].dt.to_period('M'))
+        navs[name], dates[name] = df['NAV'], df['Date']
+    return pd.DataFrame(navs).sort_index(), pd.DataFrame(dates).sort_index()
+
+
+# ============================================================================
+# MAIN
+# ============================================================================
+
+def main():
+    parser = argparse.ArgumentParser(description="SIP with variable contribution schedules")
+    parser.add_argument('--universe', default='nifty500', choices=list(UNIVERSES))
+    parser.add_argument('--sip', type=float, default=10000, help="base monthly amount")
+    parser.add_argument('--schedule', action='append', metavar='SPEC',
+                        help=f"e.g. \"stepup=10,pause=24:36\" (repeatable; default {DEFAULT_SCHEDULES})")
+    args = parser.parse_args()
+
+    navs, dates = monthly_navs(args.universe)
+    try:
+        names, amounts = schedule_matrix(args.schedule or DEFAULT_SCHEDULES, len(navs), args.sip)
+    except ValueError as e:
+        parser.error(str(e))
+
+    start = time.perf_counter()
+    result = run_schedules(dates.to_numpy(), navs.to_numpy(), amounts)
+    elapsed = time.perf_counter() - start
+
+    print(f"\n💸 {get_universe(args.universe).label}: {len(names)} schedules × {navs.shape[1]} series × "
+          f"{len(navs)} months in {elapsed * 1000:.1f} ms")
+    for j, series in enumerate(navs.columns):
+        print(f"\n{series}")
+        print(f"   {'Schedule':<28s} {'Invested':>14s} {'Final Value':>16s} {'XIRR':>8s} {'MaxDD':>8s} {'InvDD':>8s}")
+        print("   " + "-" * 86)
+        for i, name in enumerate(names):
+            print(f"   {name:<28s} ₹{result['invested'][i, j]:>13,.0f} ₹{result['value'][i, j]:>15,.0f} "
+                  f"{result['xirr'][i, j]:>7.2f}% {result['max_drawdown'][i, j]:>7.2f}% "
+                  f"{result['max_investor_drawdown'][i, j]:>7.2f}%")
+
+
+if __name__ == "__main__":
+    main()
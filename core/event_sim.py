@@ -0,0 +1,356 @@
+#!/usr/bin/env python3
+"""
+Event-Driven Daily Simulator
+Signals, orders with T+N settlement, SIP cash and rebalances on daily closes
+
+The monthly backtests model execution as `w_mom.shift(1)`: the signal at a
+month-end close is traded at that same close and money moves instantly.
+Here everything that happens is an event on a heap keyed by (trading day,
+priority, sequence), processed against daily closes:
+
+  SETTLE     sell proceeds become cash / bought units become sellable
+  CASH_IN    an SIP instalment arrives (month-end or a calendar day)
+  SIGNAL     the strategy callback sees the close and returns target
+             weights; a REBALANCE is scheduled `lag` trading days later
+  REBALANCE  sell overweight sleeves at the close (proceeds settle T+N),
+             then INVEST
+  INVEST     buy underweight sleeves with settled cash at the close (units
+             settle T+N); pending proceeds trigger another INVEST when
+             they settle
+
+Every event is pushed and popped once, so a run costs O(E log E) for E
+events plus one valuation per trading day.
+
+Strategies plug in as signal callbacks, callback(date, prices, month_end)
+→ {asset: weight} or None. The callback is called on every decision day
+(month-ends, week-ends or every day) and on every month-end. The existing
+strategies come in through their incremental state machines
+(core/incremental.py RotationState / MomcashState): month-end closes are
+folded into the state; a decision between month-ends evaluates the
+monthly rule on a copy, with today's close as the current month's
+provisional close. With month-end decisions, lag 0 and settlement 0 the
+simulator reproduces the monthly backtest's SIP on month-end closes.
+
+Usage:
+    python3 core/event_sim.py                                   # MOMCASH, monthly, lag 1, T+1
+    python3 core/event_sim.py --strategy rotation --universe nifty200 --decisions W
+    python3 core/event_sim.py --lag 2 --settle 3 --sip-day 5
+"""
+
+import argparse
+import copy
+import heapq
+import sys
+import time
+from collections import deque
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+BASE_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(BASE_DIR))
+
+from core.incremental import MomcashState, RotationState
+from core.sip_timing import cash_index, execution_rows, load_daily_closes, month_bounds
+from core.universe import DATA_DIR, UNIVERSES
+from core.xirr import calculate_xirr
+
+# Event kinds, in processing order within a day
+SETTLE, CASH_IN, SIGNAL, REBALANCE, INVEST = range(5)
+EVENT_NAMES = ('settle', 'cash_in', 'signal', 'rebalance', 'invest')
+
+DECISIONS = ('M', 'W', 'D')      # month-ends, last trading day of each week, every day
+LAG = 1                          # trading days from signal to orders
+SETTLE_DAYS = 1                  # T+N
+EPS = 1e-9
+
+
+# ============================================================================
+# SIGNAL CALLBACKS
+# ============================================================================
+
+class StateSignal:
+    """Signal callback around an incremental strategy state (update(close), allocation())
+
+    weights: {allocation key: asset}, e.g. {'w_mom': 'mom', 'w_val': 'val'}
+    """
+
+    def __init__(self, state, weights, asset='mom'):
+        self.state = state
+        self.weights = weights
+        self.asset = asset
+
+    def __call__(self, date, prices, month_end):
+        state = self.state
+        if month_end:
+            state.update(prices[self.asset])
+        else:
+            state = _clone(state)
+            state.update(prices[self.asset])
+        allocation = state.allocation()
+        return {asset: allocation[key] for key, asset in self.weights.items()}
+
+
+def _clone(state):
+    """Copy of a state whose mutable parts are deques of floats (cheaper than deepcopy)"""
+    clone = copy.copy(state)
+    for name, value in vars(state).items():
+        if isinstance(value, deque):
+            setattr(clone, name, value.copy())
+    return clone
+
+
+STRATEGIES = {
+    'rotation': (('mom', 'val'), lambda: StateSignal(RotationState(), {'w_mom': 'mom', 'w_val': 'val'})),
+    'momcash': (('mom', 'cash'), lambda: StateSignal(MomcashState(), {'w_mom': 'mom', 'w_cash': 'cash'})),
+}
+
+
+# ============================================================================
+# SIMULATOR
+# ============================================================================
+
+def decision_days(dates, decisions='M'):
+    """Row positions of the decision days: month-ends, week-ends or every day"""
+    if decisions not in DECISIONS:
+        raise ValueError(f"decisions must be one of {DECISIONS}, got {decisions!r}")
+    dates = pd.DatetimeIndex(dates)
+    if decisions == 'D':
+        return np.arange(len(dates))
+    if decisions == 'M':
+        return month_bounds(dates)[1]
+    week = dates.to_period('W').asi8
+    return np.flatnonzero(np.append(week[1:] != week[:-1], True))
+
+
+class EventSimulator:
+    """Cash, units (settled + pending) and the event heap for one run"""
+
+    def __init__(self, prices, signal, lag=LAG, settle=SETTLE_DAYS):
+        """
+        prices: daily closes, one column per asset (DataFrame indexed by Date)
+        signal: callback(date, {asset: close}, month_end) → {asset: weight} or None
+        """
+        self.dates = pd.DatetimeIndex(prices.index)
+        self.assets = list(prices.columns)
+        self.p = prices.to_numpy(dtype=float)
+        self.signal = signal
+        self.lag = lag
+        self.settle = settle
+
+        self.heap = []
+        self._seq = 0
+        self.cash = 0.0                      # settled, available to buy
+        self.receivable = 0.0                # sell proceeds not yet settled
+        self.units = np.zeros(len(self.assets))      # settled (sellable)
+        self.pending = np.zeros(len(self.assets))    # bought, not yet settled
+        self.target = None
+        self.orders = []
+        self.events = 0
+
+    def push(self, day, kind, payload=None):
+        if day < len(self.dates):
+            heapq.heappush(self.heap, (day, kind, self._seq, payload))
+            self._seq += 1
+
+    def value(self, day):
+        return (self.units + self.pending) @ self.p[day] + self.cash + self.receivable
+
+    # ---- handlers ---------------------------------------------------------
+
+    def on_settle(self, day, payload):
+        kind, amount = payload[0], payload[-1]
+        if kind == 'cash':
+            self.receivable -= amount
+            self.cash += amount
+            self.push(day, INVEST)
+        else:
+            self.pending[payload[1]] -= amount
+            self.units[payload[1]] += amount
+
+    def on_cash_in(self, day, amount):
+        self.cash += amount
+        self.push(day, INVEST)
+
+    def on_signal(self, day, decide):
+        prices = dict(zip(self.assets, self.p[day]))
+        month_end = decide[1]
+        weights = self.signal(self.dates[day], prices, month_end)
+        if decide[0] and weights is not None:
+            target = np.array([weights.get(a, 0.0) for a in self.assets], dtype=float)
+            self.push(day + self.lag, REBALANCE, target)
+
+    def on_rebalance(self, day, target):
+        self.target = target
+        price = self.p[day]
+        surplus = (self.units + self.pending) * price - self.value(day) * target
+        for j in np.flatnonzero(surplus > EPS):
+            units = min(surplus[j] / price[j], self.units[j])     # only settled units can be sold
+            if units > EPS:
+                self._trade(day, j, -units)
+        self.on_invest(day)
+
+    def on_invest(self, day, payload=None):
+        if self.target is None or self.cash <= EPS:
+            return
+        price = self.p[day]
+        deficit = np.maximum(self.value(day) * self.target - (self.units + self.pending) * price, 0.0)
+        if deficit.sum() <= EPS:
+            return
+        spend = deficit * min(1.0, self.cash / deficit.sum())
+        for j in np.flatnonzero(spend > EPS):
+            self._trade(day, j, spend[j] / price[j])
+
+    def _trade(self, day, j, units):
+        """Execute at the day's close; cash (sell) or units (buy) settle T+N"""
+        amount = units * self.p[day, j]
+        if units < 0:
+            self.units[j] += units
+            if self.settle:
+                self.receivable -= amount
+                self.push(day + self.settle, SETTLE, ('cash', -amount))
+            else:
+                self.cash -= amount
+        else:
+            self.cash -= amount
+            if self.settle:
+                self.pending[j] += units
+                self.push(day + self.settle, SETTLE, ('units', j, units))
+            else:
+                self.units[j] += units
+        self.orders.append((day, self.assets[j], units, amount))
+
+    # ---- run --------------------------------------------------------------
+
+    def run(self, sip_rows, sip=10000, decisions='M'):
+        """Process every event; returns the daily frame (Date, Value, Cash, Receivable, w_<asset>)"""
+        month_ends = set(month_bounds(self.dates)[1].tolist())
+        decide = set(decision_days(self.dates, decisions).tolist())
+        for day in sorted(month_ends | decide):
+            self.push(day, SIGNAL, (day in decide, day in month_ends))
+        for day in sip_rows:
+            self.push(int(day), CASH_IN, float(sip))
+
+        handlers = {SETTLE: self.on_settle, CASH_IN: self.on_cash_in, SIGNAL: self.on_signal,
+                    REBALANCE: self.on_rebalance, INVEST: self.on_invest}
+        values = np.zeros(len(self.dates))
+        cash = np.zeros(len(self.dates))
+        receivable = np.zeros(len(self.dates))
+        holdings = np.zeros((len(self.dates), len(self.assets)))
+        for day in range(len(self.dates)):
+            while self.heap and self.heap[0][0] == day:
+                _, kind, _, payload = heapq.heappop(self.heap)
+                handlers[kind](day, payload)
+                self.events += 1
+            holdings[day] = (self.units + self.pending) * self.p[day]
+            values[day] = holdings[day].sum() + self.cash + self.receivable
+            cash[day], receivable[day] = self.cash, self.receivable
+
+        frame = pd.DataFrame({'Date': self.dates, 'Value': values, 'Cash': cash, 'Receivable': receivable})
+        with np.errstate(divide='ignore', invalid='ignore'):
+            for j, asset in enumerate(self.assets):
+                frame[f'w_{asset}'] = np.where(values > 0, holdings[:, j] / values, 0.0)
+        return frame
+
+
+# ============================================================================
+# DRIVER
+# ============================================================================
+
+def sip_days(dates, sip_day=0):
+    """Rows of the SIP instalments: month-end (0) or first trading day on/after a calendar day"""
+    if not sip_day:
+        return month_bounds(dates)[1]
+    return execution_rows(dates, [sip_day], 'calendar')[:, 0]
+
+
+def strategy_prices(universe, strategy, data_folder=DATA_DIR):
+    """Daily closes of the strategy's assets (MOMCASH's cash as a compounding index)"""
+    from nifty500cash_strategy import CASH_MONTHLY_RETURN
+
+    closes = load_daily_closes(universe, data_folder)
+    assets = STRATEGIES[strategy][0]
+    if 'cash' in assets:
+        closes = closes.assign(cash=cash_index(closes.index, CASH_MONTHLY_RETURN))
+    return closes[list(assets)]
+
+
+def simulate(prices, strategy='momcash', decisions='M', lag=LAG, settle=SETTLE_DAYS, sip=10000,
+             sip_day=0, signal=None):
+    """One event-driven SIP run → (metrics dict, daily frame, orders frame)"""
+    signal = signal or STRATEGIES[strategy][1]()
+    sim = EventSimulator(prices, signal, lag, settle)
+    rows = sip_days(prices.index, sip_day)
+    frame = sim.run(rows, sip, decisions)
+
+    dates = pd.DatetimeIndex(prices.index)
+    final = frame['Value'].iloc[-1]
+    flows = [(dates[r], -float(sip)) for r in rows] + [(dates[-1], final)]
+    value = frame['Value'].to_numpy()
+    invested = np.cumsum(np.isin(np.arange(len(dates)), rows) * float(sip))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        investor_dd = np.where(invested > 0, (value - invested) / invested * 100, np.nan)
+    idle = (frame['Cash'] + frame['Receivable']) / frame['Value'].where(value > 0)
+    metrics = {
+        'final_value': final,
+        'invested': invested[-1],
+        'sip_xirr': calculate_xirr(flows),
+        'max_investor_drawdown': np.nanmin(investor_dd),
+        'orders': len(sim.orders),
+        'events': sim.events,
+        'avg_cash_pct': max(float(idle.mean()) * 100, 0.0),
+    }
+    orders = pd.DataFrame(sim.orders, columns=['day', 'asset', 'units', 'amount'])
+    orders.insert(0, 'Date', dates[orders.pop('day').to_numpy()] if len(orders) else pd.DatetimeIndex([]))
+    return metrics, frame, orders
+
+
+# ============================================================================
+# MAIN
+# ============================================================================
+
+def main():
+    parser = argparse.ArgumentParser(description="Event-driven daily SIP simulation with execution lag")
+    parser.add_argument('--universe', default='nifty500', choices=list(UNIVERSES))
+    parser.add_argument('--strategy', choices=list(STRATEGIES), default='momcash')
+    parser.add_argument('--decisions', choices=DECISIONS, default='M',
+                        help="decide at month-ends, week-ends or every day")
+    parser.add_argument('--lag', type=int, default=LAG, help="trading days from signal to orders")
+    parser.add_argument('--settle', type=int, default=SETTLE_DAYS, help="T+N settlement, trading days")
+    parser.add_argument('--sip', type=float, default=10000)
+    parser.add_argument('--sip-day', type=int, default=0, help="calendar day of the instalment (0 = month-end)")
+    parser.add_argument('--out', type=Path, help="write the daily frame to this CSV")
+    args = parser.parse_args()
+
+    prices = strategy_prices(args.universe, args.strategy)
+    runs = {'Backtest convention (M, lag 0, T+0, month-end SIP)': dict(decisions='M', lag=0, settle=0, sip_day=0),
+            f'{args.decisions}, lag {args.lag}, T+{args.settle}, '
+            f'{"month-end" if not args.sip_day else f"day {args.sip_day}"} SIP':
+                dict(decisions=args.decisions, lag=args.lag, settle=args.settle, sip_day=args.sip_day)}
+
+    print("\n" + "=" * 96)
+    print(f"⏱️  EVENT-DRIVEN SIMULATION — {args.strategy}, {args.universe}, {len(prices)} trading days "
+          f"({prices.index[0]:%Y-%m-%d} to {prices.index[-1]:%Y-%m-%d})")
+    print("=" * 96)
+    print(f"   {'Run':<52s} {'XIRR':>7s} {'Final Value':>14s} {'InvDD':>8s} {'Orders':>7s} "
+          f"{'Events':>7s} {'Cash':>6s} {'ms':>6s}")
+    print("   " + "-" * 113)
+    for label, params in runs.items():
+        start = time.perf_counter()
+        try:
+            metrics, frame, _ = simulate(prices, args.strategy, sip=args.sip, **params)
+        except ValueError as e:
+            parser.error(str(e))
+        elapsed = (time.perf_counter() - start) * 1000
+        print(f"   {label:<52s} {metrics['sip_xirr']:>6.2f}% ₹{metrics['final_value']:>13,.0f} "
+              f"{metrics['max_investor_drawdown']:>7.2f}% {metrics['orders']:>7d} {metrics['events']:>7d} "
+              f"{metrics['avg_cash_pct']:>5.2f}% {elapsed:>6.0f}")
+
+    if args.out:
+        frame.to_csv(args.out, index=False)
+        print(f"\n✅ Saved {len(frame)} days to: {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""
+Compact Strategy Frames
+Smaller in-memory representation of portfolio frames, plus a per-column memory report
+
+A strategy frame mixes three kinds of columns:
+  - values that feed money math (closes, returns, weights, NAVs): kept float64
+  - derived, display-only signals (z-scores, percentiles, score points): float32
+  - scratch intermediates (rolling means/peaks used to derive other columns): dropped
+
+and a few label columns (regime, allocation tier) that are Python-object
+strings; these become categoricals (int8 codes + one copy of each label).
+Each strategy declares its columns in a CompactSchema; compact_frame()
+applies it. Comparisons like df['regime'] == 'momentum', value_counts()
+and to_csv() behave as before on the compacted frame.
+"""
+
+import numpy as np
+import pandas as pd
+
+
+class CompactSchema:
+    """Column groups of one strategy frame"""
+
+    def __init__(self, float32=(), categorical=None, drop=()):
+        self.float32 = list(float32)
+        # column → categories (ordered as listed) or None to infer
+        self.categorical = dict(categorical or {})
+        self.drop = list(drop)
+
+
+def compact_frame(df, schema, drop_scratch=True):
+    """Copy of df with the schema's dtypes applied (and scratch columns dropped)"""
+    out = df.drop(columns=[c for c in schema.drop if c in df.columns]) if drop_scratch else df.copy()
+
+    for column in schema.float32:
+        if column in out.columns and out[column].dtype == np.float64:
+            out[column] = out[column].astype(np.float32)
+
+    for column, categories in schema.categorical.items():
+        if column in out.columns and not isinstance(out[column].dtype, pd.CategoricalDtype):
+            out[column] = pd.Categorical(out[column], categories=categories)
+
+    return out
+
+
+def memory_report(df, name=None, show=True):
+    """Bytes per column (deep, incl. string payloads), largest first
+
+    Returns a DataFrame with column, dtype, bytes and share of the total.
+    """
+    usage = df.memory_usage(deep=True, index=False)
+    report = pd.DataFrame({
+        'column': usage.index,
+        'dtype': [str(df[c].dtype) for c in usage.index],
+        'bytes': usage.values,
+    }).sort_values('bytes', ascending=False, kind='stable').reset_index(drop=True)
+    total = int(report['bytes'].sum())
+    report['pct'] = (report['bytes'] / total * 100).round(1) if total else 0.0
+
+    if show:
+        print(f"\n🧮 Memory report{f' — {name}' if name else ''}: {len(df)} rows × {df.shape[1]} columns, "
+              f"{total / 1024:.1f} KB")
+        for row in report.itertuples():
+            print(f"   {row.column:<28s} {row.dtype:<15s} {row.bytes:>10,d} B  {row.pct:>5.1f}%")
+    return report
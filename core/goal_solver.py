@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+"""
+Goal-Based SIP Solver
+Monthly SIP needed to reach a target corpus in N years with P% confidence
+
+A return path is N × 12 monthly instalments' worth of a strategy's monthly
+returns, either every historical window of that length or block-bootstrapped
+draws (12-month blocks, so momentum runs and crashes stay intact). With
+instalments at each month-end and the corpus valued at the last one (the
+SIPAnalyzer convention), a path's terminal value is linear in the SIP:
+
+    value[p] = sip × Σ_k weight[k] × G[p, k]  +  lump_sum × G[p, 0]
+    G[p, k]  = Π_{j≥k} (1 + r[p, j])           growth from instalment k to the end
+
+where weight[k] is the step-up schedule (1 for a flat SIP). So each path's
+required SIP is exact, (target - lump_sum × G[p, 0]) / Σ_k weight[k] G[p, k],
+and the SIP that reaches the target on P% of paths is the P-th percentile
+of those — no search over candidate amounts is needed. success_curve()
+evaluates a grid of candidate SIPs against every path at once for the
+probability-of-success chart.
+
+Strategies: rotation (Simple Momentum), MOMCASH (nifty500) and the pure
+momentum index. dashboard/scenario_api.py serves the same solve on its
+preloaded returns as /api/goal.
+
+Usage:
+    python3 core/goal_solver.py --target 10000000 --years 15
+    python3 core/goal_solver.py --target 50000000 --years 20 --confidence 95 --step-up 10
+    python3 core/goal_solver.py --target 10000000 --years 10 --method historical --universe nifty200
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+BASE_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(BASE_DIR))
+
+from core.contributions import step_up
+from core.universe import DATA_DIR, UNIVERSES, get_universe
+
+METHODS = ('bootstrap', 'historical')
+N_PATHS = 5000
+BLOCK_MONTHS = 12
+CONFIDENCE = 90               # % of paths that must reach the target
+CURVE_POINTS = 21
+SEED = 42
+
+
+# ============================================================================
+# RETURN PATHS
+# ============================================================================
+
+def historical_paths(returns, months):
+    """Every window of months - 1 consecutive monthly returns (paths × months - 1)"""
+    returns = np.asarray(returns, dtype=float)
+    returns = returns[~np.isnan(returns)]
+    if months - 1 > len(returns):
+        raise ValueError(f"Only {len(returns) / 12:.1f} years of history for a {months / 12:g}-year goal; "
+                         f"use the bootstrap method")
+    return np.lib.stride_tricks.sliding_window_view(returns, max(months - 1, 0))
+
+
+def bootstrap_paths(returns, months, n_paths=N_PATHS, block=BLOCK_MONTHS, seed=SEED):
+    """n_paths circular block-bootstrap draws of months - 1 monthly returns"""
+    returns = np.asarray(returns, dtype=float)
+    returns = returns[~np.isnan(returns)]
+    n_blocks = -(-(months - 1) // block)
+    starts = np.random.default_rng(seed).integers(0, len(returns), (n_paths, n_blocks))
+    rows = (starts[:, :, None] + np.arange(block)) % len(returns)
+    return returns[rows.reshape(n_paths, -1)[:, :months - 1]]
+
+
+def return_paths(returns, months, method='bootstrap', n_paths=N_PATHS, block=BLOCK_MONTHS, seed=SEED):
+    if method not in METHODS:
+        raise ValueError(f"method must be one of {METHODS}, got {method!r}")
+    if method == 'historical':
+        return historical_paths(returns, months)
+    return bootstrap_paths(returns, months, n_paths, block, seed)
+
+
+def growth_to_end(paths):
+    """paths × months growth factor from each instalment to the last one"""
+    growth = np.ones((len(paths), paths.shape[1] + 1))
+    growth[:, :-1] = np.cumprod((1 + paths)[:, ::-1], axis=1)[:, ::-1]
+    return growth
+
+
+# ============================================================================
+# SOLVER
+# ============================================================================
+
+def required_sips(growth, target, weights, lump_sum=0.0):
+    """Per path: the SIP that lands exactly on target (0 if the lump sum alone does)"""
+    per_rupee = growth @ weights
+    return np.maximum((target - lump_sum * growth[:, 0]) / per_rupee, 0.0)
+
+
+def success_curve(growth, target, weights, sips, lump_sum=0.0):
+    """Share of paths reaching target for each candidate SIP (sips × paths at once)"""
+    value = np.asarray(sips, dtype=float)[:, None] * (growth @ weights) + lump_sum * growth[:, 0]
+    return (value >= target).mean(axis=1) * 100
+
+
+def solve(returns, target, years, confidence=CONFIDENCE, method='bootstrap', step_up_pct=0.0,
+          lump_sum=0.0, n_paths=N_PATHS, block=BLOCK_MONTHS, seed=SEED, curve_points=CURVE_POINTS):
+    """Required SIP for one strategy's monthly returns
+
+    Returns required_sip (first-year monthly amount reaching target on at
+    least `confidence`% of paths), the median-path SIP, what the required SIP
+    invests and its outcome distribution, and a success curve over
+    candidate SIPs from 0 to twice the required amount.
+    """
+    if not 0 < confidence < 100:
+        raise ValueError("confidence must be between 0 and 100 (exclusive)")
+    months = int(round(years * 12))
+    if months < 1:
+        raise ValueError("years must cover at least one month")
+
+    growth = growth_to_end(return_paths(returns, months, method, n_paths, block, seed))
+    weights = step_up(months, 1.0, step_up_pct)
+    required = required_sips(growth, target, weights, lump_sum)
+
+    # Higher order statistic, so at least confidence% of paths reach the target
+    sip = float(np.quantile(required, confidence / 100, method='higher'))
+    value = sip * (growth @ weights) + lump_sum * growth[:, 0]
+    curve = np.linspace(0, 2 * sip, curve_points)
+    return {
+        'required_sip': sip,
+        'median_sip': float(np.median(required)),
+        'total_invested': sip * weights.sum() + lump_sum,
+        'paths': len(growth),
+        'success_pct': float((value >= target).mean() * 100),
+        'value_p5': float(np.percentile(value, 5)),
+        'value_p50': float(np.median(value)),
+        'value_p95': float(np.percentile(value, 95)),
+        'curve': {'sip': curve, 'success_pct': success_curve(growth, target, weights, curve, lump_sum)},
+    }
+
+
+def solve_strategies(strategy_returns, target, years, **kwargs):
+    """{strategy: solve()} for {strategy: monthly returns}"""
+    return {name: solve(returns, target, years, **kwargs) for name, returns in strategy_returns.items()}
+
+
+# ============================================================================
+# DATA
+# ============================================================================
+
+def monthly_returns(nav):
+    """Month-over-month returns of a month-end NAV / close series (gaps dropped)
+
+    Used for both the CLI and /api/goal, so each strategy's return series (the
+    momentum index on its own month-ends) is the same either way.
+    """
+    nav = np.asarray(nav, dtype=float)
+    nav = nav[~np.isnan(nav)]
+    return nav[1:] / nav[:-1] - 1
+
+
+def strategy_returns(universe, data_folder=DATA_DIR):
+    """{rotation, momcash (nifty500), momentum: monthly returns} from the strategies' NAVs"""
+    from core.contributions import monthly_navs
+
+    navs, _ = monthly_navs(universe, data_folder)
+    names = {'Simple Momentum': 'rotation', 'MOMCASH': 'momcash',
+             f'{get_universe(universe).label} Momentum': 'momentum'}
+    return {name: monthly_returns(navs[column]) for column, name in names.items() if column in navs}
+
+
+# ============================================================================
+# MAIN
+# ============================================================================
+
+def main():
+    parser = argparse.ArgumentParser(description="Monthly SIP needed for a target corpus")
+    parser.add_argument('--target', type=float, required=True, help="corpus in ₹")
+    parser.add_argument('--years', type=float, required=True)
+    parser.add_argument('--confidence', type=float, default=CONFIDENCE, help="% of paths reaching the target")
+    parser.add_argument('--method', choices=METHODS, default='bootstrap')
+    parser.add_argument('--paths', type=int, default=N_PATHS, help="bootstrap paths")
+    parser.add_argument('--step-up', type=float, default=0.0, help="annual SIP step-up, %")
+    parser.add_argument('--lump-sum', type=float, default=0.0, help="invested alongside the first instalment")
+    parser.add_argument('--universe', default='nifty500', choices=list(UNIVERSES))
+    parser.add_argument('--seed', type=int, default=SEED)
+    args = parser.parse_args()
+
+    returns = strategy_returns(args.universe)
+    start = time.perf_counter()
+    try:
+        results = solve_strategies(returns, args.target, args.years, confidence=args.confidence,
+                                   method=args.method, step_up_pct=args.step_up, lump_sum=args.lump_sum,
+                                   n_paths=args.paths, seed=args.seed)
+    except ValueError as e:
+        parser.error(str(e))
+    elapsed = time.perf_counter() - start
+
+    print("\n" + "=" * 96)
+    print(f"🎯 ₹{args.target:,.0f} in {args.years:g} years at {args.confidence:g}% confidence — "
+          f"{get_universe(args.universe).label}, {args.method} ({elapsed * 1000:.1f} ms)")
+    print("=" * 96)
+    extras = [f"step-up {args.step_up:g}%/yr" if args.step_up else '',
+              f"lump sum ₹{args.lump_sum:,.0f}" if args.lump_sum else '']
+    if any(extras):
+        print(f"   {', '.join(e for e in extras if e)}")
+    print(f"\n   {'Strategy':<10s} {'Required SIP':>14s} {'Median SIP':>12s} {'Invested':>16s} "
+          f"{'P5 value':>16s} {'Median value':>16s} {'Paths':>6s}")
+    print("   " + "-" * 92)
+    for name, r in results.items():
+        print(f"   {name:<10s} ₹{r['required_sip']:>13,.0f} ₹{r['median_sip']:>11,.0f} "
+              f"₹{r['total_invested']:>15,.0f} ₹{r['value_p5']:>15,.0f} ₹{r['value_p50']:>15,.0f} "
+              f"{r['paths']:>6d}")
+    print(f"\n   Required SIP reaches the target on ≥{args.confidence:g}% of paths; "
+          f"median SIP on half of them")
+
+
+if __name__ == "__main__":
+    main()
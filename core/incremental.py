@@ -0,0 +1,419 @@
+#!/usr/bin/env python3
+"""
+Incremental Allocation Engine
+Next month's weights from one new month-end close, without a full recompute
+
+MOMCASHStrategy.run_strategy and PortfolioStrategy.run_strategy rebuild the
+whole history to answer what production needs: next month's allocation.
+This engine keeps only the state the signals depend on and updates it in
+O(window) per month:
+
+  MOMCASH       last 25 closes (1/3/6/24M returns, 10M MA, 3M volatility),
+                36-month windows of 6M returns and 3M volatility (z-score,
+                percentile, volatility median), running peak, previous
+                drawdown and previous effective risk score
+  Simple Mom.   last 4 closes (3M return) and the current regime
+
+The scoring rules are the functions MOMCASHStrategy itself uses
+(score_components, persist_risk_score, risk_score_weights), so the
+two paths cannot drift apart; `verify` replays the full history through the
+engine and checks every month against a full recompute.
+
+State is JSON at <universe>/output/incremental_state.json.
+
+Usage:
+    python3 core/incremental.py init                                # replay monthly CSV → state
+    python3 core/incremental.py update --date 2026-01-30 --close 61234.5
+    python3 core/incremental.py show
+    python3 core/incremental.py verify --universe nifty500
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import sys
+from collections import deque
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+BASE_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(BASE_DIR))
+sys.path.insert(0, str(BASE_DIR / "nifty500" / "analysis"))
+sys.path.insert(0, str(BASE_DIR / "nifty500cash" / "analysis"))
+
+from core.universe import UNIVERSES, get_universe
+from nifty500_portfolio_strategy import GAIN_THRESHOLD, LOSS_THRESHOLD, simple_momentum_regime
+from nifty500cash_strategy import (MAX_CASH_PCT, SCORE_COMPONENTS, MOMCASHStrategy,
+                                   persist_risk_score, risk_score_weights, score_components)
+
+CLOSE_WINDOW = 25       # 24M return needs t-24
+SIGNAL_WINDOW = 36      # rolling z-score / percentile / volatility median
+MIN_PERIODS = 12
+STATE_FILE = "incremental_state.json"
+
+
+def _ret(closes, months):
+    return closes[-1] / closes[-1 - months] - 1 if len(closes) > months else np.nan
+
+
+def _valid(window):
+    values = np.asarray(window, dtype=float)
+    return values[~np.isnan(values)]
+
+
+def _to_json(values):
+    return [None if pd.isna(v) else float(v) for v in values]
+
+
+def _from_json(values):
+    return [np.nan if v is None else v for v in values]
+
+
+# ============================================================================
+# MOMCASH STATE
+# ============================================================================
+
+class MomcashState:
+    """Rolling state behind MOMCASH's risk score (see module docstring)"""
+
+    def __init__(self, max_cash_pct=MAX_CASH_PCT):
+        self.max_cash_pct = max_cash_pct
+        self.closes = deque(maxlen=CLOSE_WINDOW)
+        self.returns_6m = deque(maxlen=SIGNAL_WINDOW)
+        self.volatility_3m = deque(maxlen=SIGNAL_WINDOW)
+        self.peak = np.nan
+        self.prev_drawdown = np.nan
+        self.prev_effective = None
+
+    def update(self, close):
+        """Fold in one month-end close; returns the month's signals and scores"""
+        c = self.closes
+        c.append(float(close))
+
+        ret_1m, ret_3m, ret_6m, ret_24m = (_ret(c, m) for m in (1, 3, 6, 24))
+        ret_3m_prev = c[-4] / c[-7] - 1 if len(c) > 6 else np.nan
+
+        recent = list(c)[-10:]
+        ma_10m = np.mean(recent) if len(recent) >= 5 else np.nan
+        dist = (c[-1] - ma_10m) / ma_10m
+
+        # 6M return z-score and percentile over the last 36 months
+        self.returns_6m.append(ret_6m)
+        window = _valid(self.returns_6m)
+        zscore = pctile = np.nan
+        if len(window) >= MIN_PERIODS:
+            with np.errstate(invalid='ignore', divide='ignore'):
+                zscore = (ret_6m - window.mean()) / window.std(ddof=1)
+            if not np.isnan(ret_6m):
+                # Average rank, as pandas rank(pct=True)
+                pctile = ((window < ret_6m).sum() + ((window == ret_6m).sum() + 1) / 2) / len(window)
+
+        # 3M realized volatility vs its 36-month median
+        monthly = _valid([c[k] / c[k - 1] - 1 for k in range(max(1, len(c) - 3), len(c))])
+        vol_3m = monthly.std(ddof=1) * np.sqrt(12) if len(monthly) >= 2 else np.nan
+        self.volatility_3m.append(vol_3m)
+        vols = _valid(self.volatility_3m)
+        vol_spike = bool(len(vols) >= MIN_PERIODS and vol_3m > np.median(vols) * 1.5)
+
+        self.peak = c[-1] if np.isnan(self.peak) else max(self.peak, c[-1])
+        drawdown = (c[-1] - self.peak) / self.peak
+        decelerating = bool(ret_3m < ret_3m_prev)
+
+        scores = score_components(ret_3m, ret_6m, drawdown, self.prev_drawdown, dist, pctile,
+                                  zscore, vol_spike, decelerating, ret_24m)
+        raw = float(np.clip(sum(scores.values()), 0, 100))
+        effective = persist_risk_score(raw, self.prev_effective, ret_3m, drawdown)
+
+        self.prev_drawdown = drawdown
+        self.prev_effective = effective
+        return {
+            'signals': {
+                'return_1m': ret_1m, 'return_3m': ret_3m, 'return_6m': ret_6m,
+                'return_24m': ret_24m, 'dist_from_ma': dist, 'momentum_zscore': zscore,
+                'return_6m_percentile': pctile, 'drawdown': drawdown,
+                'vol_spike': vol_spike, 'momentum_decelerating': decelerating,
+            },
+            'components': scores,
+            'risk_score_raw': raw,
+            'risk_score': effective,
+        }
+
+    def allocation(self):
+        """Weights for the month after the last close (signal lagged one month)"""
+        score = self.prev_effective if self.prev_effective is not None else 0.0
+        w_mom, w_cash = risk_score_weights(score, self.max_cash_pct)
+        return {'w_mom': w_mom, 'w_val': 0.0, 'w_cash': w_cash}
+
+    def to_dict(self):
+        return {
+            'max_cash_pct': self.max_cash_pct,
+            'closes': list(self.closes),
+            'returns_6m': _to_json(self.returns_6m),
+            'volatility_3m': _to_json(self.volatility_3m),
+            'peak': None if np.isnan(self.peak) else self.peak,
+            'prev_drawdown': None if np.isnan(self.prev_drawdown) else self.prev_drawdown,
+            'prev_effective': self.prev_effective,
+        }
+
+    @classmethod
+    def from_dict(cls, d):
+        state = cls(d['max_cash_pct'])
+        state.closes.extend(d['closes'])
+        state.returns_6m.extend(_from_json(d['returns_6m']))
+        state.volatility_3m.extend(_from_json(d['volatility_3m']))
+        state.peak = np.nan if d['peak'] is None else d['peak']
+        state.prev_drawdown = np.nan if d['prev_drawdown'] is None else d['prev_drawdown']
+        state.prev_effective = d['prev_effective']
+        return state
+
+
+# ============================================================================
+# SIMPLE MOMENTUM STATE
+# ============================================================================
+
+class RotationState:
+    """Simple Momentum (20% Gain/Loss) regime state machine, one month at a time"""
+
+    def __init__(self, gain_threshold=GAIN_THRESHOLD, loss_threshold=LOSS_THRESHOLD):
+        self.gain_threshold = gain_threshold
+        self.loss_threshold = loss_threshold
+        self.closes = deque(maxlen=4)
+        self.regime = 'momentum'
+        self.months = 0
+
+    def update(self, close):
+        self.closes.append(float(close))
+        mom_3m = _ret(self.closes, 3) * 100
+        # Same rules as simple_momentum_regime (first month / NaN keep the regime)
+        if self.months > 0 and not np.isnan(mom_3m):
+            if mom_3m >= self.gain_threshold:
+                self.regime = 'momentum'
+            elif mom_3m <= self.loss_threshold:
+                self.regime = 'value'
+        self.months += 1
+        return {'mom_3m_return': mom_3m, 'regime': self.regime}
+
+    def allocation(self):
+        w_mom = 1.0 if self.regime == 'momentum' else 0.0
+        return {'w_mom': w_mom, 'w_val': 1.0 - w_mom, 'w_cash': 0.0}
+
+    def to_dict(self):
+        return {'gain_threshold': self.gain_threshold, 'loss_threshold': self.loss_threshold,
+                'closes': list(self.closes), 'regime': self.regime, 'months': self.months}
+
+    @classmethod
+    def from_dict(cls, d):
+        state = cls(d['gain_threshold'], d['loss_threshold'])
+        state.closes.extend(d['closes'])
+        state.regime = d['regime']
+        state.months = d['months']
+        return state
+
+
+# ============================================================================
+# ENGINE
+# ============================================================================
+
+class IncrementalEngine:
+    """MOMCASH + Simple Momentum state for one universe's momentum index"""
+
+    def __init__(self, universe='nifty500', max_cash_pct=MAX_CASH_PCT,
+                 gain_threshold=GAIN_THRESHOLD, loss_threshold=LOSS_THRESHOLD):
+        self.universe = universe
+        self.momcash = MomcashState(max_cash_pct)
+        self.rotation = RotationState(gain_threshold, loss_threshold)
+        self.last_date = None
+        self.last_update = None
+
+    def update(self, date, close):
+        """Add one month-end close; returns next month's allocation with breakdown"""
+        date = pd.Timestamp(date)
+        if self.last_date is not None and date.to_period('M') <= self.last_date.to_period('M'):
+            raise ValueError(f"state already has a close for {self.last_date:%Y-%m}; "
+                             f"next close must be for a later month (got {date:%Y-%m-%d})")
+        if not close > 0:
+            raise ValueError(f"close must be positive, got {close}")
+
+        momcash = self.momcash.update(close)
+        rotation = self.rotation.update(close)
+        self.last_date = date
+        self.last_update = {'close': float(close), 'momcash': momcash, 'simple_momentum': rotation}
+        return self.next_allocation()
+
+    def replay(self, monthly):
+        """Feed a monthly frame (Date, Close) through update(); returns per-month outputs"""
+        return [self.update(d, c) for d, c in zip(pd.to_datetime(monthly['Date']), monthly['Close'])]
+
+    def next_allocation(self):
+        if self.last_date is None:
+            raise ValueError("no closes yet — run `init` or update() first")
+        last = self.last_update
+        return {
+            'universe': self.universe,
+            'as_of': self.last_date.strftime('%Y-%m-%d'),
+            'for_month': (self.last_date.to_period('M') + 1).strftime('%Y-%m'),
+            'close': last['close'],
+            'momcash': {**self.momcash.allocation(), **last['momcash']},
+            'simple_momentum': {**self.rotation.allocation(), **last['simple_momentum']},
+        }
+
+    # ---- persistence ------------------------------------------------------
+
+    def to_dict(self):
+        return {
+            'universe': self.universe,
+            'last_date': None if self.last_date is None else self.last_date.strftime('%Y-%m-%d'),
+            'last_update': self.last_update,
+            'momcash': self.momcash.to_dict(),
+            'simple_momentum': self.rotation.to_dict(),
+        }
+
+    @classmethod
+    def from_dict(cls, d):
+        engine = cls(d['universe'])
+        engine.momcash = MomcashState.from_dict(d['momcash'])
+        engine.rotation = RotationState.from_dict(d['simple_momentum'])
+        engine.last_date = None if d['last_date'] is None else pd.Timestamp(d['last_date'])
+        engine.last_update = d['last_update']
+        return engine
+
+    def save(self, path):
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, 'w') as f:
+            json.dump(_clean(self.to_dict()), f, indent=2)
+        return path
+
+    @classmethod
+    def load(cls, path):
+        with open(path) as f:
+            return cls.from_dict(json.load(f))
+
+
+def _clean(obj):
+    """JSON-safe copy: NaN → None, numpy scalars → Python"""
+    if isinstance(obj, dict):
+        return {k: _clean(v) for k, v in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [_clean(v) for v in obj]
+    if isinstance(obj, (bool, np.bool_)):
+        return bool(obj)
+    if isinstance(obj, (float, np.floating)):
+        return None if np.isnan(obj) else float(obj)
+    return obj
+
+
+# ============================================================================
+# CONSISTENCY CHECK
+# ============================================================================
+
+def load_monthly(universe):
+    df = pd.read_csv(get_universe(universe).mom_monthly_csv, usecols=['Date', 'Close'])
+    df['Date'] = pd.to_datetime(df['Date'])
+    return df
+
+
+def verify(universe='nifty500', monthly=None, max_cash_pct=MAX_CASH_PCT, tol=1e-9):
+    """Replay every month incrementally and compare with a full recompute
+
+    Returns a list of (date, field, incremental, full) mismatches.
+    """
+    monthly = load_monthly(universe) if monthly is None else monthly
+    engine = IncrementalEngine(universe, max_cash_pct)
+    outputs = engine.replay(monthly)
+
+    strategy = MOMCASHStrategy.__new__(MOMCASHStrategy)
+    strategy.max_cash_pct = max_cash_pct
+    with contextlib.redirect_stdout(io.StringIO()):
+        full = strategy.calculate_risk_score(
+            strategy.compute_signals(monthly.rename(columns={'Close': 'Close_mom'}).copy()))
+    regime = simple_momentum_regime(monthly['Close'].pct_change(3).to_numpy() * 100)
+    w_mom_regime = np.where(regime == 'momentum', 1.0, 0.0)
+
+    mismatches = []
+
+    def check(i, field, got, expected):
+        same = (got == expected) if isinstance(expected, str) else np.isclose(got, expected, atol=tol, rtol=0)
+        if not same:
+            mismatches.append((monthly['Date'].iloc[i].strftime('%Y-%m'), field, got, expected))
+
+    for i, out in enumerate(outputs):
+        m = out['momcash']
+        check(i, 'risk_score_raw', m['risk_score_raw'], full['risk_score_raw'].iloc[i])
+        for name in SCORE_COMPONENTS:
+            check(i, name, m['components'][name], full[name].iloc[i])
+        check(i, 'regime', out['simple_momentum']['regime'], regime[i])
+        # Full frame weights are lagged: month i's output is month i+1's row
+        if i + 1 < len(full):
+            check(i, 'risk_score', m['risk_score'], full['risk_score'].iloc[i + 1])
+            check(i, 'momcash.w_mom', m['w_mom'], full['w_mom'].iloc[i + 1])
+            check(i, 'momcash.w_cash', m['w_cash'], full['w_cash'].iloc[i + 1])
+            check(i, 'simple_momentum.w_mom', out['simple_momentum']['w_mom'], w_mom_regime[i])
+    return mismatches
+
+
+# ============================================================================
+# CLI
+# ============================================================================
+
+def print_allocation(a):
+    m, s = a['momcash'], a['simple_momentum']
+    print(f"\n📅 {a['universe']} — close {a['close']:,.2f} on {a['as_of']} → allocation for {a['for_month']}")
+    print(f"\n   MOMCASH:          {m['w_mom'] * 100:5.1f}% momentum / {m['w_cash'] * 100:5.1f}% cash  "
+          f"(risk score {m['risk_score']:.1f}, raw {m['risk_score_raw']:.1f})")
+    for name, points in m['components'].items():
+        if points:
+            print(f"      {name.replace('score_', '').replace('_', ' ').title():<20s} {points:+.1f} pts")
+    print(f"   Simple Momentum:  {s['w_mom'] * 100:5.1f}% momentum / {s['w_val'] * 100:5.1f}% value  "
+          f"(regime {s['regime']}, 3M {s['mom_3m_return']:+.1f}%)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Incremental next-month allocation")
+    parser.add_argument('command', choices=['init', 'update', 'show', 'verify'])
+    parser.add_argument('--universe', default='nifty500', choices=list(UNIVERSES))
+    parser.add_argument('--state', type=Path, help="state file (default: <universe>/output/incremental_state.json)")
+    parser.add_argument('--date', help="month-end date of the new close (update)")
+    parser.add_argument('--close', type=float, help="new month-end momentum index close (update)")
+    parser.add_argument('--max-cash', type=float, default=MAX_CASH_PCT)
+    args = parser.parse_args()
+
+    state_file = args.state or get_universe(args.universe).output_dir / STATE_FILE
+
+    if args.command == 'init':
+        engine = IncrementalEngine(args.universe, args.max_cash)
+        engine.replay(load_monthly(args.universe))
+        engine.save(state_file)
+        print(f"✅ State initialised from {len(load_monthly(args.universe))} months: {state_file}")
+        print_allocation(engine.next_allocation())
+
+    elif args.command == 'update':
+        if args.date is None or args.close is None:
+            parser.error("update needs --date and --close")
+        engine = IncrementalEngine.load(state_file)
+        try:
+            allocation = engine.update(args.date, args.close)
+        except ValueError as e:
+            print(f"❌ {e}")
+            sys.exit(1)
+        engine.save(state_file)
+        print_allocation(allocation)
+
+    elif args.command == 'show':
+        print_allocation(IncrementalEngine.load(state_file).next_allocation())
+
+    else:
+        mismatches = verify(args.universe, max_cash_pct=args.max_cash)
+        if mismatches:
+            print(f"❌ {len(mismatches)} mismatch(es) against the full recompute:")
+            for date, field, got, expected in mismatches[:20]:
+                print(f"   {date} {field:<24s} incremental {got} vs full {expected}")
+            sys.exit(1)
+        print(f"✅ Incremental engine matches the full recompute for every month ({args.universe})")
+
+
+if __name__ == "__main__":
+    main()
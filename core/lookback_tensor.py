@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+"""
+Lookback Return Tensor
+All lookback returns at once, and relative-momentum composites as contractions
+
+The comparison scripts each call pct_change(3), pct_change(6), pct_change(9)
+on Close_mom and Close_val separately. Here the returns for every lookback
+(1-24 months by default) and every asset come out of one gather over log
+prices:
+
+    R[t, l, n] = exp(log P[t, n] - log P[t - lookback_l, n]) - 1     (T×L×N)
+
+Relative momentum of the pair is R[..., mom] - R[..., val] (T×L), and any
+composite signal — e.g. the 50% 6M + 25% 9M + 25% 3M blend — is that matrix
+times a weight vector over lookbacks. A K×L matrix of weight vectors gives
+all K composites in one matrix multiply, so a search over the weight simplex
+evaluates every candidate as columns of the same T×K arrays.
+
+Usage:
+    python3 core/lookback_tensor.py                                   # nifty500, 3/6/9M, step 0.05
+    python3 core/lookback_tensor.py --universe nifty200 --lookbacks 3 6 12 --step 0.1
+    python3 core/lookback_tensor.py --rebalance Q --high 0.75 --low 0.25 --top 20
+"""
+
+import argparse
+import itertools
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+BASE_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(BASE_DIR))
+
+from core.rotation import REBALANCE_FREQS, universe_price_matrix
+from core.universe import UNIVERSES
+from core.xirr import xirr_columns
+
+LOOKBACKS = tuple(range(1, 25))   # months
+
+
+# ============================================================================
+# TENSOR
+# ============================================================================
+
+def return_tensor(prices, lookbacks=LOOKBACKS):
+    """T×L×N simple returns over each lookback (NaN where t < lookback)
+
+    prices: T×N array or DataFrame of month-end closes (a Series is one asset).
+    """
+    p = np.asarray(prices, dtype=float)
+    if p.ndim == 1:
+        p = p[:, None]
+    lookbacks = np.asarray(lookbacks, dtype=int)
+    log_p = np.log(p)
+
+    t = np.arange(len(p))[:, None]
+    start = t - lookbacks[None, :]                      # T×L row index of the base price
+    valid = start >= 0
+    log_ret = log_p[:, None, :] - log_p[np.where(valid, start, 0)]
+    log_ret[~valid] = np.nan
+    return np.expm1(log_ret)
+
+
+def relative_momentum(tensor, long=0, short=1):
+    """T×L lookback returns of asset `long` minus those of asset `short`"""
+    return tensor[:, :, long] - tensor[:, :, short]
+
+
+def relative_momentum_frame(df, lookbacks=LOOKBACKS, long='Close_mom', short='Close_val'):
+    """RelMom_<l>M columns for a frame with the two close columns (same index as df)"""
+    rel = relative_momentum(return_tensor(df[[long, short]], lookbacks))
+    return pd.DataFrame(rel, index=df.index, columns=[f'RelMom_{l}M' for l in lookbacks])
+
+
+# ============================================================================
+# COMPOSITES
+# ============================================================================
+
+def weight_matrix(weights, lookbacks=LOOKBACKS):
+    """K×L weights over lookbacks from {lookback: w}, a list of such dicts, or an array"""
+    lookbacks = list(lookbacks)
+    if isinstance(weights, dict):
+        weights = [weights]
+    if isinstance(weights, (list, tuple)) and weights and isinstance(weights[0], dict):
+        matrix = np.zeros((len(weights), len(lookbacks)))
+        for k, w in enumerate(weights):
+            for lookback, value in w.items():
+                if lookback not in lookbacks:
+                    raise ValueError(f"Lookback {lookback}M not in tensor lookbacks {lookbacks}")
+                matrix[k, lookbacks.index(lookback)] = value
+        return matrix
+    matrix = np.atleast_2d(np.asarray(weights, dtype=float))
+    if matrix.shape[1] != len(lookbacks):
+        raise ValueError(f"Expected {len(lookbacks)} weights per row, got {matrix.shape[1]}")
+    return matrix
+
+
+def composite(rel, weights, lookbacks=LOOKBACKS):
+    """Weighted blends of relative momentum across lookbacks: rel (T×L) @ W.T → T×K
+
+    rel may be the RelMom frame; a single weight dict returns a Series (or T
+    vector). A composite is NaN until every lookback it puts weight on is
+    available — zero-weight lookbacks do not delay it.
+    """
+    W = weight_matrix(weights, lookbacks)
+    values = np.asarray(rel, dtype=float)
+    missing = np.isnan(values)
+    signals = np.nan_to_num(values) @ W.T
+    signals[(missing.astype(float) @ (W != 0).T) > 0] = np.nan
+
+    if isinstance(weights, dict):
+        signals = signals[:, 0]
+        return pd.Series(signals, index=rel.index) if isinstance(rel, pd.DataFrame) else signals
+    return signals
+
+
+def simplex_grid(n, step=0.05):
+    """All weight vectors over n lookbacks with non-negative multiples of step summing to 1"""
+    units = int(round(1 / step))
+    if not np.isclose(units * step, 1):
+        raise ValueError(f"step must divide 1, got {step}")
+    rows = [c for c in itertools.product(range(units + 1), repeat=n - 1) if sum(c) <= units]
+    grid = np.array([(*c, units - sum(c)) for c in rows], dtype=float)
+    return grid / units
+
+
+# ============================================================================
+# VECTORIZED BACKTEST OVER K COMPOSITES
+# ============================================================================
+
+def evaluate_composites(prices, signals, rebalance='M', high=1.0, low=0.0, lag=1):
+    """Momentum/value rotation for every signal column at once
+
+    prices:  T×2 frame (momentum, value) indexed by Date
+    signals: T×K composite signals; momentum weight is `high` when the signal
+             is positive at a rebalance row, else `low`, held to the next
+             rebalance and applied `lag` months later (`low` before the first)
+
+    Returns a dict of T×K arrays: w_mom, Portfolio_Return, Portfolio_NAV.
+    """
+    p = prices.to_numpy(dtype=float)
+    returns = np.full_like(p, np.nan)
+    returns[1:] = p[1:] / p[:-1] - 1
+
+    decision = np.where(signals > 0, high, low)
+    dates = pd.DatetimeIndex(prices.index)
+    period = (dates.year * 12 + dates.month - 1) // REBALANCE_FREQS[rebalance]
+    decision[~np.append(period[1:] != period[:-1], True)] = np.nan
+
+    w_mom = pd.DataFrame(decision).ffill().shift(lag).fillna(low).to_numpy()
+    portfolio_return = w_mom * returns[:, [0]] + (1 - w_mom) * returns[:, [1]]
+    portfolio_return[0] = np.nan
+    nav = 1000 * np.cumprod(1 + np.nan_to_num(portfolio_return), axis=0)
+    return {'w_mom': w_mom, 'Portfolio_Return': portfolio_return, 'Portfolio_NAV': nav}
+
+
+def sip_xirr(dates, nav, sip=10000):
+    """SIP XIRR in percent for every NAV column (monthly instalments, valued on the last date)"""
+    nav = np.asarray(nav, dtype=float).reshape(len(nav), -1)
+    dates = pd.DatetimeIndex(dates)
+    days = (dates - dates[0]).days.to_numpy()
+    final = np.sum(sip / nav, axis=0) * nav[-1]
+
+    amounts = np.vstack([np.full((len(nav), nav.shape[1]), -float(sip)), final[None, :]])
+    days = np.broadcast_to(np.append(days, days[-1])[:, None], amounts.shape)
+    return xirr_columns(days, amounts)
+
+
+def composite_metrics(dates, nav, w_mom, sip=10000):
+    """Per-column CAGR, SIP XIRR, NAV / SIP drawdowns, MAR, switches and final value (K-vectors)"""
+    years = len(nav) / 12
+    cagr = ((nav[-1] / nav[0]) ** (1 / years) - 1) * 100
+    nav_dd = (nav / np.maximum.accumulate(nav, axis=0) - 1).min(axis=0) * 100
+
+    value = np.cumsum(sip / nav, axis=0) * nav
+    sip_dd = (value / np.maximum.accumulate(value, axis=0) - 1).min(axis=0) * 100
+    xirr = sip_xirr(dates, nav, sip)
+    switches = (np.diff(w_mom, axis=0) != 0).sum(axis=0)
+    return {'cagr': cagr, 'xirr': xirr, 'max_dd': sip_dd, 'nav_max_dd': nav_dd,
+            'mar': np.where(sip_dd != 0, xirr / np.abs(sip_dd), 0.0),
+            'switches': switches, 'final_value': value[-1]}
+
+
+def search_simplex(prices, lookbacks=(3, 6, 9), step=0.05, rebalance='M', high=1.0, low=0.0,
+                   lag=1, sip=10000):
+    """Evaluate every composite weighting on the simplex over `lookbacks`
+
+    Returns a frame with one row per weight vector (w_<l>M columns + metrics).
+    """
+    rel = relative_momentum(return_tensor(prices, lookbacks))
+    W = simplex_grid(len(lookbacks), step)
+    signals = composite(rel, W, lookbacks)
+    run = evaluate_composites(prices, signals, rebalance, high, low, lag)
+    metrics = composite_metrics(prices.index, run['Portfolio_NAV'], run['w_mom'], sip)
+
+    results = pd.DataFrame(W, columns=[f'w_{l}M' for l in lookbacks])
+    for name, values in metrics.items():
+        results[name] = values
+    return results
+
+
+# ============================================================================
+# MAIN
+# ============================================================================
+
+def main():
+    parser = argparse.ArgumentParser(description="Composite relative-momentum weight search over the simplex")
+    parser.add_argument('--universe', default='nifty500', choices=list(UNIVERSES))
+    parser.add_argument('--lookbacks', type=int, nargs='+', default=[3, 6, 9], help="months")
+    parser.add_argument('--step', type=float, default=0.05, help="weight grid spacing")
+    parser.add_argument('--rebalance', choices=sorted(REBALANCE_FREQS), default='M')
+    parser.add_argument('--high', type=float, default=1.0, help="momentum weight when the signal is positive")
+    parser.add_argument('--low', type=float, default=0.0, help="momentum weight otherwise")
+    parser.add_argument('--sort', choices=['xirr', 'cagr', 'mar', 'max_dd', 'final_value'], default='mar')
+    parser.add_argument('--top', type=int, default=10)
+    args = parser.parse_args()
+
+    prices = universe_price_matrix(args.universe)
+    start = time.perf_counter()
+    results = search_simplex(prices, args.lookbacks, args.step, args.rebalance, args.high, args.low)
+    elapsed = time.perf_counter() - start
+
+    print(f"\n🔎 {args.universe}: {len(results)} composite weightings over "
+          f"{'/'.join(f'{l}M' for l in args.lookbacks)} ({args.rebalance}, {args.high:g}/{args.low:g}) "
+          f"in {elapsed * 1000:.1f} ms")
+
+    top = results.sort_values(args.sort, ascending=False, kind='stable').head(args.top)
+    weight_cols = [c for c in results.columns if c.startswith('w_')]
+    print(f"\n{'Weights':<24s} {'CAGR':>7s} {'XIRR':>7s} {'MaxDD':>8s} {'MAR':>6s} {'Sw':>4s}")
+    print("-" * 62)
+    for _, row in top.iterrows():
+        label = ' '.join(f"{row[c]:.2f}" for c in weight_cols)
+        print(f"{label:<24s} {row['cagr']:>6.2f}% {row['xirr']:>6.2f}% {row['max_dd']:>7.2f}% "
+              f"{row['mar']:>6.2f} {row['switches']:>4.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,274 @@
+#!/usr/bin/env python3
+"""
+Stage Memoization
+Disk-backed cache for deterministic pipeline stages
+
+Stages are marked with the @memoized decorator (compute_signals,
+calculate_risk_score, CSV shard consolidation, ...). A call is keyed by a
+SHA-256 over the stage's source code (plus any helper functions it declares
+in depends=), its arguments — DataFrames, Series and arrays by content,
+objects by their attributes — and optionally the size/mtime of input files.
+Results are pickled into the cache directory; a later call with the same key
+loads the pickle instead of recomputing. The cache is capped in size and the
+least recently used entries are evicted first.
+
+  SMART_BETA_CACHE=0           disable (always recompute, nothing written)
+  SMART_BETA_CACHE_DIR=path    cache location (default .stage_cache/ in the repo)
+  SMART_BETA_CACHE_MB=512      size cap in MB
+
+Hit/miss counts per stage are kept per process (stats()) and added to the
+profiling run report.
+
+Usage:
+    python3 core/memo.py stats          # entries and size per stage on disk
+    python3 core/memo.py clear
+"""
+
+import argparse
+import functools
+import hashlib
+import inspect
+import os
+import pickle
+import platform
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+BASE_DIR = Path(__file__).parent.parent
+
+CACHE_ENV = "SMART_BETA_CACHE"
+CACHE_DIR_ENV = "SMART_BETA_CACHE_DIR"
+CACHE_MB_ENV = "SMART_BETA_CACHE_MB"
+DEFAULT_CACHE_DIR = BASE_DIR / ".stage_cache"
+DEFAULT_CACHE_MB = 512
+
+MB = 1024 * 1024
+
+# Pickles are only read back by the same Python / pandas versions
+RUNTIME = f"{platform.python_version()}|{pd.__version__}|{np.__version__}"
+
+_stats = {}
+
+
+def cache_enabled():
+    return os.environ.get(CACHE_ENV, '1').strip().lower() not in ('0', 'false', 'no', 'off')
+
+
+def cache_dir():
+    return Path(os.environ.get(CACHE_DIR_ENV) or DEFAULT_CACHE_DIR)
+
+
+def cache_limit_bytes():
+    return float(os.environ.get(CACHE_MB_ENV) or DEFAULT_CACHE_MB) * MB
+
+
+# ============================================================================
+# KEYS
+# ============================================================================
+
+def _update(h, value):
+    """Feed a value into the hash by content (recursively for containers)"""
+    if value is None or isinstance(value, (bool, int, float, str, bytes)):
+        h.update(f"{type(value).__name__}:{value!r};".encode())
+    elif isinstance(value, Path):
+        h.update(f"path:{value};".encode())
+    elif isinstance(value, pd.DataFrame):
+        h.update(f"df:{list(value.columns)}:{list(map(str, value.dtypes))};".encode())
+        h.update(pd.util.hash_pandas_object(value, index=True).values.tobytes())
+    elif isinstance(value, pd.Series):
+        h.update(f"series:{value.name}:{value.dtype};".encode())
+        h.update(pd.util.hash_pandas_object(value, index=True).values.tobytes())
+    elif isinstance(value, np.ndarray):
+        h.update(f"array:{value.dtype}:{value.shape};".encode())
+        h.update(np.ascontiguousarray(value).tobytes() if value.dtype != object else repr(value.tolist()).encode())
+    elif isinstance(value, np.generic):
+        _update(h, value.item())
+    elif isinstance(value, (list, tuple)):
+        h.update(f"{type(value).__name__}[{len(value)}];".encode())
+        for item in value:
+            _update(h, item)
+    elif isinstance(value, dict):
+        h.update(f"dict[{len(value)}];".encode())
+        for key in sorted(value, key=repr):
+            _update(h, key)
+            _update(h, value[key])
+    elif hasattr(value, '__dict__'):
+        # e.g. `self` of a strategy: its configuration attributes
+        h.update(f"obj:{type(value).__qualname__};".encode())
+        _update(h, vars(value))
+    else:
+        raise TypeError(f"Cannot memoize on argument of type {type(value).__name__}")
+
+
+def _source(func):
+    try:
+        return inspect.getsource(func)
+    except (OSError, TypeError):
+        return func.__code__.co_code.hex()
+
+
+def file_fingerprint(paths):
+    """(path, size, mtime) of input files: cheap change detection"""
+    fingerprint = []
+    for path in sorted(map(str, paths)):
+        stat = os.stat(path)
+        fingerprint.append((path, stat.st_size, stat.st_mtime_ns))
+    return fingerprint
+
+
+# ============================================================================
+# DECORATOR
+# ============================================================================
+
+def memoized(func=None, *, depends=(), files=None, name=None):
+    """Cache a stage's result on disk, keyed by its code and inputs
+
+    depends: helper functions (by source) and module constants (by value)
+             the stage uses, so changing them invalidates its entries
+    files:   callable(*args, **kwargs) → input file paths read by the stage
+    """
+    if func is None:
+        return functools.partial(memoized, depends=depends, files=files, name=name)
+
+    stage_name = name or func.__qualname__
+    code_hash = hashlib.sha256(
+        ''.join([RUNTIME, f"{func.__module__}.{stage_name}", _source(func)] +
+                [_source(d) if callable(d) else repr(d) for d in depends]).encode()).hexdigest()
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        if not cache_enabled():
+            return func(*args, **kwargs)
+
+        h = hashlib.sha256(code_hash.encode())
+        try:
+            _update(h, args)
+            _update(h, kwargs)
+            if files is not None:
+                _update(h, file_fingerprint(files(*args, **kwargs)))
+        except (TypeError, OSError):
+            return func(*args, **kwargs)
+        path = cache_dir() / f"{stage_name}-{h.hexdigest()[:32]}.pkl"
+
+        stats = _stats.setdefault(stage_name, {'hits': 0, 'misses': 0, 'saved_s': 0.0,
+                                               'compute_s': 0.0, 'bytes_written': 0})
+        try:
+            with open(path, 'rb') as f:
+                entry = pickle.load(f)
+            os.utime(path)   # mark as recently used
+            stats['hits'] += 1
+            stats['saved_s'] += entry['elapsed']
+            return entry['value']
+        except Exception:
+            pass   # missing, truncated or unreadable entry: recompute
+
+        start = time.perf_counter()
+        value = func(*args, **kwargs)
+        elapsed = time.perf_counter() - start
+        stats['misses'] += 1
+        stats['compute_s'] += elapsed
+        stats['bytes_written'] += _store(path, {'elapsed': elapsed, 'value': value})
+        return value
+
+    wrapper.uncached = func
+    return wrapper
+
+
+def _store(path, entry):
+    """Write an entry atomically, then evict down to the size cap; returns bytes written"""
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        with open(tmp, 'wb') as f:
+            pickle.dump(entry, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, path)
+        size = path.stat().st_size
+    except (OSError, pickle.PicklingError, TypeError, AttributeError):
+        return 0
+    evict(cache_limit_bytes())
+    return size
+
+
+def entries():
+    """Cache files, least recently used first: [(path, size, last_used)]"""
+    folder = cache_dir()
+    if not folder.exists():
+        return []
+    files = []
+    for path in folder.glob("*.pkl"):
+        try:
+            stat = path.stat()
+        except OSError:
+            continue   # evicted by another process
+        files.append((path, stat.st_size, stat.st_mtime))
+    return sorted(files, key=lambda e: e[2])
+
+
+def evict(limit_bytes):
+    """Delete least recently used entries until the cache fits; returns files removed"""
+    files = entries()
+    total = sum(size for _, size, _ in files)
+    removed = 0
+    for path, size, _ in files:
+        if total <= limit_bytes:
+            break
+        try:
+            path.unlink()
+        except OSError:
+            continue
+        total -= size
+        removed += 1
+    return removed
+
+
+def stats():
+    """Hit/miss counts per stage in this process"""
+    return {name: {**s, 'saved_s': round(s['saved_s'], 6), 'compute_s': round(s['compute_s'], 6)}
+            for name, s in _stats.items()}
+
+
+def reset_stats():
+    _stats.clear()
+
+
+def format_stats(per_stage):
+    hits = sum(s['hits'] for s in per_stage.values())
+    misses = sum(s['misses'] for s in per_stage.values())
+    saved = sum(s['saved_s'] for s in per_stage.values())
+    return f"{hits} hit(s), {misses} miss(es), ~{saved:.2f}s saved"
+
+
+# ============================================================================
+# MAIN
+# ============================================================================
+
+def main():
+    parser = argparse.ArgumentParser(description="Stage memoization cache")
+    parser.add_argument('command', choices=['stats', 'clear'])
+    args = parser.parse_args()
+
+    files = entries()
+    if args.command == 'clear':
+        for path, _, _ in files:
+            path.unlink(missing_ok=True)
+        print(f"✅ Removed {len(files)} cached result(s) from {cache_dir()}")
+        return
+
+    by_stage = {}
+    for path, size, _ in files:
+        stage_name = path.name.rsplit('-', 1)[0]
+        count, total = by_stage.get(stage_name, (0, 0))
+        by_stage[stage_name] = (count + 1, total + size)
+
+    total = sum(size for _, size, _ in files)
+    print(f"\n📦 {cache_dir()}: {len(files)} entries, {total / MB:.1f} MB "
+          f"(cap {cache_limit_bytes() / MB:g} MB){'' if cache_enabled() else '  [disabled]'}")
+    for stage_name, (count, size) in sorted(by_stage.items()):
+        print(f"   {stage_name:<50s} {count:>5d} entries {size / MB:>8.2f} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,358 @@
+#!/usr/bin/env python3
+"""
+Incremental Pipeline Orchestrator
+Runs the analysis scripts as a DAG and skips stages whose outputs are current
+
+Each stage declares its input files (data/ shards, monthly CSVs, ...) and
+its outputs; the code it depends on is the script plus every repo-local
+module it imports (core.*, sibling scripts), followed transitively, so an
+edit to e.g. core/xirr.py marks every stage using it stale. A stage's fingerprint is a SHA-256 over
+the input file contents, the code files and the stage config; it is re-run
+only when that fingerprint changed or an output is missing / was modified
+since the last run. Dependencies are derived from outputs → inputs, and
+independent stages (e.g. the nifty200 and nifty500 universes) run in parallel.
+
+Usage:
+    python3 core/orchestrator.py                 # incremental refresh
+    python3 core/orchestrator.py --jobs 4        # parallelism
+    python3 core/orchestrator.py --dry-run       # show what would run
+    python3 core/orchestrator.py --force --only nifty500
+"""
+
+import argparse
+import ast
+import fnmatch
+import glob
+import hashlib
+import json
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from pathlib import Path
+
+BASE_DIR = Path(__file__).parent.parent
+STATE_FILE = BASE_DIR / ".pipeline_state.json"
+LOG_DIR = BASE_DIR / ".pipeline_logs"
+
+
+def local_imports(path):
+    """Repo-local modules imported anywhere in a file (incl. function-level
+    imports), resolved against the repo root and the file's own directory
+    — the two places the scripts put on sys.path. Third-party and stdlib
+    imports resolve to nothing and are ignored."""
+    tree = ast.parse(path.read_text(), filename=str(path))
+    names = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            names.update(alias.name for alias in node.names)
+        elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+            names.add(node.module)
+            # `from core import xirr` imports the submodule core/xirr.py
+            names.update(f"{node.module}.{alias.name}" for alias in node.names)
+
+    found = set()
+    for name in names:
+        rel = Path(*name.split('.'))
+        for root in (BASE_DIR, path.parent):
+            for candidate in (root / rel.with_suffix('.py'), root / rel / '__init__.py'):
+                if candidate.is_file():
+                    found.add(candidate.resolve())
+    return found
+
+
+def code_closure(script):
+    """Script plus every repo-local module it imports, transitively
+    (paths relative to the repository root, sorted)"""
+    seen = set()
+    pending = [(BASE_DIR / script).resolve()]
+    while pending:
+        path = pending.pop()
+        if path in seen:
+            continue
+        seen.add(path)
+        pending.extend(local_imports(path) - seen)
+    root = BASE_DIR.resolve()
+    return sorted(str(p.relative_to(root)) for p in seen)
+
+
+class Stage:
+    """One script in the pipeline with its declared inputs and outputs
+
+    Paths and glob patterns are relative to the repository root. The code
+    fingerprint covers the script's repo-local imports (see code_closure);
+    `code` adds files the script reads without importing them.
+    """
+
+    def __init__(self, name, script, inputs, outputs, code=(), config=None):
+        self.name = name
+        self.script = script
+        self.inputs = list(inputs)
+        self.outputs = list(outputs)
+        self.code = sorted(set(code_closure(script)) | set(code))
+        self.config = config or {}
+        self.deps = set()
+
+    def expand_inputs(self):
+        """Input files currently on disk (sorted, de-duplicated)"""
+        files = set()
+        for pattern in self.inputs:
+            files.update(glob.glob(str(BASE_DIR / pattern)))
+        return sorted(files)
+
+    def consumes(self, output):
+        return any(fnmatch.fnmatch(output, pattern) for pattern in self.inputs)
+
+
+# ============================================================================
+# STAGE DEFINITIONS
+# ============================================================================
+
+def universe_stages(universe, size, strategy_csv):
+    """Stages for one momentum/value universe (nifty200 / nifty500)"""
+    analysis = f"{universe}/analysis"
+    monthly = f"{universe}/output/monthly"
+    mom_folder = f"data/{universe}mom{size}"
+    val_folder = f"data/{universe}val{size}"
+    monthly_csvs = [f"{monthly}/{universe}_momentum_{size}_monthly.csv",
+                    f"{monthly}/{universe}_value_{size}_monthly.csv"]
+
+    return [
+        Stage(f"{universe}.ratio", f"{analysis}/{universe}_calculate_ratio.py",
+              inputs=[f"{mom_folder}/*.csv", f"{val_folder}/*.csv"],
+              outputs=[f"{universe}/output/weekly/momentum_value_ratio_weekly.csv",
+                       f"{universe}/output/weekly/ratio_chart.json"]),
+        Stage(f"{universe}.dashboard_data", f"{analysis}/{universe}_generate_dashboard_data.py",
+              inputs=[f"{mom_folder}/*.csv", f"{val_folder}/*.csv",
+                      f"{universe}/output/weekly/momentum_value_ratio_weekly.csv"],
+              outputs=monthly_csvs + [f"{universe}/output/dashboard_data.json"],
+              config={'monthly_sip': 10000}),
+        Stage(f"{universe}.strategy", f"{analysis}/{universe}_portfolio_strategy.py",
+              inputs=monthly_csvs,
+              outputs=[f"{monthly}/{strategy_csv}"],
+              config={'monthly_sip': 10000}),
+        Stage(f"{universe}.analytics", f"{analysis}/{universe}_portfolio_analytics.py",
+              inputs=[f"{monthly}/{strategy_csv}",
+                      f"{universe}/output/{universe}_portfolio_holdings_log.csv"],
+              outputs=[f"{universe}/output/{universe}_portfolio_dashboard.json"],
+              config={'monthly_sip': 10000}),
+        Stage(f"{universe}.returns_analysis", f"{universe}/{universe}_returns_analysis.py",
+              inputs=monthly_csvs,
+              outputs=[f"{universe}/output/{universe}_returns_analysis.json",
+                       f"{universe}/output/returns_analysis/momentum_cagr_monthly.csv",
+                       f"{universe}/output/returns_analysis/value_cagr_monthly.csv"]),
+    ]
+
+
+def build_stages():
+    """All pipeline stages with dependencies resolved"""
+    stages = (
+        universe_stages('nifty200', 30, 'portfolio_simple_momentum.csv') +
+        universe_stages('nifty500', 50, 'nifty500_simple_momentum.csv') +
+        [
+            Stage("nifty500cash.strategy", "nifty500cash/analysis/nifty500cash_strategy.py",
+                  inputs=["nifty500/output/monthly/nifty500_momentum_50_monthly.csv"],
+                  outputs=["nifty500cash/output/monthly/nifty500cash_momcash_portfolio.csv"],
+                  config={'monthly_sip': 10000, 'cash_return': 'simulated'}),
+            Stage("nifty500cash.analytics", "nifty500cash/analysis/nifty500cash_analytics.py",
+                  inputs=["nifty500cash/output/monthly/nifty500cash_momcash_portfolio.csv"],
+                  outputs=["nifty500cash/output/nifty500cash_dashboard.json"],
+                  config={'monthly_sip': 10000}),
+            Stage("portfolio_log", "analysis/generate_portfolio_log.py",
+                  inputs=["nifty200/output/monthly/portfolio_ratio_trend_75_25.csv",
+                          "nifty500/output/monthly/nifty500_portfolio_ratio_trend_75_25.csv"],
+                  outputs=["nifty200/output/nifty200_portfolio_holdings_log.csv",
+                           "nifty500/output/nifty500_portfolio_holdings_log.csv"]),
+        ]
+    )
+    resolve_dependencies(stages)
+    return stages
+
+
+def resolve_dependencies(stages):
+    """Stage B depends on stage A if B consumes any of A's outputs"""
+    producers = {}
+    for stage in stages:
+        for output in stage.outputs:
+            if output in producers:
+                raise ValueError(f"Output {output} produced by both {producers[output]} and {stage.name}")
+            producers[output] = stage.name
+
+    for stage in stages:
+        stage.deps = {producers[o] for o in producers
+                      if stage.consumes(o) and producers[o] != stage.name}
+
+    # Cycle check (Kahn)
+    remaining = {s.name: set(s.deps) for s in stages}
+    while remaining:
+        ready = [name for name, deps in remaining.items() if not deps]
+        if not ready:
+            raise ValueError(f"Dependency cycle among stages: {sorted(remaining)}")
+        for name in ready:
+            del remaining[name]
+        for deps in remaining.values():
+            deps.difference_update(ready)
+
+
+# ============================================================================
+# FINGERPRINTS
+# ============================================================================
+
+def file_digest(path):
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def stage_fingerprint(stage):
+    """SHA-256 over input contents, code files and config"""
+    h = hashlib.sha256()
+    for path in stage.expand_inputs():
+        h.update(str(Path(path).relative_to(BASE_DIR)).encode())
+        h.update(file_digest(path).encode())
+    for code in stage.code:
+        h.update(code.encode())
+        h.update(file_digest(BASE_DIR / code).encode())
+    h.update(json.dumps(stage.config, sort_keys=True).encode())
+    return h.hexdigest()
+
+
+def output_digests(stage):
+    return {o: file_digest(BASE_DIR / o) for o in stage.outputs if (BASE_DIR / o).exists()}
+
+
+def is_current(stage, fingerprint, state):
+    """True if the last successful run used the same fingerprint and
+    every output is still exactly what that run wrote"""
+    previous = state.get(stage.name)
+    if not previous or previous['fingerprint'] != fingerprint:
+        return False
+    return output_digests(stage) == previous['outputs'] and len(previous['outputs']) == len(stage.outputs)
+
+
+def load_state():
+    if STATE_FILE.exists():
+        with open(STATE_FILE) as f:
+            return json.load(f)
+    return {}
+
+
+def save_state(state):
+    with open(STATE_FILE, 'w') as f:
+        json.dump(state, f, indent=2, sort_keys=True)
+
+
+# ============================================================================
+# EXECUTION
+# ============================================================================
+
+def run_script(stage):
+    """Run one stage script in a subprocess; output goes to a log file"""
+    LOG_DIR.mkdir(exist_ok=True)
+    log_file = LOG_DIR / f"{stage.name}.log"
+    start = time.perf_counter()
+    with open(log_file, 'w') as log:
+        proc = subprocess.run([sys.executable, str(BASE_DIR / stage.script)],
+                              cwd=BASE_DIR, stdout=log, stderr=subprocess.STDOUT)
+    return proc.returncode, time.perf_counter() - start, log_file
+
+
+def select_stages(stages, only):
+    """Restrict to stages matching any --only prefix, plus their upstream"""
+    if not only:
+        return stages
+    by_name = {s.name: s for s in stages}
+    selected = set()
+    pending = [s.name for s in stages if any(s.name.startswith(prefix) for prefix in only)]
+    while pending:
+        name = pending.pop()
+        if name not in selected:
+            selected.add(name)
+            pending.extend(by_name[name].deps)
+    return [s for s in stages if s.name in selected]
+
+
+def run_pipeline(jobs=2, force=False, dry_run=False, only=None):
+    """Run the DAG; returns {stage_name: status}"""
+    stages = select_stages(build_stages(), only)
+    by_name = {s.name: s for s in stages}
+    state = load_state()
+    status = {}
+
+    print("\n" + "=" * 80)
+    print(f"PIPELINE: {len(stages)} stages, {jobs} parallel jobs")
+    print("=" * 80)
+
+    pending = {s.name for s in stages}
+    running = {}
+    with ThreadPoolExecutor(max_workers=jobs) as pool:
+        while pending or running:
+            # Submit every stage whose upstream has finished
+            for name in sorted(pending):
+                stage = by_name[name]
+                deps = stage.deps & set(by_name)
+                if any(status.get(d) is None for d in deps):
+                    continue
+                pending.discard(name)
+
+                if any(status[d] in ('failed', 'blocked') for d in deps):
+                    status[name] = 'blocked'
+                    print(f"   ⛔ {name:<32s} blocked (upstream failed)")
+                    continue
+
+                upstream_stale = any(status[d] == 'stale' for d in deps)
+                fingerprint = stage_fingerprint(stage)
+                if not force and not upstream_stale and is_current(stage, fingerprint, state):
+                    status[name] = 'fresh'
+                    print(f"   ✅ {name:<32s} up to date")
+                    continue
+                if dry_run:
+                    status[name] = 'stale'
+                    print(f"   🔄 {name:<32s} would run")
+                    continue
+
+                print(f"   ▶️  {name:<32s} running...")
+                running[pool.submit(run_script, stage)] = (stage, fingerprint)
+
+            if not running:
+                # Skipped stages may have unblocked others; loop again
+                continue
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                stage, fingerprint = running.pop(future)
+                returncode, elapsed, log_file = future.result()
+                if returncode == 0:
+                    status[stage.name] = 'ran'
+                    state[stage.name] = {'fingerprint': fingerprint, 'outputs': output_digests(stage)}
+                    save_state(state)
+                    print(f"   ✅ {stage.name:<32s} done in {elapsed:.1f}s")
+                else:
+                    status[stage.name] = 'failed'
+                    state.pop(stage.name, None)
+                    save_state(state)
+                    print(f"   ❌ {stage.name:<32s} failed (exit {returncode}) — see {log_file}")
+
+    counts = {}
+    for s in status.values():
+        counts[s] = counts.get(s, 0) + 1
+    print("\n📊 " + ", ".join(f"{v} {k}" for k, v in sorted(counts.items())))
+    return status
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Incremental smart beta pipeline")
+    parser.add_argument('--jobs', '-j', type=int, default=2, help="parallel stages")
+    parser.add_argument('--force', action='store_true', help="re-run every selected stage")
+    parser.add_argument('--dry-run', action='store_true', help="only report stale stages")
+    parser.add_argument('--only', nargs='*', help="stage name prefixes, e.g. nifty500 nifty500cash.analytics")
+    args = parser.parse_args()
+
+    status = run_pipeline(jobs=args.jobs, force=args.force, dry_run=args.dry_run, only=args.only)
+    sys.exit(1 if 'failed' in status.values() else 0)
+
+
+if __name__ == "__main__":
+    main()
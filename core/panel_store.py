@@ -0,0 +1,301 @@
+#!/usr/bin/env python3
+"""
+Panel Store
+Memory-mapped (days × assets) close matrices with append and zero-copy slicing
+
+A store is a directory:
+
+    dates.npy      datetime64[D] trading days, ascending
+    assets.json    {asset id: column}
+    meta.json      dtype, field names, display labels (e.g. 'NIFTY500 MOMENTUM 50')
+    closes.npy     T×N float32/float64, C-contiguous (one row per day)
+    <field>.npy    optional extra matrices of the same shape (ep, bp, dp, ...)
+
+Matrices are opened with np.memmap, so a multi-hundred-asset study pages in
+only the rows it touches, and a date-range slice is a view (no copy) because
+rows are contiguous. New days are appended in place: numpy leaves spare room
+in the .npy header for the row count to grow, so only the new rows are
+written. Values are appended before dates.npy is rewritten and readers use
+len(dates) rows, so an interrupted append leaves the store readable.
+
+Index data from data/ is ingested once (Index Name / "-" OHLC columns are
+dropped; the label is kept in meta.json), after which loaders read the store
+instead of re-parsing yearly CSV shards.
+
+Usage:
+    python3 core/panel_store.py ingest --out data_panel                # every index in data/
+    python3 core/panel_store.py ingest --out data_panel nifty500mom50 nifty500val50
+    python3 core/panel_store.py append data_panel                      # new days from the shards
+    python3 core/panel_store.py info data_panel
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+BASE_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(BASE_DIR))
+
+from core.universe import DATA_DIR
+
+DTYPES = ('float32', 'float64')
+PRIMARY_FIELD = 'closes'
+
+
+class PanelStore:
+    """A memory-mapped panel directory (see module docstring for the layout)"""
+
+    def __init__(self, folder, mode='r'):
+        self.folder = Path(folder)
+        if not (self.folder / "meta.json").exists():
+            raise FileNotFoundError(f"No panel store in {self.folder} (expected meta.json)")
+        self.mode = mode
+        with open(self.folder / "meta.json") as f:
+            self.meta = json.load(f)
+        with open(self.folder / "assets.json") as f:
+            self.assets = json.load(f)
+        self._open()
+
+    def _open(self):
+        self.dates = np.load(self.folder / "dates.npy")
+        self._fields = {}
+        for name in self.meta['fields']:
+            values = np.load(self.folder / f"{name}.npy", mmap_mode=self.mode)
+            # Rows beyond dates.npy belong to an unfinished append
+            self._fields[name] = values[:len(self.dates)]
+
+    # ---- creation -------------------------------------------------------
+
+    @classmethod
+    def create(cls, folder, dates, assets, fields, dtype='float32', labels=None):
+        """Write a new store; fields is {name: T×N array}, 'closes' required"""
+        if dtype not in DTYPES:
+            raise ValueError(f"dtype must be one of {DTYPES}, got {dtype!r}")
+        if PRIMARY_FIELD not in fields:
+            raise ValueError(f"a store needs a {PRIMARY_FIELD!r} field")
+        dates = np.asarray(pd.DatetimeIndex(dates).values.astype('datetime64[D]'))
+        if len(dates) > 1 and not (np.diff(dates) > np.timedelta64(0, 'D')).all():
+            raise ValueError("dates must be strictly increasing")
+        assets = list(assets)
+        shape = (len(dates), len(assets))
+
+        folder = Path(folder)
+        folder.mkdir(parents=True, exist_ok=True)
+        for name, values in fields.items():
+            if np.shape(values) != shape:
+                raise ValueError(f"field {name!r} has shape {np.shape(values)}, expected {shape}")
+            # Written through a memmap so large panels are never doubled in RAM
+            out = np.lib.format.open_memmap(folder / f"{name}.npy", mode='w+', dtype=dtype, shape=shape)
+            out[:] = values
+            out.flush()
+            del out
+        np.save(folder / "dates.npy", dates)
+        with open(folder / "assets.json", 'w') as f:
+            json.dump({asset: j for j, asset in enumerate(assets)}, f, indent=2)
+        with open(folder / "meta.json", 'w') as f:
+            json.dump({'dtype': dtype, 'fields': list(fields), 'labels': labels or {}}, f, indent=2)
+        return cls(folder)
+
+    # ---- access ---------------------------------------------------------
+
+    @property
+    def fields(self):
+        return list(self._fields)
+
+    @property
+    def symbols(self):
+        return sorted(self.assets, key=self.assets.get)
+
+    @property
+    def shape(self):
+        return self._fields[PRIMARY_FIELD].shape
+
+    @property
+    def closes(self):
+        return self._fields[PRIMARY_FIELD]
+
+    def __getitem__(self, field):
+        return self._fields[field]
+
+    def __contains__(self, asset):
+        return asset in self.assets
+
+    def label(self, asset):
+        return self.meta['labels'].get(asset, asset)
+
+    def rows(self, start=None, end=None):
+        """Row slice covering start..end inclusive (dates or strings, None = open)"""
+        lo = 0 if start is None else np.searchsorted(self.dates, np.datetime64(pd.Timestamp(start), 'D'))
+        hi = len(self.dates) if end is None else np.searchsorted(
+            self.dates, np.datetime64(pd.Timestamp(end), 'D'), side='right')
+        return slice(int(lo), int(hi))
+
+    def window(self, start=None, end=None, field=PRIMARY_FIELD):
+        """(dates, values) for a date range — both are views, nothing is copied"""
+        rows = self.rows(start, end)
+        return self.dates[rows], self._fields[field][rows]
+
+    def column(self, asset, field=PRIMARY_FIELD):
+        """One asset's full history as a strided view"""
+        return self._fields[field][:, self.assets[asset]]
+
+    def frame(self, asset, start=None, end=None):
+        """Daily frame shaped like the CSV loaders' output (Index Name, Date, Close)
+
+        Days on which the asset has no close are dropped.
+        """
+        rows = self.rows(start, end)
+        close = np.asarray(self.closes[rows, self.assets[asset]], dtype=np.float64)
+        dates = pd.DatetimeIndex(self.dates[rows])
+        keep = ~np.isnan(close)
+        return pd.DataFrame({'Index Name': self.label(asset), 'Date': dates[keep], 'Close': close[keep]})
+
+    # ---- append ---------------------------------------------------------
+
+    def append(self, dates, fields):
+        """Append new days (after the last stored date) for every field
+
+        fields is {name: k×N array} with columns in store order; every stored
+        field must be given.
+        """
+        dates = np.asarray(pd.DatetimeIndex(dates).values.astype('datetime64[D]'))
+        if not len(dates):
+            return 0
+        missing = set(self.fields) - set(fields)
+        if missing:
+            raise ValueError(f"append is missing field(s): {', '.join(sorted(missing))}")
+        if len(self.dates) and dates[0] <= self.dates[-1]:
+            raise ValueError(f"appended dates must start after {self.dates[-1]}")
+        if len(dates) > 1 and not (np.diff(dates) > np.timedelta64(0, 'D')).all():
+            raise ValueError("dates must be strictly increasing")
+
+        n, n_assets = self.shape
+        arrays = {}
+        for name in self.fields:
+            arrays[name] = np.ascontiguousarray(fields[name], dtype=self.meta['dtype'])
+            if arrays[name].shape != (len(dates), n_assets):
+                raise ValueError(f"field {name!r} has shape {arrays[name].shape}, "
+                                 f"expected {(len(dates), n_assets)}")
+
+        self._fields = {}   # release the maps before growing the files
+        for name, values in arrays.items():
+            _append_rows(self.folder / f"{name}.npy", n, values)
+        np.save(self.folder / "dates.npy", np.concatenate([self.dates, dates]))
+        self._open()
+        return len(dates)
+
+    def __repr__(self):
+        t, n = self.shape
+        span = f"{self.dates[0]}..{self.dates[-1]}" if t else "empty"
+        return f"PanelStore({str(self.folder)!r}, {t} days × {n} assets, {self.meta['dtype']}, {span})"
+
+
+def _append_rows(path, n_rows, values):
+    """Grow a C-ordered .npy file by len(values) rows in place"""
+    with open(path, 'r+b') as f:
+        version = np.lib.format.read_magic(f)
+        read_header = (np.lib.format.read_array_header_1_0 if version == (1, 0)
+                       else np.lib.format.read_array_header_2_0)
+        shape, fortran, dtype = read_header(f)
+        data_offset = f.tell()
+        if fortran or shape[1:] != values.shape[1:] or dtype != values.dtype:
+            raise ValueError(f"{path.name}: cannot append {values.dtype}{values.shape[1:]} "
+                             f"to {dtype}{shape[1:]}")
+
+        # Drop any rows left over from an interrupted append, then add ours
+        f.truncate(data_offset + n_rows * values[0].nbytes)
+        f.seek(0, 2)
+        f.write(values.tobytes())
+
+        header = {'descr': np.lib.format.dtype_to_descr(dtype), 'fortran_order': False,
+                  'shape': (n_rows + len(values),) + shape[1:]}
+        f.seek(0)
+        if version == (1, 0):
+            np.lib.format.write_array_header_1_0(f, header)
+        else:
+            np.lib.format.write_array_header_2_0(f, header)
+        if f.tell() != data_offset:
+            raise RuntimeError(f"{path.name}: header outgrew its padding; rebuild the store")
+
+
+# ============================================================================
+# INGEST FROM NSE SHARDS
+# ============================================================================
+
+def read_index_shards(data_folder, index_folders):
+    """(daily close matrix as a DataFrame indexed by Date, {folder: index label})"""
+    sys.path.insert(0, str(BASE_DIR / "nifty500" / "analysis"))
+    from nifty500_sip_returns import SIPAnalyzer
+
+    analyzer = SIPAnalyzer(data_folder)
+    columns, labels = {}, {}
+    for folder in index_folders:
+        df = analyzer.read_and_consolidate_index_data(folder)
+        labels[folder] = str(df['Index Name'].iloc[0])
+        columns[folder] = df.drop_duplicates('Date', keep='last').set_index('Date')['Close']
+    closes = pd.DataFrame(columns).sort_index()
+    return closes, labels
+
+
+def index_folders(data_folder=DATA_DIR):
+    """Index folders in a data directory (folders holding CSV shards)"""
+    return sorted(p.name for p in Path(data_folder).iterdir() if p.is_dir() and any(p.glob("*.csv")))
+
+
+def ingest(out, data_folder=DATA_DIR, folders=None, dtype='float64'):
+    """Build a store from the NSE shards of the given index folders"""
+    folders = folders or index_folders(data_folder)
+    closes, labels = read_index_shards(data_folder, folders)
+    return PanelStore.create(out, closes.index, folders, {PRIMARY_FIELD: closes.to_numpy()},
+                             dtype=dtype, labels=labels)
+
+
+def append_from_shards(store, data_folder=DATA_DIR):
+    """Append days newer than the store's last date from the shards; returns rows added"""
+    closes, _ = read_index_shards(data_folder, store.symbols)
+    if len(store.dates):
+        closes = closes[closes.index > pd.Timestamp(store.dates[-1])]
+    return store.append(closes.index, {PRIMARY_FIELD: closes[store.symbols].to_numpy()})
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Memory-mapped panel store")
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    p = sub.add_parser('ingest', help="build a store from index CSV shards")
+    p.add_argument('folders', nargs='*', help="index folders (default: all in --data)")
+    p.add_argument('--out', type=Path, required=True)
+    p.add_argument('--data', type=Path, default=DATA_DIR)
+    p.add_argument('--dtype', choices=DTYPES, default='float64')
+
+    p = sub.add_parser('append', help="append new days from the shards")
+    p.add_argument('store', type=Path)
+    p.add_argument('--data', type=Path, default=DATA_DIR)
+
+    p = sub.add_parser('info', help="describe a store")
+    p.add_argument('store', type=Path)
+
+    args = parser.parse_args()
+    if args.command == 'ingest':
+        store = ingest(args.out, args.data, args.folders, args.dtype)
+        print(f"✅ {store}")
+    elif args.command == 'append':
+        store = PanelStore(args.store, mode='r')
+        added = append_from_shards(store, args.data)
+        print(f"✅ Appended {added} day(s): {store}")
+    else:
+        store = PanelStore(args.store)
+        print(store)
+        for asset in store.symbols:
+            column = store.column(asset)
+            valid = np.flatnonzero(~np.isnan(column))
+            span = f"{store.dates[valid[0]]}..{store.dates[valid[-1]]}" if len(valid) else "no data"
+            print(f"   {asset:<20s} {store.label(asset):<35s} {len(valid):>6d} days  {span}")
+
+
+if __name__ == "__main__":
+    main()
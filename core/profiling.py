@@ -0,0 +1,244 @@
+"""
+Stage Profiling
+Wall/CPU time, peak RSS and tracemalloc allocations per pipeline stage
+
+Stages are marked with the @profiled decorator (methods like compute_signals,
+run_sip_on_portfolio, ...) or the stage() context manager, and a script's
+main() runs inside profile_run(), which writes a JSON run report next to the
+script's outputs. Everything is off unless enabled through the environment,
+so the decorators cost one attribute lookup in normal runs:
+
+  SMART_BETA_PROFILE=1     record stages, write <output>/<run>_run_report.json
+  SMART_BETA_CPROFILE=1    additionally dump <output>/profile/<run>.<stage>.prof
+                           (implies SMART_BETA_PROFILE; view with snakeviz/pstats)
+
+Only one cProfile profiler can be active at a time (a second enable() raises
+on Python 3.12+ and silently takes over the hook before that), so only the
+outermost stage is cProfiled; stages nested in it appear in its call tree.
+
+Usage:
+    SMART_BETA_PROFILE=1 python3 nifty500cash/analysis/nifty500cash_strategy.py
+"""
+
+import contextlib
+import functools
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+PROFILE_ENV = "SMART_BETA_PROFILE"
+CPROFILE_ENV = "SMART_BETA_CPROFILE"
+
+MB = 1024 * 1024
+
+
+def _env_flag(name):
+    return os.environ.get(name, '').strip().lower() not in ('', '0', 'false', 'no')
+
+
+def cprofile_enabled():
+    return _env_flag(CPROFILE_ENV)
+
+
+def profiling_enabled():
+    return _env_flag(PROFILE_ENV) or cprofile_enabled()
+
+
+def peak_rss_mb():
+    """Process high-water RSS in MB (None where unavailable)"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KB, macOS bytes
+    return peak / MB if sys.platform == 'darwin' else peak / 1024
+
+
+class RunProfiler:
+    """Collects stage records for one script run"""
+
+    def __init__(self, run_name, output_dir, cprofile=False):
+        self.run_name = run_name
+        self.output_dir = Path(output_dir)
+        self.cprofile = cprofile
+        self.records = []
+        self._stack = []
+        self._started_tracemalloc = False
+        self._start = None
+
+    # ---- stage bookkeeping --------------------------------------------
+
+    def start(self):
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracemalloc = True
+        self._start = (time.perf_counter(), time.process_time())
+
+    def stop(self):
+        if self._started_tracemalloc:
+            tracemalloc.stop()
+
+    @contextlib.contextmanager
+    def stage(self, name):
+        # tracemalloc has a single peak counter: fold it into the parent
+        # before resetting so nested stages do not hide the parent's peak
+        current, peak = tracemalloc.get_traced_memory()
+        if self._stack:
+            self._stack[-1]['peak'] = max(self._stack[-1]['peak'], peak)
+        tracemalloc.reset_peak()
+
+        frame = {'peak': current}
+        self._stack.append(frame)
+        profiler = None
+        if self.cprofile and len(self._stack) == 1:     # outermost stage only
+            import cProfile
+            profiler = cProfile.Profile()
+
+        rss_before = peak_rss_mb()
+        wall, cpu = time.perf_counter(), time.process_time()
+        if profiler:
+            try:
+                profiler.enable()
+            except ValueError:     # another profiler (e.g. python -m cProfile) is active
+                profiler = None
+        try:
+            yield
+        finally:
+            if profiler:
+                profiler.disable()
+            wall = time.perf_counter() - wall
+            cpu = time.process_time() - cpu
+            end_current, end_peak = tracemalloc.get_traced_memory()
+            frame['peak'] = max(frame['peak'], end_peak)
+            self._stack.pop()
+            if self._stack:
+                self._stack[-1]['peak'] = max(self._stack[-1]['peak'], frame['peak'])
+            tracemalloc.reset_peak()
+
+            rss_after = peak_rss_mb()
+            record = {
+                'stage': name,
+                'depth': len(self._stack),
+                'wall_s': round(wall, 6),
+                'cpu_s': round(cpu, 6),
+                'peak_rss_mb': None if rss_after is None else round(rss_after, 2),
+                'peak_rss_growth_mb': None if rss_after is None else round(rss_after - rss_before, 2),
+                'tracemalloc_peak_mb': round((frame['peak'] - current) / MB, 3),
+                'tracemalloc_net_mb': round((end_current - current) / MB, 3),
+            }
+            if profiler:
+                record['cprofile'] = str(self._dump_cprofile(profiler, name, len(self.records)))
+            self.records.append(record)
+
+    def _dump_cprofile(self, profiler, name, index):
+        profile_dir = self.output_dir / "profile"
+        profile_dir.mkdir(parents=True, exist_ok=True)
+        path = profile_dir / f"{self.run_name}.{index:02d}.{name}.prof"
+        profiler.dump_stats(path)
+        return path
+
+    # ---- report ---------------------------------------------------------
+
+    def summary(self):
+        """Aggregate records by stage name (a stage may run several times)"""
+        totals = {}
+        for r in self.records:
+            t = totals.setdefault(r['stage'], {'calls': 0, 'wall_s': 0.0, 'cpu_s': 0.0,
+                                               'tracemalloc_peak_mb': 0.0})
+            t['calls'] += 1
+            t['wall_s'] = round(t['wall_s'] + r['wall_s'], 6)
+            t['cpu_s'] = round(t['cpu_s'] + r['cpu_s'], 6)
+            t['tracemalloc_peak_mb'] = max(t['tracemalloc_peak_mb'], r['tracemalloc_peak_mb'])
+        return totals
+
+    def report(self):
+        wall0, cpu0 = self._start
+        return {
+            'run': self.run_name,
+            'generated_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'total_wall_s': round(time.perf_counter() - wall0, 6),
+            'total_cpu_s': round(time.process_time() - cpu0, 6),
+            'peak_rss_mb': None if peak_rss_mb() is None else round(peak_rss_mb(), 2),
+            'summary': self.summary(),
+            'stages': self.records,
+            'cache': _memo_stats(),
+        }
+
+    def write_report(self):
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        path = self.output_dir / f"{self.run_name}_run_report.json"
+        with open(path, 'w') as f:
+            json.dump(self.report(), f, indent=2)
+        return path
+
+
+def _memo_stats():
+    """Stage-cache hit/miss counts, if core.memo is in use"""
+    memo = sys.modules.get('core.memo')
+    return memo.stats() if memo else {}
+
+
+_active = None
+
+
+@contextlib.contextmanager
+def profile_run(run_name, output_dir):
+    """Profile a whole script run; writes the JSON report on exit when enabled"""
+    global _active
+    if not profiling_enabled() or _active is not None:
+        yield _active
+        return
+
+    _active = RunProfiler(run_name, output_dir, cprofile=cprofile_enabled())
+    _active.start()
+    try:
+        yield _active
+    finally:
+        profiler, _active = _active, None
+        profiler.stop()
+        path = profiler.write_report()
+        print(f"\n⏱️  Stage profile written to: {path}")
+        for name, t in profiler.summary().items():
+            print(f"   {name:<45s} {t['calls']:>3d}x {t['wall_s']:>8.3f}s wall "
+                  f"{t['cpu_s']:>8.3f}s cpu {t['tracemalloc_peak_mb']:>8.1f} MB peak")
+        cache = _memo_stats()
+        if cache:
+            print(f"   ♻️  Stage cache: {sys.modules['core.memo'].format_stats(cache)}")
+
+
+@contextlib.contextmanager
+def stage(name):
+    """Record a block as a stage of the active run (no-op when not profiling)"""
+    if _active is None:
+        yield
+        return
+    with _active.stage(name):
+        yield
+
+
+def profiled(func=None, *, name=None):
+    """Decorator form of stage(); the stage name defaults to the qualified name"""
+    if func is None:
+        return functools.partial(profiled, name=name)
+
+    stage_name = name or func.__qualname__
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        if _active is None:
+            return func(*args, **kwargs)
+        with _active.stage(stage_name):
+            return func(*args, **kwargs)
+
+    return wrapper
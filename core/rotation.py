@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+"""
+N-Factor Rotation Engine
+Relative-momentum rotation across any number of factor indices
+
+Generalizes the momentum/value pair: prices are a T×N matrix (one column per
+factor index — momentum, value, low-vol, quality, alpha, equal-weight, ...)
+and every step is a vectorized cross-sectional operation, so adding a factor
+adds a column, not a code path, and runtime grows linearly in N:
+
+  1. Relative momentum: lookback return minus the cross-sectional mean
+  2. Top-k selection per rebalance date (np.argpartition along the factor axis)
+  3. Weights: equal, rank-weighted or inverse-volatility over the selected k
+  4. Hold between rebalances, then shift by the execution lag (signal at end
+     of month t → allocation in month t+1)
+
+The output frame keeps the pair strategies' column conventions (Close_<f>,
+Return_<f>, w_<f>, Portfolio_Return, Portfolio_NAV, regime), so with factors
+named 'mom' and 'val' it can be fed to the existing SIP and analytics code.
+
+Usage:
+    python3 core/rotation.py                               # nifty500 mom/val
+    python3 core/rotation.py --universe nifty200 --lookback 3 --rebalance Q
+    python3 core/rotation.py --factor lowvol=path/lowvol_monthly.csv --top-k 2
+"""
+
+import argparse
+import contextlib
+import io
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+BASE_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(BASE_DIR))
+
+from core.universe import UNIVERSES, get_universe
+
+WEIGHTINGS = ('equal', 'rank', 'inverse_vol')
+REBALANCE_FREQS = {'M': 1, 'Q': 3, 'H': 6, 'Y': 12}   # months per period
+
+
+# ============================================================================
+# PRICE MATRIX
+# ============================================================================
+
+def load_price_matrix(files):
+    """T×N month-end price matrix from {factor: monthly CSV with Date, Close}
+
+    Dates are inner-joined so every row has a price for every factor.
+    """
+    frames = []
+    for name, path in files.items():
+        df = pd.read_csv(path, usecols=['Date', 'Close'])
+        df['Date'] = pd.to_datetime(df['Date'])
+        frames.append(df.set_index('Date')['Close'].rename(name))
+    prices = pd.concat(frames, axis=1, join='inner').sort_index()
+    prices.index.name = 'Date'
+    return prices
+
+
+def universe_price_matrix(universe):
+    """Momentum/value price matrix (factors 'mom', 'val') for a registered universe"""
+    u = get_universe(universe)
+    return load_price_matrix({'mom': u.mom_monthly_csv, 'val': u.val_monthly_csv})
+
+
+# ============================================================================
+# ENGINE
+# ============================================================================
+
+class RotationEngine:
+    """Top-k relative-momentum rotation over the columns of a price matrix"""
+
+    def __init__(self, lookback=6, top_k=1, weighting='equal', rebalance='M',
+                 lag=1, vol_window=12, initial=None):
+        if weighting not in WEIGHTINGS:
+            raise ValueError(f"weighting must be one of {WEIGHTINGS}, got {weighting!r}")
+        if rebalance not in REBALANCE_FREQS:
+            raise ValueError(f"rebalance must be one of {sorted(REBALANCE_FREQS)}, got {rebalance!r}")
+        if top_k < 1:
+            raise ValueError("top_k must be at least 1")
+        self.lookback = lookback
+        self.top_k = top_k
+        self.weighting = weighting
+        self.rebalance = rebalance
+        self.lag = lag
+        self.vol_window = vol_window
+        # Factor held before the first signal (default: first column)
+        self.initial = initial
+
+    # ---- cross-sectional steps (T×N arrays) ---------------------------
+
+    def relative_momentum(self, prices):
+        """Lookback return minus the cross-sectional mean (NaN until available)"""
+        p = np.asarray(prices, dtype=float)
+        ret = np.full_like(p, np.nan)
+        ret[self.lookback:] = p[self.lookback:] / p[:-self.lookback] - 1
+
+        count = (~np.isnan(ret)).sum(axis=1, keepdims=True)
+        mean = np.nansum(ret, axis=1, keepdims=True) / np.maximum(count, 1)
+        return ret - mean
+
+    def select(self, scores):
+        """Boolean T×N mask of the top-k scores per row (rows without scores: none)"""
+        t, n = scores.shape
+        k = min(self.top_k, n)
+        valid = ~np.isnan(scores)
+        ranked = np.where(valid, scores, -np.inf)
+        top = np.argpartition(-ranked, k - 1, axis=1)[:, :k]
+
+        mask = np.zeros((t, n), dtype=bool)
+        np.put_along_axis(mask, top, True, axis=1)
+        return mask & valid & valid.any(axis=1, keepdims=True)
+
+    def assign_weights(self, mask, scores, returns):
+        """Weights over the selected factors; rows sum to 1 (or are all NaN)"""
+        if self.weighting == 'equal':
+            raw = mask.astype(float)
+        elif self.weighting == 'rank':
+            # Best of the k selected gets k points, worst gets 1
+            order = np.argsort(np.argsort(np.where(mask, scores, -np.inf), axis=1), axis=1)
+            unselected = mask.shape[1] - mask.sum(axis=1, keepdims=True)
+            raw = np.where(mask, order - unselected + 1, 0.0)
+        else:
+            vol = pd.DataFrame(returns).rolling(self.vol_window, min_periods=2).std().to_numpy()
+            raw = np.where(mask & (vol > 0), 1.0 / np.where(vol > 0, vol, 1.0), 0.0)
+            # Fall back to equal weights where volatility is not yet available
+            raw = np.where(raw.sum(axis=1, keepdims=True) > 0, raw, mask.astype(float))
+
+        total = raw.sum(axis=1, keepdims=True)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return np.where(total > 0, raw / total, np.nan)
+
+    def rebalance_rows(self, dates):
+        """True on the last month of each rebalance period"""
+        dates = pd.DatetimeIndex(dates)
+        period = (dates.year * 12 + dates.month - 1) // REBALANCE_FREQS[self.rebalance]
+        return np.append(period[1:] != period[:-1], True)
+
+    # ---- full run ---------------------------------------------------------
+
+    def run(self, prices):
+        """Run the rotation on a price matrix (DataFrame indexed by Date)"""
+        names = list(prices.columns)
+        p = prices.to_numpy(dtype=float)
+        returns = np.full_like(p, np.nan)
+        returns[1:] = p[1:] / p[:-1] - 1
+
+        scores = self.relative_momentum(p)
+        mask = self.select(scores)
+        target = self.assign_weights(mask, scores, returns)
+
+        # Decisions only on rebalance rows, held until the next one
+        target[~self.rebalance_rows(prices.index)] = np.nan
+        weights = pd.DataFrame(target).ffill()
+
+        # Execution lag, then the initial allocation until the first signal
+        initial = np.zeros(len(names))
+        initial[names.index(self.initial) if self.initial is not None else 0] = 1.0
+        weights = weights.shift(self.lag).to_numpy(copy=True)
+        weights[np.isnan(weights).all(axis=1)] = initial
+
+        portfolio_return = np.nansum(weights * np.nan_to_num(returns), axis=1)
+        portfolio_return[0] = np.nan
+        nav = 1000 * np.cumprod(1 + np.nan_to_num(portfolio_return))
+
+        columns = {'Date': prices.index}
+        for prefix, matrix in (('Close', p), ('Return', returns), ('RelMom', scores), ('w', weights)):
+            columns.update({f'{prefix}_{name}': matrix[:, j] for j, name in enumerate(names)})
+        columns['regime'] = np.asarray(names, dtype=object)[weights.argmax(axis=1)]
+        columns['Portfolio_Return'] = portfolio_return
+        columns['Portfolio_NAV'] = nav
+        return pd.DataFrame(columns)
+
+
+def rotation_summary(df, names):
+    """Switches and average weights per factor"""
+    switches = int((df['regime'] != df['regime'].shift(1)).sum() - 1)
+    return {
+        'switches': switches,
+        'avg_weights': {n: round(float(df[f'w_{n}'].mean()), 4) for n in names},
+    }
+
+
+def main():
+    sys.path.insert(0, str(BASE_DIR / "nifty500" / "analysis"))
+    from nifty500_portfolio_strategy import PortfolioStrategy
+
+    parser = argparse.ArgumentParser(description="N-factor relative momentum rotation")
+    parser.add_argument('--universe', default='nifty500', choices=list(UNIVERSES),
+                        help="momentum/value pair to start from")
+    parser.add_argument('--factor', action='append', default=[], metavar='NAME=CSV',
+                        help="extra factor monthly CSV (Date, Close); repeatable")
+    parser.add_argument('--lookback', type=int, default=6, help="months")
+    parser.add_argument('--top-k', type=int, default=1)
+    parser.add_argument('--weighting', choices=WEIGHTINGS, default='equal')
+    parser.add_argument('--rebalance', choices=sorted(REBALANCE_FREQS), default='M')
+    parser.add_argument('--lag', type=int, default=1, help="execution lag in months")
+    parser.add_argument('--sip', type=float, default=10000)
+    parser.add_argument('--output', type=Path, help="save the rotation frame as CSV")
+    args = parser.parse_args()
+
+    u = get_universe(args.universe)
+    files = {'mom': u.mom_monthly_csv, 'val': u.val_monthly_csv}
+    for spec in args.factor:
+        name, _, path = spec.partition('=')
+        if not path:
+            parser.error(f"--factor expects NAME=CSV, got {spec!r}")
+        files[name] = Path(path)
+
+    prices = load_price_matrix(files)
+    engine = RotationEngine(lookback=args.lookback, top_k=args.top_k, weighting=args.weighting,
+                            rebalance=args.rebalance, lag=args.lag)
+    df = engine.run(prices)
+
+    print("\n" + "=" * 80)
+    print(f"N-FACTOR ROTATION — {u.label}: {', '.join(prices.columns)} "
+          f"({args.lookback}M lookback, top {args.top_k}, {args.weighting}, rebalance {args.rebalance})")
+    print("=" * 80)
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        results, _ = PortfolioStrategy(BASE_DIR / "data", monthly_sip=args.sip).run_sip_on_portfolio(df, 'rotation')
+    summary = rotation_summary(df, list(prices.columns))
+
+    print(f"\n   Months:          {len(df)}  ({df['Date'].iloc[0]:%Y-%m} to {df['Date'].iloc[-1]:%Y-%m})")
+    print(f"   Index CAGR:      {results['index_cagr']:.2f}%")
+    print(f"   SIP XIRR:        {results['sip_xirr']:.2f}%")
+    print(f"   Max Drawdown:    {results['max_drawdown']:.2f}%")
+    print(f"   MAR Ratio:       {results['mar_ratio']:.2f}")
+    print(f"   Switches:        {summary['switches']}")
+    for name, w in summary['avg_weights'].items():
+        print(f"   Avg w_{name:<10s} {w * 100:.1f}%")
+
+    if args.output:
+        df.to_csv(args.output, index=False)
+        print(f"\n✅ Saved rotation frame to: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,321 @@
+#!/usr/bin/env python3
+"""
+SIP Execution-Day Sensitivity
+SIP on every possible execution day of the month, straight from daily closes
+
+The published SIP figures (SIPAnalyzer.get_monthly_closes) invest on the last
+trading day of each month. This engine replays the same SIP for every
+execution day at once: calendar days 1-28 (the first trading day on or after
+that date, as a mandate would execute) or the Nth trading day of the month.
+Execution rows are precomputed as an (months × variants) index matrix, so the
+purchase prices of all variants and series are one gather from the daily
+close matrix; units, final value and XIRR follow as array operations
+(core.xirr.xirr_columns solves every variant's XIRR together).
+
+Series:
+  - the universe's raw momentum and value indices
+  - Simple Momentum and (nifty500) MOMCASH, rebuilt as daily NAVs: each
+    month's weights are held buy-and-hold from the previous month-end, so the
+    daily NAV matches the monthly backtest's NAV on every month-end it has
+
+Every variant is valued on the last daily close. The 'EOM' row is the
+published month-end convention and every series invests in every month of
+the daily data. The published Simple Momentum SIP runs on the 247 months
+where both indices share a month-end date, so its EOM XIRR differs from the
+published figure by about 0.01% (20.54% vs 20.53% on nifty500). MOMCASH and
+the indices agree with their published SIPs to the displayed precision.
+
+Usage:
+    python3 core/sip_timing.py                              # nifty500, calendar days 1-28
+    python3 core/sip_timing.py --universe nifty200 --mode trading
+    python3 core/sip_timing.py --days 1 5 10 15 20 25 --sip 25000
+"""
+
+import argparse
+import contextlib
+import io
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+BASE_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(BASE_DIR))
+sys.path.insert(0, str(BASE_DIR / "nifty500" / "analysis"))
+sys.path.insert(0, str(BASE_DIR / "nifty500cash" / "analysis"))
+
+from core.universe import DATA_DIR, UNIVERSES, get_universe
+from core.xirr import xirr_columns
+
+MODES = ('calendar', 'trading')
+DEFAULT_DAYS = {'calendar': range(1, 29), 'trading': range(1, 21)}
+MOMCASH_UNIVERSE = 'nifty500'
+
+
+# ============================================================================
+# EXECUTION ROWS
+# ============================================================================
+
+def month_bounds(dates):
+    """(first, last) row of each calendar month in a sorted daily DatetimeIndex"""
+    dates = pd.DatetimeIndex(dates)
+    code = dates.year * 12 + dates.month
+    first = np.flatnonzero(np.append(True, code[1:] != code[:-1]))
+    last = np.append(first[1:] - 1, len(dates) - 1)
+    return first, last
+
+
+def execution_rows(dates, days, mode='calendar'):
+    """months × variants matrix of daily row positions, plus an 'EOM' column
+
+    calendar: first trading day on or after day d of the month
+    trading:  d-th trading day of the month
+    Either way capped at the month's last trading day.
+    """
+    if mode not in MODES:
+        raise ValueError(f"mode must be one of {MODES}, got {mode!r}")
+    dates = pd.DatetimeIndex(dates)
+    first, last = month_bounds(dates)
+    days = np.asarray(list(days), dtype=int)
+
+    if mode == 'calendar':
+        month_start = dates[first].to_period('M').to_timestamp().to_numpy()
+        targets = month_start[:, None] + (days[None, :] - 1).astype('timedelta64[D]')
+        rows = np.searchsorted(dates.to_numpy(), targets, side='left')
+    else:
+        rows = first[:, None] + days[None, :] - 1
+    rows = np.minimum(rows, last[:, None])
+    return np.column_stack([rows, last])
+
+
+# ============================================================================
+# DAILY STRATEGY NAV
+# ============================================================================
+
+def cash_index(dates, monthly_return):
+    """Daily cash 'price' that compounds monthly_return evenly over each month's trading days"""
+    first, last = month_bounds(dates)
+    per_day = np.repeat((1 + monthly_return) ** (1 / (last - first + 1)), last - first + 1)
+    return pd.Series(1000 * np.cumprod(per_day), index=pd.DatetimeIndex(dates))
+
+
+def daily_strategy_nav(closes, weights):
+    """Daily NAV (base 1000 at the first month-end) from monthly target weights
+
+    closes:  daily closes, one column per asset held (DataFrame indexed by Date)
+    weights: monthly frame with Date and one weight column per asset (same
+             names as closes), already lagged — the weights held during that
+             month, as in the strategies' w_mom / w_val / w_cash
+
+    Between month-ends the portfolio is buy-and-hold from the previous
+    month-end; on every month-end it equals the monthly NAV.
+    """
+    dates = pd.DatetimeIndex(closes.index)
+    first, last = month_bounds(dates)
+    months = dates[first].to_period('M')
+    w = (weights.assign(_month=pd.DatetimeIndex(weights['Date']).to_period('M'))
+         .set_index('_month')[list(closes.columns)].reindex(months).to_numpy(dtype=float))
+    if np.isnan(w).any():
+        raise ValueError("weights do not cover every month of the daily closes")
+
+    p = closes.to_numpy(dtype=float)
+    base = np.append(last[0], last[:-1])                  # previous month-end (own for the first)
+    growth = (w * p[last] / p[base]).sum(axis=1)
+    prev_nav = 1000 * np.cumprod(growth) / growth
+
+    month = np.repeat(np.arange(len(first)), last - first + 1)
+    nav = prev_nav[month] * (w[month] * p / p[base[month]]).sum(axis=1)
+    return pd.Series(nav, index=dates)
+
+
+# ============================================================================
+# DATA
+# ============================================================================
+
+def load_index_closes(universe, data_folder=DATA_DIR):
+    """Daily closes of the universe's momentum and value indices (columns mom, val)
+
+    On the union of both indices' dates, NaN where an index did not print.
+    """
+    from core.panel_store import read_index_shards
+
+    u = get_universe(universe)
+    closes, _ = read_index_shards(data_folder, [u.mom_folder, u.val_folder])
+    return closes.rename(columns={u.mom_folder: 'mom', u.val_folder: 'val'})
+
+
+def load_daily_closes(universe, data_folder=DATA_DIR):
+    """load_index_closes with a day one index did not print carrying its
+    previous close, so each month's last row holds each index's own
+    month-end close
+    """
+    return load_index_closes(universe, data_folder).ffill().dropna()
+
+
+def monthly_closes(closes):
+    """Last trading day of each month (what get_monthly_closes produces)"""
+    _, last = month_bounds(closes.index)
+    return closes.iloc[last].rename_axis('Date').reset_index()
+
+
+def published_closes(raw):
+    """(merged, mom): month-end closes as the published backtests read them
+
+    raw: load_index_closes output. Each index keeps its own last print of
+    the month; merged (Date, Close_mom, Close_val) has only the months where
+    both indices' last trading day is the same date, like the strategies'
+    inner join, and mom (Date, Close) is the momentum index alone (MOMCASH).
+    """
+    own = {col: monthly_closes(raw[[col]].dropna()) for col in ('mom', 'val')}
+    merged = pd.merge(own['mom'].rename(columns={'mom': 'Close_mom'}),
+                      own['val'].rename(columns={'val': 'Close_val'}), on='Date', how='inner')
+    return merged, own['mom'].rename(columns={'mom': 'Close'})
+
+
+def strategy_portfolios(universe, merged, data_folder=DATA_DIR, monthly_sip=10000, mom=None):
+    """{name: monthly portfolio frame} of Simple Momentum (and MOMCASH on nifty500)
+
+    merged: month-end closes with Date, Close_mom, Close_val
+    mom:    momentum month-end closes (Date, Close) for MOMCASH, if they
+            differ from merged's (MOMCASH reads the momentum index alone)
+    """
+    from nifty500_portfolio_strategy import PortfolioStrategy
+
+    portfolios = {}
+    with contextlib.redirect_stdout(io.StringIO()):
+        portfolios['Simple Momentum'] = PortfolioStrategy(
+            data_folder, monthly_sip=monthly_sip).build_portfolio(merged.copy())
+
+        if universe == MOMCASH_UNIVERSE:
+            from nifty500cash_strategy import MOMCASHStrategy
+
+            strategy = MOMCASHStrategy(data_folder, monthly_sip=monthly_sip)
+            if mom is None:
+                mom = merged[['Date', 'Close_mom']].rename(columns={'Close_mom': 'Close'})
+            df = strategy.load_monthly_data(mom)
+            df = strategy.calculate_risk_score(strategy.compute_signals(df))
+            portfolios['MOMCASH'] = strategy.calculate_portfolio_returns(df)
+    return portfolios
+
+
+def strategy_navs(universe, raw, data_folder=DATA_DIR, monthly_sip=10000):
+    """{name: daily NAV} of the strategies rebuilt from their monthly weights
+
+    raw: load_index_closes output. The strategies run on the published
+    month-ends (published_closes); a month Simple Momentum skips (the
+    indices' last trading days differ) holds the next month's weights, which
+    the backtest applies across both months, so the daily NAV equals the
+    published NAV on every month-end the backtest has.
+    """
+    from nifty500cash_strategy import CASH_MONTHLY_RETURN
+
+    closes = raw.ffill().dropna()
+    merged, mom = published_closes(raw)
+    portfolios = strategy_portfolios(universe, merged, data_folder, monthly_sip, mom=mom)
+
+    months = closes.index.to_period('M').unique()
+    rotation = portfolios['Simple Momentum']
+    weights = (rotation.set_index(rotation['Date'].dt.to_period('M'))[['w_mom', 'w_val']]
+               .reindex(months).bfill().rename(columns={'w_mom': 'mom', 'w_val': 'val'}))
+    navs = {'Simple Momentum': daily_strategy_nav(closes, weights.assign(Date=months.to_timestamp()))}
+    if 'MOMCASH' in portfolios:
+        held = closes[['mom']].assign(cash=cash_index(closes.index, CASH_MONTHLY_RETURN))
+        navs['MOMCASH'] = daily_strategy_nav(
+            held, portfolios['MOMCASH'].rename(columns={'w_mom': 'mom', 'w_cash': 'cash'}))
+    return navs
+
+
+# ============================================================================
+# ENGINE
+# ============================================================================
+
+def simulate(series, rows, sip=10000):
+    """SIP for every execution variant and series at once
+
+    series: daily values, one column per series (DataFrame indexed by Date)
+    rows:   months × variants execution rows (from execution_rows)
+
+    Returns {metric: variants × series array} with units, invested, value,
+    xirr and avg_cost (average purchase price).
+    """
+    values = series.to_numpy(dtype=float)
+    dates = pd.DatetimeIndex(series.index)
+    # First month where every series has a value
+    start = np.flatnonzero(~np.isnan(values[rows]).any(axis=(1, 2)))[0]
+    rows = rows[start:]
+
+    prices = values[rows]                                  # months × variants × series
+    units = (sip / prices).sum(axis=0)
+    invested = sip * len(rows)
+    value = units * values[-1]
+
+    day = (dates - dates[0]).days.to_numpy()
+    flow_days = np.concatenate([day[rows], np.full((1, rows.shape[1]), day[-1])])
+    flow_days = flow_days - flow_days[0]
+    n_months, n_variants, n_series = prices.shape
+    amounts = np.concatenate([np.full((n_months, n_variants, n_series), -float(sip)), value[None]])
+    xirr = xirr_columns(np.broadcast_to(flow_days[:, :, None], amounts.shape), amounts)
+
+    return {'units': units, 'invested': np.full(units.shape, float(invested)), 'value': value,
+            'xirr': xirr, 'avg_cost': invested / units}
+
+
+def sensitivity(universe='nifty500', days=None, mode='calendar', sip=10000, data_folder=DATA_DIR):
+    """XIRR per execution variant (rows: days + 'EOM') for indices and strategies"""
+    days = list(days or DEFAULT_DAYS[mode])
+    raw = load_index_closes(universe, data_folder)
+    closes = raw.ffill().dropna()
+    u = get_universe(universe)
+    series = pd.DataFrame({f'{u.label} Momentum': closes['mom'], f'{u.label} Value': closes['val'],
+                           **strategy_navs(universe, raw, data_folder, sip)})
+
+    rows = execution_rows(series.index, days, mode)
+    result = simulate(series, rows, sip)
+    index = [f'{"Day" if mode == "calendar" else "TD"} {d}' for d in days] + ['EOM']
+    return {metric: pd.DataFrame(values, index=index, columns=series.columns)
+            for metric, values in result.items()}
+
+
+# ============================================================================
+# MAIN
+# ============================================================================
+
+def main():
+    parser = argparse.ArgumentParser(description="SIP XIRR sensitivity to the execution day")
+    parser.add_argument('--universe', default='nifty500', choices=list(UNIVERSES))
+    parser.add_argument('--mode', choices=MODES, default='calendar',
+                        help="calendar day of month, or Nth trading day")
+    parser.add_argument('--days', type=int, nargs='+', help="default 1-28 (calendar) / 1-20 (trading)")
+    parser.add_argument('--sip', type=float, default=10000)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    result = sensitivity(args.universe, args.days, args.mode, args.sip)
+    elapsed = time.perf_counter() - start
+    xirr = result['xirr']
+
+    print(f"\n📅 SIP execution-day sensitivity — {get_universe(args.universe).label} "
+          f"({args.mode}, {len(xirr) - 1} variants + month-end) in {elapsed:.2f}s")
+    names = list(xirr.columns)
+    print(f"\n{'Variant':<8s}" + ''.join(f"{n[:22]:>24s}" for n in names))
+    print("-" * (8 + 24 * len(names)))
+    for variant, row in xirr.iterrows():
+        print(f"{variant:<8s}" + ''.join(f"{v:>23.2f}%" for v in row))
+
+    days_only = xirr.drop(index='EOM')
+    print("-" * (8 + 24 * len(names)))
+    for label, values in (('Min', days_only.min()), ('Max', days_only.max()),
+                          ('Spread', days_only.max() - days_only.min()),
+                          ('EOM-Med', xirr.loc['EOM'] - days_only.median())):
+        print(f"{label:<8s}" + ''.join(f"{v:>23.2f}%" for v in values))
+
+    print("\n   Best / worst execution day per series:")
+    for name in names:
+        print(f"   {name:<32s} best {days_only[name].idxmax():<7s} {days_only[name].max():.2f}%   "
+              f"worst {days_only[name].idxmin():<7s} {days_only[name].min():.2f}%")
+
+
+if __name__ == "__main__":
+    main()
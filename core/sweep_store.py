@@ -0,0 +1,257 @@
+#!/usr/bin/env python3
+"""
+Sweep Result Store
+Persists parameter-sweep results in SQLite so repeated sweeps only pay for new points
+
+Every result is keyed by (strategy, universe, parameter vector, data hash,
+code version): the data hash covers the input files (or frames) the sweep
+read, the code version the source files of the backtest. A sweep asks the
+store which of its configs are already present for the current data and
+code, runs only the missing ones and writes them back. Changing the data or
+the strategy code starts a fresh set of keys; old rows stay queryable.
+
+The headline metrics (XIRR, CAGR, MaxDD, MAR, switches) are real columns
+with indexes, so ranking queries such as "top 20 configs by MAR with MaxDD
+> -35%" do not scan the metrics JSON. Every metric the backtest returned is
+kept in that JSON column.
+
+Usage:
+    python3 core/sweep_store.py info
+    python3 core/sweep_store.py top --by mar --where "max_dd > -35" --limit 20
+    python3 core/sweep_store.py top --strategy quarterly_rotation --universe nifty500 --by xirr
+"""
+
+import argparse
+import hashlib
+import json
+import sqlite3
+import sys
+import time
+from pathlib import Path
+
+import pandas as pd
+
+BASE_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(BASE_DIR))
+
+from core.orchestrator import file_digest
+
+DEFAULT_DB = BASE_DIR / ".sweep_results.sqlite"
+
+# Indexed metric columns and the result-dict keys the sweep scripts use for them
+METRIC_COLUMNS = {
+    'xirr': ('xirr', 'sip_xirr'),
+    'cagr': ('cagr', 'index_cagr'),
+    'max_dd': ('max_dd', 'max_drawdown'),
+    'mar': ('mar', 'mar_ratio'),
+    'switches': ('switches',),
+}
+OPERATORS = ('<=', '>=', '!=', '=', '<', '>')
+
+SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS results (
+    strategy     TEXT NOT NULL,
+    universe     TEXT NOT NULL,
+    params       TEXT NOT NULL,
+    data_hash    TEXT NOT NULL,
+    code_version TEXT NOT NULL,
+    {', '.join(f'{column} REAL' for column in METRIC_COLUMNS)},
+    metrics      TEXT NOT NULL,
+    elapsed_s    REAL,
+    created_at   TEXT NOT NULL,
+    PRIMARY KEY (strategy, universe, params, data_hash, code_version)
+);
+{''.join(f'CREATE INDEX IF NOT EXISTS idx_results_{column} ON results ({column});' for column in METRIC_COLUMNS)}
+"""
+
+
+# ============================================================================
+# KEYS
+# ============================================================================
+
+def params_key(params):
+    """Canonical JSON of a parameter dict (sorted keys, plain numbers)"""
+    return json.dumps({k: _plain(v) for k, v in params.items()}, sort_keys=True)
+
+
+def data_hash(*sources):
+    """SHA-256 over input files and/or DataFrames"""
+    h = hashlib.sha256()
+    for source in sources:
+        if isinstance(source, pd.DataFrame):
+            h.update(pd.util.hash_pandas_object(source, index=False).values.tobytes())
+            h.update(','.join(map(str, source.columns)).encode())
+        else:
+            h.update(file_digest(source).encode())
+    return h.hexdigest()[:16]
+
+
+def code_version(*files):
+    """SHA-256 over the source files that implement the backtest"""
+    h = hashlib.sha256()
+    for path in files:
+        h.update(file_digest(path).encode())
+    return h.hexdigest()[:16]
+
+
+def _plain(value):
+    """numpy scalars → Python numbers (JSON / SQLite friendly)"""
+    if hasattr(value, 'item'):
+        value = value.item()
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    return value
+
+
+# ============================================================================
+# STORE
+# ============================================================================
+
+class SweepStore:
+    """SQLite table of sweep results with indexed headline metrics"""
+
+    def __init__(self, path=DEFAULT_DB):
+        self.path = Path(path)
+        # Sweeps may write from several worker processes at once
+        self.conn = sqlite3.connect(str(self.path), timeout=30)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def existing(self, strategy, universe, data_hash, code_version):
+        """{params_key: metrics} already stored for this data and code"""
+        rows = self.conn.execute(
+            "SELECT params, metrics FROM results "
+            "WHERE strategy = ? AND universe = ? AND data_hash = ? AND code_version = ?",
+            (strategy, universe, data_hash, code_version))
+        return {row['params']: json.loads(row['metrics']) for row in rows}
+
+    def put(self, strategy, universe, params, data_hash, code_version, metrics, elapsed_s=None):
+        metrics = {k: _plain(v) for k, v in metrics.items()}
+        indexed = [_metric(metrics, keys) for keys in METRIC_COLUMNS.values()]
+        with self.conn:
+            self.conn.execute(
+                f"INSERT OR REPLACE INTO results VALUES ({', '.join('?' * (len(METRIC_COLUMNS) + 8))})",
+                (strategy, universe, params_key(params), data_hash, code_version, *indexed,
+                 json.dumps(metrics), elapsed_s, time.strftime('%Y-%m-%d %H:%M:%S')))
+
+    def sweep(self, strategy, universe, grid, run, data_hash, code_version):
+        """Run `run(**params)` for each params dict in grid not already stored
+
+        Returns (results in grid order, number of configs computed).
+        """
+        stored = self.existing(strategy, universe, data_hash, code_version)
+        results, computed = [], 0
+        for params in grid:
+            key = params_key(params)
+            if key not in stored:
+                start = time.perf_counter()
+                metrics = run(**params)
+                self.put(strategy, universe, params, data_hash, code_version, metrics,
+                         time.perf_counter() - start)
+                stored[key] = {k: _plain(v) for k, v in metrics.items()}
+                computed += 1
+            results.append(stored[key])
+        return results, computed
+
+    def top(self, by='mar', where=(), strategy=None, universe=None, limit=20, ascending=False):
+        """Best rows by an indexed metric; where = [(column, operator, value), ...]"""
+        if by not in METRIC_COLUMNS:
+            raise ValueError(f"Can only rank by {list(METRIC_COLUMNS)}, got {by!r}")
+        clauses, args = [f"{by} IS NOT NULL"], []
+        for column, op, value in where:
+            if column not in METRIC_COLUMNS or op not in OPERATORS:
+                raise ValueError(f"Unsupported filter {column} {op} {value}")
+            clauses.append(f"{column} {op} ?")
+            args.append(value)
+        for column, value in (('strategy', strategy), ('universe', universe)):
+            if value:
+                clauses.append(f"{column} = ?")
+                args.append(value)
+
+        rows = self.conn.execute(
+            f"SELECT * FROM results WHERE {' AND '.join(clauses)} "
+            f"ORDER BY {by} {'ASC' if ascending else 'DESC'} LIMIT ?", (*args, limit))
+        return [dict(row) for row in rows]
+
+    def summary(self):
+        """Row counts per (strategy, universe, data_hash, code_version)"""
+        rows = self.conn.execute(
+            "SELECT strategy, universe, data_hash, code_version, COUNT(*) AS n, MAX(created_at) AS last "
+            "FROM results GROUP BY strategy, universe, data_hash, code_version ORDER BY strategy, universe")
+        return [dict(row) for row in rows]
+
+
+def _metric(metrics, keys):
+    for key in keys:
+        if metrics.get(key) is not None:
+            return float(metrics[key])
+    return None
+
+
+def parse_where(expression):
+    """'max_dd > -35' → ('max_dd', '>', -35.0)"""
+    for op in OPERATORS:
+        column, sep, value = expression.partition(op)
+        if sep:
+            return column.strip(), op, float(value)
+    raise ValueError(f"Expected '<metric> <op> <number>', got {expression!r}")
+
+
+# ============================================================================
+# MAIN
+# ============================================================================
+
+def main():
+    parser = argparse.ArgumentParser(description="Query the sweep result store")
+    parser.add_argument('--db', type=Path, default=DEFAULT_DB)
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    sub.add_parser('info', help="row counts per strategy / universe / data / code")
+
+    p = sub.add_parser('top', help="best configs by an indexed metric")
+    p.add_argument('--by', choices=list(METRIC_COLUMNS), default='mar')
+    p.add_argument('--where', action='append', default=[], help="e.g. \"max_dd > -35\" (repeatable)")
+    p.add_argument('--strategy')
+    p.add_argument('--universe')
+    p.add_argument('--limit', type=int, default=20)
+    p.add_argument('--ascending', action='store_true')
+
+    args = parser.parse_args()
+    if not args.db.exists():
+        sys.exit(f"❌ No sweep results yet ({args.db})")
+
+    with SweepStore(args.db) as store:
+        if args.command == 'info':
+            for row in store.summary():
+                print(f"   {row['strategy']:<24s} {row['universe']:<10s} data {row['data_hash']} "
+                      f"code {row['code_version']}  {row['n']:>5d} configs  (last {row['last']})")
+            return
+
+        try:
+            rows = store.top(args.by, [parse_where(w) for w in args.where], args.strategy,
+                             args.universe, args.limit, args.ascending)
+        except ValueError as e:
+            parser.error(str(e))
+
+    print(f"\n{'Strategy':<24s} {'Universe':<10s} {'XIRR':>7s} {'CAGR':>7s} {'MaxDD':>8s} "
+          f"{'MAR':>6s} {'Sw':>4s}  Params")
+    print("-" * 100)
+    for row in rows:
+        cells = [f"{row[c]:>7.2f}" if row[c] is not None else f"{'—':>7s}" for c in ('xirr', 'cagr', 'max_dd')]
+        mar = f"{row['mar']:>6.2f}" if row['mar'] is not None else f"{'—':>6s}"
+        switches = f"{row['switches']:>4.0f}" if row['switches'] is not None else f"{'—':>4s}"
+        print(f"{row['strategy']:<24s} {row['universe']:<10s} {' '.join(cells)} {mar} {switches}  {row['params']}")
+
+
+if __name__ == "__main__":
+    main()
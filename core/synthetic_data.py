@@ -0,0 +1,305 @@
+#!/usr/bin/env python3
+"""
+Synthetic NSE Index Data Generator
+Writes N indices × Y years of yearly CSV shards shaped exactly like data/
+
+Each shard matches the NSE historical download format used in data/:
+
+    "Index Name","Date","Open","High","Low","Close"
+    "SYNTH000 MOMENTUM 50","31 Dec 2010","-","-","-","4136.15"
+    ...                                   (newest first, one file per year)
+
+Returns come from a regime-switching process: a market-wide Markov chain
+over bull / sideways / bear regimes (geometric run lengths, per-regime drift
+and volatility) drives every index; each index adds a style-specific alpha
+and beta per regime plus idiosyncratic noise. Indices alternate momentum and
+value styles so consecutive indices form a universe pair:
+
+    synth000mom50, synth000val50, synth001mom50, ...
+
+generate_stock_panel() builds a stock-level universe (daily closes plus
+earnings/book/dividend yields) on the same market process, for the
+constituent backtester in core/constituents.py.
+
+Everything is reproducible from the seed; index i always gets the same
+series whatever N is. A JSON config (same shape as DEFAULT_CONFIG) overrides
+the process parameters.
+
+Usage:
+    python3 core/synthetic_data.py --indices 100 --years 50 --seed 7
+    python3 core/synthetic_data.py --out /tmp/synth --config regimes.json
+"""
+
+import argparse
+import copy
+import json
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+BASE_DIR = Path(__file__).parent.parent
+DEFAULT_OUTPUT = BASE_DIR / "data_synthetic"
+
+TRADING_DAYS = 252
+
+# Annualized parameters; durations are expected regime lengths in trading days
+DEFAULT_CONFIG = {
+    'regimes': {
+        'bull':     {'drift': 0.20, 'vol': 0.14, 'duration': 500, 'next': {'sideways': 0.7, 'bear': 0.3}},
+        'sideways': {'drift': 0.03, 'vol': 0.17, 'duration': 250, 'next': {'bull': 0.6, 'bear': 0.4}},
+        'bear':     {'drift': -0.30, 'vol': 0.30, 'duration': 120, 'next': {'bull': 0.5, 'sideways': 0.5}},
+    },
+    'styles': {
+        'momentum': {
+            'label': 'MOMENTUM',
+            'alpha': {'bull': 0.06, 'sideways': -0.02, 'bear': -0.06},
+            'beta': {'bull': 1.25, 'sideways': 1.05, 'bear': 1.30},
+            'idio_vol': 0.08,
+        },
+        'value': {
+            'label': 'VALUE',
+            'alpha': {'bull': -0.01, 'sideways': 0.03, 'bear': 0.02},
+            'beta': {'bull': 0.90, 'sideways': 0.95, 'bear': 1.00},
+            'idio_vol': 0.07,
+        },
+    },
+    'beta_dispersion': 0.10,   # per-index multiplicative jitter on betas
+    'start_level': 1000.0,
+}
+
+STYLE_ORDER = ('momentum', 'value')
+STYLE_KEYS = {'momentum': 'mom', 'value': 'val'}
+
+
+def load_config(path=None):
+    """DEFAULT_CONFIG, deep-merged with a JSON override file"""
+    config = copy.deepcopy(DEFAULT_CONFIG)
+    if path:
+        with open(path) as f:
+            _merge(config, json.load(f))
+    return config
+
+
+def _merge(base, override):
+    for key, value in override.items():
+        if isinstance(value, dict) and isinstance(base.get(key), dict):
+            _merge(base[key], value)
+        else:
+            base[key] = value
+
+
+# ============================================================================
+# RETURN PROCESS
+# ============================================================================
+
+def simulate_regimes(n_days, config, rng):
+    """Regime index per day from geometric run lengths; returns (codes, names)"""
+    names = list(config['regimes'])
+    params = [config['regimes'][n] for n in names]
+
+    codes = np.empty(n_days, dtype=np.int8)
+    state = 0
+    filled = 0
+    while filled < n_days:
+        length = rng.geometric(1.0 / params[state]['duration'])
+        codes[filled:filled + length] = state
+        filled += length
+
+        targets = params[state]['next']
+        probs = np.array([targets.get(n, 0.0) for n in names])
+        state = rng.choice(len(names), p=probs / probs.sum())
+    return codes, names
+
+
+def market_returns(codes, names, config, rng):
+    """Daily market log returns given the regime path"""
+    drift = np.array([config['regimes'][n]['drift'] for n in names]) / TRADING_DAYS
+    vol = np.array([config['regimes'][n]['vol'] for n in names]) / np.sqrt(TRADING_DAYS)
+    return drift[codes] - 0.5 * vol[codes] ** 2 + vol[codes] * rng.standard_normal(len(codes))
+
+
+def index_returns(market, codes, names, style, config, rng):
+    """Daily log returns for one index of the given style"""
+    params = config['styles'][style]
+    jitter = 1.0 + config['beta_dispersion'] * rng.standard_normal()
+    alpha = np.array([params['alpha'][n] for n in names]) / TRADING_DAYS
+    beta = np.array([params['beta'][n] for n in names]) * jitter
+    idio = params['idio_vol'] / np.sqrt(TRADING_DAYS)
+    return alpha[codes] + beta[codes] * market + idio * rng.standard_normal(len(market))
+
+
+def index_spec(i, size=50, prefix='synth', config=DEFAULT_CONFIG):
+    """(folder, index name, style) for the i-th generated index"""
+    style = STYLE_ORDER[i % 2]
+    pair = i // 2
+    folder = f"{prefix}{pair:03d}{STYLE_KEYS[style]}{size}"
+    name = f"{prefix.upper()}{pair:03d} {config['styles'][style]['label']} {size}"
+    return folder, name, style
+
+
+def generate_closes(n_indices, years, start_year=2005, seed=0, config=None, size=50, prefix='synth'):
+    """Business-day dates and {folder: (index name, closes)} for n_indices"""
+    config = config or load_config()
+    dates = pd.bdate_range(f"{start_year}-01-01", f"{start_year + years - 1}-12-31")
+
+    # Separate streams for the market and each index, so index i is the
+    # same whatever n_indices is
+    market_rng = np.random.default_rng(np.random.SeedSequence([seed, 0]))
+    codes, names = simulate_regimes(len(dates), config, market_rng)
+    market = market_returns(codes, names, config, market_rng)
+
+    series = {}
+    index_seeds = np.random.SeedSequence([seed, 1]).spawn(n_indices)
+    for i in range(n_indices):
+        folder, name, style = index_spec(i, size, prefix, config)
+        log_returns = index_returns(market, codes, names, style, config,
+                                    np.random.default_rng(index_seeds[i]))
+        log_returns[0] = 0.0
+        closes = config['start_level'] * np.exp(np.cumsum(log_returns))
+        series[folder] = (name, closes)
+    return dates, series, (codes, names)
+
+
+# ============================================================================
+# NSE-FORMAT WRITER
+# ============================================================================
+
+def write_nse_shards(folder, index_name, dates, closes):
+    """Yearly CSV shards: quoted header, 'dd Mon yyyy' dates newest first, '-' OHLC"""
+    folder = Path(folder)
+    folder.mkdir(parents=True, exist_ok=True)
+    frame = pd.DataFrame({'Date': pd.DatetimeIndex(dates), 'Close': np.asarray(closes)})
+    written = []
+    for year, rows in frame.groupby(frame['Date'].dt.year):
+        rows = rows.iloc[::-1]
+        lines = ['"Index Name","Date","Open","High","Low","Close"']
+        lines += [f'"{index_name}","{d}","-","-","-","{c:.2f}"'
+                  for d, c in zip(rows['Date'].dt.strftime('%d %b %Y'), rows['Close'])]
+        path = folder / f"{index_name}_Historical_PR_0101{year}to3112{year}.csv"
+        path.write_text('\n'.join(lines))
+        written.append(path)
+    return written
+
+
+def generate_dataset(output_dir=DEFAULT_OUTPUT, n_indices=2, years=20, start_year=2005,
+                     seed=0, config=None, size=50, prefix='synth'):
+    """Write the shards plus a manifest; returns the list of index folders"""
+    output_dir = Path(output_dir)
+    config = config or load_config()
+    dates, series, (codes, names) = generate_closes(n_indices, years, start_year, seed, config, size, prefix)
+
+    for folder, (name, closes) in series.items():
+        write_nse_shards(output_dir / folder, name, dates, closes)
+
+    regime_days = {n: int((codes == k).sum()) for k, n in enumerate(names)}
+    manifest = {
+        'seed': seed,
+        'n_indices': n_indices,
+        'years': years,
+        'start_year': start_year,
+        'trading_days': len(dates),
+        'regime_days': regime_days,
+        'indices': {folder: name for folder, (name, _) in series.items()},
+        'config': config,
+    }
+    with open(output_dir / "synthetic_manifest.json", 'w') as f:
+        json.dump(manifest, f, indent=2)
+    return list(series)
+
+
+# ============================================================================
+# STOCK PANELS
+# ============================================================================
+
+def generate_stock_panel(n_stocks, years, start_year=2005, seed=0, config=None, listed_pct=0.8):
+    """Daily closes and valuation yields for a synthetic stock universe
+
+    Stocks load on the same regime-switching market (beta ~ N(1, 0.25)) with
+    their own drift and idiosyncratic volatility. Earnings and book value
+    follow slow random walks, so earnings/book/dividend yields fall as a
+    stock re-rates — value and momentum scores pull in opposite directions
+    as they do in practice. listed_pct of the stocks trade from day one; the
+    rest list at random later dates (NaN before listing).
+
+    Returns (dates, closes, fundamentals) with closes T×N float32 and
+    fundamentals {'ep', 'bp', 'dp': T×N float32}.
+    """
+    config = config or load_config()
+    dates = pd.bdate_range(f"{start_year}-01-01", f"{start_year + years - 1}-12-31")
+    t = len(dates)
+
+    market_rng = np.random.default_rng(np.random.SeedSequence([seed, 0]))
+    codes, names = simulate_regimes(t, config, market_rng)
+    market = market_returns(codes, names, config, market_rng)
+
+    rng = np.random.default_rng(np.random.SeedSequence([seed, 2]))
+    beta = rng.normal(1.0, 0.25, n_stocks).clip(0.3, 2.0)
+    drift = rng.normal(0.0, 0.06, n_stocks) / TRADING_DAYS
+    idio = rng.uniform(0.18, 0.45, n_stocks) / np.sqrt(TRADING_DAYS)
+
+    log_returns = (market[:, None] * beta + drift - 0.5 * idio ** 2
+                   + idio * rng.standard_normal((t, n_stocks)))
+    log_returns[0] = 0.0
+    closes = 100.0 * np.exp(np.cumsum(log_returns, axis=0) + rng.normal(0, 1, n_stocks))
+
+    # Fundamentals: monthly-stepped random walks in earnings and book value
+    months = np.asarray(dates.year * 12 + dates.month)
+    month_id = months - months[0]
+    n_months = month_id[-1] + 1
+    growth = rng.normal(0.10, 0.05, n_stocks) / 12
+    earn_shocks = rng.normal(0, 0.04, (n_months, n_stocks))
+    book_shocks = rng.normal(0, 0.015, (n_months, n_stocks))
+    earnings = np.exp(np.cumsum(growth + earn_shocks, axis=0))[month_id]
+    book = np.exp(np.cumsum(growth * 0.8 + book_shocks, axis=0))[month_id]
+
+    start_pe = rng.uniform(10, 40, n_stocks)
+    start_pb = rng.uniform(1, 8, n_stocks)
+    payout = rng.uniform(0.0, 0.6, n_stocks)
+    ep = earnings / start_pe * closes[0] / closes
+    bp = book / start_pb * closes[0] / closes
+    dp = payout * ep
+
+    # Later listings
+    late = rng.random(n_stocks) > listed_pct
+    listing = np.where(late, rng.integers(0, t, n_stocks), 0)
+    unlisted = np.arange(t)[:, None] < listing[None, :]
+    fundamentals = {}
+    for key, values in (('ep', ep), ('bp', bp), ('dp', dp)):
+        values = values.astype(np.float32)
+        values[unlisted] = np.nan
+        fundamentals[key] = values
+    closes = closes.astype(np.float32)
+    closes[unlisted] = np.nan
+    return dates, closes, fundamentals
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate NSE-format synthetic index shards")
+    parser.add_argument('--out', type=Path, default=DEFAULT_OUTPUT, help="output data folder")
+    parser.add_argument('--indices', type=int, default=2, help="number of indices (momentum/value alternate)")
+    parser.add_argument('--years', type=int, default=20)
+    parser.add_argument('--start-year', type=int, default=2005)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--size', type=int, default=50, help="index size used in folder/index names")
+    parser.add_argument('--prefix', default='synth')
+    parser.add_argument('--config', help="JSON file overriding DEFAULT_CONFIG")
+    args = parser.parse_args()
+
+    if args.indices < 1 or args.years < 1:
+        parser.error("--indices and --years must be positive")
+
+    print("\n" + "=" * 80)
+    print(f"SYNTHETIC DATA: {args.indices} indices × {args.years} years (seed {args.seed})")
+    print("=" * 80)
+
+    folders = generate_dataset(args.out, args.indices, args.years, args.start_year,
+                               args.seed, load_config(args.config), args.size, args.prefix)
+
+    print(f"\n✅ Wrote {len(folders)} index folders × {args.years} yearly shards to: {args.out}")
+    print(f"   e.g. {folders[0]}" + (f", {folders[1]}" if len(folders) > 1 else ""))
+    print(f"   Manifest: {args.out / 'synthetic_manifest.json'}")
+
+
+if __name__ == "__main__":
+    main()
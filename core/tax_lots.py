@@ -0,0 +1,397 @@
+#!/usr/bin/env python3
+"""
+FIFO Tax-Lot Ledger
+Capital gains on SIP lots when a strategy rebalances, and post-tax returns
+
+The backtests rebalance a frictionless NAV: a Simple Momentum switch moves
+100% of the money from momentum to value, MOMCASH shifts between momentum
+and cash every month. An investor doing that in real funds redeems units
+lot by lot and pays capital gains tax. The ledger keeps each sleeve's lots
+as a deque of (day, units, cost per unit): a monthly SIP appends lots, a
+rebalance sells from the front (first in, first out). Every lot is bought
+once and sold at most once, and a partial sale only touches the front lot,
+so a run is linear in the number of lots.
+
+Indian capital gains rules (before surcharge and cess):
+  - equity sleeves: held more than LONG_TERM_DAYS → LTCG, else STCG, at the
+    rates in force on the sale date (TAX_REGIMES: FY 2024-25 changes rates
+    on 23 July 2024), LTCG above the yearly exemption of the regime in force
+    at the year's end; lots bought up to GRANDFATHER_DATE have the higher of
+    cost and min(31-Jan-2018 price, sale price) as cost basis
+  - debt (the MOMCASH cash sleeve): gains at DEBT_SLAB_RATE regardless of
+    holding period (Section 50AA treatment, applied throughout)
+  - set-off per financial year: short-term losses against short- then
+    long-term gains, long-term losses against long-term gains only;
+    unabsorbed losses carry forward (without the 8-year expiry). What is
+    left is taxed at the gain-weighted rate of the year's sales, so a loss
+    offsets gains of both rate periods of a split year pro rata
+
+Each financial year's tax is paid from the portfolio at the first month-end
+after 31 March (units are sold in proportion to the target weights, which
+can realize gains of their own in the new year). At the end the portfolio
+is valued after the tax due on full redemption, so post-tax XIRR compares
+with the published pre-tax SIP XIRR; the difference is the tax drag.
+
+Usage:
+    python3 core/tax_lots.py                                  # nifty500 Simple Momentum + MOMCASH
+    python3 core/tax_lots.py --universe nifty200 --sip 25000
+    python3 core/tax_lots.py --slab-rate 0.2 --out ledger.csv
+"""
+
+import argparse
+import bisect
+import sys
+import time
+from collections import deque
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+BASE_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(BASE_DIR))
+
+from core.universe import DATA_DIR, UNIVERSES, get_universe
+from core.xirr import calculate_xirr
+
+# Sales from each date (listed equity and equity funds); the exemption is per
+# financial year, from the regime in force at its end
+TAX_REGIMES = (
+    {'from': '2004-04-01', 'stcg': 0.10, 'ltcg': 0.0, 'exemption': 0},            # STT regime
+    {'from': '2008-04-01', 'stcg': 0.15, 'ltcg': 0.0, 'exemption': 0},
+    {'from': '2018-04-01', 'stcg': 0.15, 'ltcg': 0.10, 'exemption': 100_000},     # Section 112A
+    {'from': '2024-07-23', 'stcg': 0.20, 'ltcg': 0.125, 'exemption': 125_000},    # Finance (No. 2) Act 2024
+)
+GRANDFATHER_DATE = '2018-01-31'
+LONG_TERM_DAYS = 365
+DEBT_SLAB_RATE = 0.30
+EPS = 1e-12
+
+
+def financial_year(date):
+    """Starting calendar year of the Indian financial year (April-March) of a date"""
+    return date.year if date.month >= 4 else date.year - 1
+
+
+def fy_label(fy):
+    """'FY25' for the year April 2024 - March 2025 (named by its end year)"""
+    return f"FY{(fy + 1) % 100:02d}"
+
+
+def regime_on(day, regimes=TAX_REGIMES):
+    """Tax regime in force on a date (ordinal day)"""
+    current = regimes[0]
+    for regime in regimes:
+        if pd.Timestamp(regime['from']).toordinal() <= day:
+            current = regime
+    return current
+
+
+def regime_for(fy, regimes=TAX_REGIMES):
+    """Tax regime in force at the end of the financial year starting in April of `fy`"""
+    return regime_on(pd.Timestamp(fy + 1, 3, 31).toordinal(), regimes)
+
+
+def _no_gains():
+    """Realized gains of a year: net per bucket, plus the positive gains and
+    their rate-weighted sum per equity bucket (for the year's average rate)"""
+    return {'short': 0.0, 'long': 0.0, 'debt': 0.0,
+            'short_pos': 0.0, 'long_pos': 0.0, 'short_rated': 0.0, 'long_rated': 0.0}
+
+
+# ============================================================================
+# LEDGER
+# ============================================================================
+
+class TaxLedger:
+    """Lots per sleeve, realized gains of the open financial year, and loss carry-forward"""
+
+    def __init__(self, kinds, regimes=TAX_REGIMES, slab_rate=DEBT_SLAB_RATE, grandfather_prices=None):
+        """
+        kinds:              {sleeve: 'equity' or 'debt'}
+        grandfather_prices: {sleeve: price on GRANDFATHER_DATE} for equity sleeves
+        """
+        self.kinds = dict(kinds)
+        self.regimes = regimes
+        self.regime_days = [pd.Timestamp(r['from']).toordinal() for r in regimes]
+        self.slab_rate = slab_rate
+        self.grandfather_prices = grandfather_prices or {}
+        self.grandfather_day = pd.Timestamp(GRANDFATHER_DATE).toordinal()
+
+        self.lots = {sleeve: deque() for sleeve in self.kinds}
+        self.units = {sleeve: 0.0 for sleeve in self.kinds}
+        self.gains = _no_gains()
+        self.carry = {'short': 0.0, 'long': 0.0}          # unabsorbed losses (positive numbers)
+        self.lots_sold = 0
+
+    def buy(self, sleeve, day, units, price):
+        if units > EPS:
+            self.lots[sleeve].append((day, units, price))
+            self.units[sleeve] += units
+
+    def sell(self, sleeve, day, units, price, gains=None):
+        """Sell units FIFO at price; realized gains go into `gains` (default: the open year's)"""
+        gains = self.gains if gains is None else gains
+        lots = self.lots[sleeve]
+        remaining = min(units, self.units[sleeve])
+        self.units[sleeve] -= remaining
+
+        while remaining > EPS and lots:
+            bought, lot_units, cost = lots[0]
+            take = min(lot_units, remaining)
+            self._realize(sleeve, day, bought, take, cost, price, gains)
+            if take >= lot_units * (1 - EPS):
+                lots.popleft()
+                self.lots_sold += 1
+            else:
+                lots[0] = (bought, lot_units - take, cost)
+            remaining -= take
+
+    def _realize(self, sleeve, day, bought, units, cost, price, gains):
+        """Add the gain on units of one lot to its bucket (short / long / debt)"""
+        if self.kinds[sleeve] == 'debt':
+            gains['debt'] += units * (price - cost)
+            return
+        if day - bought > LONG_TERM_DAYS:
+            bucket, rate = 'long', 'ltcg'
+            grandfather = self.grandfather_prices.get(sleeve)
+            if grandfather is not None and bought <= self.grandfather_day:
+                cost = max(cost, min(grandfather, price))
+        else:
+            bucket, rate = 'short', 'stcg'
+        gain = units * (price - cost)
+        gains[bucket] += gain
+        if gain > 0:
+            gains[f'{bucket}_pos'] += gain
+            regime = self.regimes[max(bisect.bisect_right(self.regime_days, day) - 1, 0)]
+            gains[f'{bucket}_rated'] += gain * regime[rate]
+
+    def tax_due(self, fy, gains=None, carry=None):
+        """(tax, carry after) on a year's realized gains; does not change the ledger"""
+        gains = self.gains if gains is None else gains
+        carry = dict(self.carry if carry is None else carry)
+        regime = regime_for(fy, self.regimes)
+
+        short, long_, debt = gains['short'], gains['long'], gains['debt']
+        if debt < 0:                                      # deemed short-term loss
+            short, debt = short + debt, 0.0
+        # This year's short-term loss against long-term gains
+        if short < 0:
+            absorbed = min(-short, max(long_, 0.0))
+            short, long_ = short + absorbed, long_ - absorbed
+        # Brought-forward losses: short-term against short- then long-term
+        # gains, long-term against long-term gains only
+        used = min(carry['short'], max(short, 0.0))
+        short, carry['short'] = short - used, carry['short'] - used
+        used = min(carry['short'], max(long_, 0.0))
+        long_, carry['short'] = long_ - used, carry['short'] - used
+        used = min(carry['long'], max(long_, 0.0))
+        long_, carry['long'] = long_ - used, carry['long'] - used
+        carry['short'] += max(-short, 0.0)
+        carry['long'] += max(-long_, 0.0)
+
+        taxable_long = max(long_ - regime['exemption'], 0.0)
+        stcg = gains['short_rated'] / gains['short_pos'] if gains['short_pos'] > EPS else regime['stcg']
+        ltcg = gains['long_rated'] / gains['long_pos'] if gains['long_pos'] > EPS else regime['ltcg']
+        tax = stcg * max(short, 0.0) + ltcg * taxable_long + self.slab_rate * debt
+        return tax, carry
+
+    def close_year(self, fy):
+        """Tax of the financial year; resets its gains and updates the carry-forward"""
+        tax, self.carry = self.tax_due(fy)
+        self.gains = _no_gains()
+        return tax
+
+    def liquidation_tax(self, day, prices, fy):
+        """Tax due if every lot were sold at `prices` now (open year's gains included)"""
+        gains = dict(self.gains)
+        for sleeve, lots in self.lots.items():
+            for bought, units, cost in lots:
+                self._realize(sleeve, day, bought, units, cost, prices[sleeve], gains)
+        return self.tax_due(fy, gains)[0]
+
+
+# ============================================================================
+# SIMULATION
+# ============================================================================
+
+def run_ledger(dates, prices, weights, contributions, kinds, regimes=TAX_REGIMES,
+               slab_rate=DEBT_SLAB_RATE, taxed=True):
+    """Invest contributions and rebalance to the strategy's weights, lot by lot
+
+    dates:         M month-end dates
+    prices:        M×S frame of sleeve prices (columns = sleeves)
+    weights:       M×S frame of weights held during each month (lagged, as
+                   the strategies' w_* columns); at month-end t the portfolio
+                   is set to the weights of month t + 1
+    contributions: M amounts invested at each month-end
+    taxed:         False runs the same ledger without tax (pre-tax parity)
+
+    Returns {'value': M values after tax payments, 'tax_paid': M, plus
+    final_value, liquidation_tax, post_tax_value, taxes_paid, lots, lots_sold}.
+    """
+    dates = pd.DatetimeIndex(dates)
+    sleeves = list(prices.columns)
+    p = prices.to_numpy(dtype=float)
+    w = weights[sleeves].to_numpy(dtype=float)
+    contributions = np.asarray(contributions, dtype=float)
+    days = np.array([d.toordinal() for d in dates])
+    fys = np.where(dates.month >= 4, dates.year, dates.year - 1)
+
+    grandfather = None
+    before = np.flatnonzero(dates <= pd.Timestamp(GRANDFATHER_DATE))
+    if len(before):
+        grandfather = {s: p[before[-1], j] for j, s in enumerate(sleeves) if kinds[s] == 'equity'}
+    ledger = TaxLedger(kinds, regimes, slab_rate, grandfather)
+
+    value = np.zeros(len(dates))
+    tax_paid = np.zeros(len(dates))
+    lots_bought = 0
+    for t in range(len(dates)):
+        units = np.array([ledger.units[s] for s in sleeves])
+        total = units @ p[t] + contributions[t]
+        if taxed and t > 0 and fys[t] != fys[t - 1]:
+            tax_paid[t] = min(ledger.close_year(fys[t - 1]), total)
+            total -= tax_paid[t]
+
+        target = total * w[min(t + 1, len(dates) - 1)] / p[t]
+        delta = target - units
+        for j in np.flatnonzero(delta < 0):
+            ledger.sell(sleeves[j], days[t], -delta[j], p[t, j])
+        for j in np.flatnonzero(delta > 0):
+            ledger.buy(sleeves[j], days[t], delta[j], p[t, j])
+            lots_bought += 1
+        value[t] = total
+
+    final_prices = dict(zip(sleeves, p[-1]))
+    liquidation = ledger.liquidation_tax(days[-1], final_prices, fys[-1]) if taxed else 0.0
+    return {
+        'value': value,
+        'tax_paid': tax_paid,
+        'final_value': value[-1],
+        'liquidation_tax': liquidation,
+        'post_tax_value': value[-1] - liquidation,
+        'taxes_paid': tax_paid.sum(),
+        'lots': lots_bought,
+        'lots_sold': ledger.lots_sold,
+    }
+
+
+def strategy_sleeves(portfolio):
+    """(prices, weights, kinds) of a Simple Momentum or MOMCASH portfolio frame"""
+    if 'w_cash' in portfolio:
+        returns = portfolio['Return_cash'] if 'Return_cash' in portfolio else 0.0
+        cash = 1000 * (1 + pd.Series(returns, index=portfolio.index).fillna(0.0)).cumprod()
+        prices = pd.DataFrame({'mom': portfolio['Close_mom'], 'cash': cash})
+        weights = pd.DataFrame({'mom': portfolio['w_mom'], 'cash': portfolio['w_cash']})
+        return prices, weights, {'mom': 'equity', 'cash': 'debt'}
+    prices = pd.DataFrame({'mom': portfolio['Close_mom'], 'val': portfolio['Close_val']})
+    weights = pd.DataFrame({'mom': portfolio['w_mom'], 'val': portfolio['w_val']})
+    return prices, weights, {'mom': 'equity', 'val': 'equity'}
+
+
+def after_tax(portfolio, monthly_sip=10000, regimes=TAX_REGIMES, slab_rate=DEBT_SLAB_RATE):
+    """Pre- vs post-tax SIP outcome and post-tax NAV of a strategy portfolio frame
+
+    Returns (metrics dict, monthly frame with Date, Portfolio_NAV,
+    Post_Tax_NAV, SIP_Value and Tax_Paid).
+    """
+    dates = pd.DatetimeIndex(portfolio['Date'])
+    prices, weights, kinds = strategy_sleeves(portfolio)
+    sip = np.full(len(dates), float(monthly_sip))
+    lump = np.zeros(len(dates))
+    lump[0] = 1000.0
+
+    pre = run_ledger(dates, prices, weights, sip, kinds, regimes, slab_rate, taxed=False)
+    post = run_ledger(dates, prices, weights, sip, kinds, regimes, slab_rate)
+    nav = run_ledger(dates, prices, weights, lump, kinds, regimes, slab_rate)
+
+    def xirr(final):
+        return calculate_xirr([(d, -float(monthly_sip)) for d in dates] + [(dates[-1], final)])
+
+    pre_xirr, post_xirr = xirr(pre['final_value']), xirr(post['post_tax_value'])
+    years = (dates[-1] - dates[0]).days / 365.0
+    nav_pre = portfolio['Portfolio_NAV'].to_numpy(dtype=float)
+    metrics = {
+        'pre_tax_xirr': pre_xirr,
+        'post_tax_xirr': post_xirr,
+        'tax_drag': pre_xirr - post_xirr,
+        'pre_tax_value': pre['final_value'],
+        'post_tax_value': post['post_tax_value'],
+        'taxes_paid': post['taxes_paid'],
+        'liquidation_tax': post['liquidation_tax'],
+        'pre_tax_cagr': ((nav_pre[-1] / nav_pre[0]) ** (1 / years) - 1) * 100,
+        'post_tax_cagr': ((nav['post_tax_value'] / 1000) ** (1 / years) - 1) * 100,
+        'lots': post['lots'],
+        'lots_sold': post['lots_sold'],
+    }
+    frame = pd.DataFrame({'Date': dates, 'Portfolio_NAV': nav_pre,
+                          'Post_Tax_NAV': nav['value'], 'SIP_Value': post['value'],
+                          'Tax_Paid': post['tax_paid']})
+    return metrics, frame
+
+
+# ============================================================================
+# DATA
+# ============================================================================
+
+def load_portfolios(universe, data_folder=DATA_DIR, monthly_sip=10000):
+    """{name: portfolio frame} of the universe's strategies from the monthly CSVs"""
+    from core.sip_timing import strategy_portfolios
+
+    u = get_universe(universe)
+    mom = pd.read_csv(u.mom_monthly_csv, usecols=['Date', 'Close'], parse_dates=['Date'])
+    val = pd.read_csv(u.val_monthly_csv, usecols=['Date', 'Close'], parse_dates=['Date'])
+    merged = pd.merge(mom.rename(columns={'Close': 'Close_mom'}), val.rename(columns={'Close': 'Close_val'}),
+                      on='Date', how='inner')
+    return strategy_portfolios(universe, merged, data_folder, monthly_sip, mom=mom)
+
+
+# ============================================================================
+# MAIN
+# ============================================================================
+
+def main():
+    parser = argparse.ArgumentParser(description="Post-tax SIP returns with a FIFO lot ledger")
+    parser.add_argument('--universe', default='nifty500', choices=list(UNIVERSES))
+    parser.add_argument('--sip', type=float, default=10000)
+    parser.add_argument('--slab-rate', type=float, default=DEBT_SLAB_RATE, help="tax rate on cash-sleeve gains")
+    parser.add_argument('--out', type=Path, help="write the monthly post-tax NAV / tax frame to this CSV")
+    args = parser.parse_args()
+
+    portfolios = load_portfolios(args.universe, monthly_sip=args.sip)
+    print("\n" + "=" * 80)
+    print(f"🧾 POST-TAX RETURNS — {get_universe(args.universe).label}, ₹{args.sip:,.0f}/month SIP")
+    print("=" * 80)
+
+    frames = []
+    for name, portfolio in portfolios.items():
+        start = time.perf_counter()
+        metrics, frame = after_tax(portfolio, args.sip, slab_rate=args.slab_rate)
+        elapsed = time.perf_counter() - start
+        frames.append(frame.assign(Strategy=name))
+
+        print(f"\n{name} ({len(frame)} months, {metrics['lots']} lots bought, "
+              f"{metrics['lots_sold']} fully sold; {elapsed * 1000:.1f} ms for 3 ledger runs)")
+        print(f"   SIP XIRR:         {metrics['pre_tax_xirr']:>7.2f}% pre-tax → "
+              f"{metrics['post_tax_xirr']:.2f}% post-tax (drag {metrics['tax_drag']:.2f} pp)")
+        print(f"   NAV CAGR:         {metrics['pre_tax_cagr']:>7.2f}% pre-tax → {metrics['post_tax_cagr']:.2f}% post-tax")
+        print(f"   Final value:      ₹{metrics['pre_tax_value']:>14,.0f} pre-tax → "
+              f"₹{metrics['post_tax_value']:,.0f} after tax")
+        print(f"   Taxes paid:       ₹{metrics['taxes_paid']:>14,.0f} along the way + "
+              f"₹{metrics['liquidation_tax']:,.0f} on redemption")
+
+        by_year = frame.loc[frame['Tax_Paid'] > 0]
+        if len(by_year):
+            largest = by_year.nlargest(3, 'Tax_Paid')
+            print("   Largest years:    " + ", ".join(
+                f"{fy_label(financial_year(d))} ₹{v:,.0f}" for d, v in zip(largest['Date'] - pd.DateOffset(months=1),
+                                                                            largest['Tax_Paid'])))
+
+    if args.out:
+        pd.concat(frames, ignore_index=True).to_csv(args.out, index=False)
+        print(f"\n✅ Saved to: {args.out}")
+
+
+if __name__ == "__main__":
+    main()
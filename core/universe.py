@@ -0,0 +1,84 @@
+"""
+Universe Registry
+Folder and file naming for each momentum/value factor universe
+
+A universe is a pair of NSE factor indices (momentum + value) built on the
+same parent index, e.g. NIFTY500 MOMENTUM 50 / NIFTY500 VALUE 50. Everything
+else (data shards, output folders, CSV/JSON names) follows from the
+universe name and index size, so adding a universe is one registry entry
+plus its data/ folders.
+"""
+
+from pathlib import Path
+
+BASE_DIR = Path(__file__).parent.parent
+DATA_DIR = BASE_DIR / "data"
+
+
+class Universe:
+    """Naming conventions for one momentum/value universe"""
+
+    def __init__(self, name, label, size, mom_folder=None, val_folder=None, strategy_csv=None,
+                 base_dir=BASE_DIR):
+        self.name = name
+        self.label = label
+        self.size = size
+        self.mom_folder = mom_folder or f"{name}mom{size}"
+        self.val_folder = val_folder or f"{name}val{size}"
+        self.strategy_csv = strategy_csv or f"{name}_simple_momentum.csv"
+        # Root under which <name>/output/ lives (the repo, or a scratch folder)
+        self.base_dir = Path(base_dir)
+
+    # ---- locations -------------------------------------------------------
+
+    @property
+    def output_dir(self):
+        return self.base_dir / self.name / "output"
+
+    @property
+    def monthly_dir(self):
+        return self.output_dir / "monthly"
+
+    @property
+    def weekly_dir(self):
+        return self.output_dir / "weekly"
+
+    @property
+    def mom_monthly_csv(self):
+        return self.monthly_dir / f"{self.name}_momentum_{self.size}_monthly.csv"
+
+    @property
+    def val_monthly_csv(self):
+        return self.monthly_dir / f"{self.name}_value_{self.size}_monthly.csv"
+
+    def is_available(self, data_folder=DATA_DIR):
+        """True if both index data folders contain at least one CSV shard"""
+        return all(any((Path(data_folder) / folder).glob("*.csv"))
+                   for folder in (self.mom_folder, self.val_folder))
+
+    def __repr__(self):
+        return f"Universe({self.name!r}, size={self.size})"
+
+
+UNIVERSES = {
+    u.name: u for u in [
+        Universe('nifty200', 'Nifty 200', 30, strategy_csv='portfolio_simple_momentum.csv'),
+        Universe('nifty500', 'Nifty 500', 50),
+        # Registered ahead of data: run automatically once data/<folder>/ exists
+        Universe('nifty100', 'Nifty 100', 30),
+        Universe('midcap150', 'Nifty Midcap 150', 50),
+        Universe('smallcap250', 'Nifty Smallcap 250', 50),
+    ]
+}
+
+
+def get_universe(name):
+    try:
+        return UNIVERSES[name]
+    except KeyError:
+        raise ValueError(f"Unknown universe {name!r}; choose from {sorted(UNIVERSES)}")
+
+
+def available_universes(data_folder=DATA_DIR):
+    """Registered universes whose index data is present"""
+    return [name for name, u in UNIVERSES.items() if u.is_available(data_folder)]
@@ -0,0 +1,250 @@
+#!/usr/bin/env python3
+"""
+Multi-Universe Pipeline
+Runs the full momentum/value pipeline for N universes through one code path
+
+Per universe (daily index data is read from data/ — or from a panel store
+built by core/panel_store.py — exactly once):
+  1. Monthly closes          → <universe>/output/monthly/<universe>_{momentum,value}_<size>_monthly.csv
+  2. Weekly ratio + chart    → <universe>/output/weekly/momentum_value_ratio_weekly.csv, ratio_chart.json
+  3. Index SIP dashboard     → <universe>/output/dashboard_data.json
+  4. Simple Momentum backtest→ <universe>/output/monthly/<strategy csv>
+  5. Portfolio analytics     → <universe>/output/<universe>_portfolio_dashboard.json
+  6. Rolling CAGR analysis   → <universe>/output/<universe>_returns_analysis.json
+
+The nifty500 modules are the canonical implementation for every step; the
+universe only decides folder and file names. Universes run concurrently on a
+process pool.
+
+Usage:
+    python3 core/universe_pipeline.py                       # all universes with data
+    python3 core/universe_pipeline.py nifty200 nifty500 --jobs 2
+    python3 core/universe_pipeline.py --panel data_panel     # read a panel store, not CSV shards
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+import pandas as pd
+
+BASE_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(BASE_DIR))
+sys.path.insert(0, str(BASE_DIR / "nifty500"))
+sys.path.insert(0, str(BASE_DIR / "nifty500" / "analysis"))
+
+from core.panel_store import PanelStore
+from core.profiling import profile_run, profiled
+from core.universe import DATA_DIR, UNIVERSES, available_universes, get_universe
+from nifty500_sip_returns import SIPAnalyzer
+from nifty500_generate_dashboard_data import build_dashboard_data, build_weekly_charts
+from nifty500_calculate_ratio import RatioAnalyzer
+from nifty500_portfolio_strategy import PortfolioStrategy
+from nifty500_portfolio_analytics import PortfolioAnalytics
+from nifty500_returns_analysis import compute_rolling_cagrs, build_returns_json
+
+
+class UniversePipeline:
+    """All pipeline steps for one universe, sharing the loaded data"""
+
+    def __init__(self, universe, data_folder=DATA_DIR, monthly_sip=10000, panel=None):
+        self.universe = get_universe(universe) if isinstance(universe, str) else universe
+        self.data_folder = Path(data_folder)
+        self.monthly_sip = monthly_sip
+        # Optional PanelStore (or its folder) holding the indices' daily closes
+        self.panel = PanelStore(panel) if isinstance(panel, (str, Path)) else panel
+
+        self.sip_analyzer = SIPAnalyzer(self.data_folder, monthly_sip=monthly_sip)
+        self.daily = {}
+        self.monthly = {}
+
+    # ========================================================================
+    # DATA
+    # ========================================================================
+
+    @profiled
+    def load(self, write_monthly=True):
+        """Read the daily closes for both indices (once), from the panel if given"""
+        for key, folder in (('momentum', self.universe.mom_folder), ('value', self.universe.val_folder)):
+            if self.panel is not None and folder in self.panel:
+                self.daily[key] = self.panel.frame(folder)
+            else:
+                self.daily[key] = self.sip_analyzer.read_and_consolidate_index_data(folder)
+            # Monthly closes from a copy: the helpers add grouping columns in place
+            self.monthly[key] = self.sip_analyzer.get_monthly_closes(self.daily[key].copy())
+
+        for directory in (self.universe.monthly_dir, self.universe.weekly_dir):
+            directory.mkdir(parents=True, exist_ok=True)
+
+        if write_monthly:
+            self.save_monthly()
+
+    def save_monthly(self):
+        self.monthly['momentum'].to_csv(self.universe.mom_monthly_csv, index=False)
+        self.monthly['value'].to_csv(self.universe.val_monthly_csv, index=False)
+
+    def merged_monthly(self):
+        """Month-end closes of both indices on common dates (Close_mom, Close_val)"""
+        return pd.merge(
+            self.monthly['momentum'][['Date', 'Close']].rename(columns={'Close': 'Close_mom'}),
+            self.monthly['value'][['Date', 'Close']].rename(columns={'Close': 'Close_val'}),
+            on='Date', how='inner')
+
+    def index_name(self, key):
+        return str(self.daily[key]['Index Name'].iloc[0])
+
+    # ========================================================================
+    # STEPS
+    # ========================================================================
+
+    @profiled
+    def run_ratio(self):
+        analyzer = RatioAnalyzer(self.data_folder, html_mode='none')
+        analyzer.output_folder = self.universe.weekly_dir
+
+        ratio_df = analyzer.build_ratio_frame(self.daily['momentum'].copy(), self.daily['value'].copy())
+        ratio_df.to_csv(self.universe.weekly_dir / "momentum_value_ratio_weekly.csv", index=False)
+        analyzer.create_interactive_chart(ratio_df)
+        return ratio_df
+
+    @profiled
+    def run_index_sip(self, ratio_df):
+        results = {}
+        for key, folder in (('momentum', self.universe.mom_folder), ('value', self.universe.val_folder)):
+            _, result = self.sip_analyzer.summarize_sip(self.monthly[key], self.index_name(key))
+            if result:
+                results[folder] = result
+
+        dashboard_data = build_dashboard_data(results)
+        dashboard_data['weekly_charts'] = build_weekly_charts(
+            self.daily['momentum'].copy(), self.daily['value'].copy(), ratio_df, ma_period=30)
+
+        with open(self.universe.output_dir / "dashboard_data.json", 'w') as f:
+            json.dump(dashboard_data, f, indent=2)
+        return results
+
+    @profiled
+    def run_strategy(self):
+        strategy = PortfolioStrategy(self.data_folder, monthly_sip=self.monthly_sip)
+        portfolio_df = strategy.build_portfolio(self.merged_monthly())
+        results, _ = strategy.run_sip_on_portfolio(
+            portfolio_df, f'Simple Momentum (20% Gain/Loss) - {self.universe.label}')
+
+        portfolio_df.to_csv(self.universe.monthly_dir / self.universe.strategy_csv, index=False)
+        return results, portfolio_df
+
+    @profiled
+    def run_analytics(self, portfolio_df):
+        analytics = PortfolioAnalytics(portfolio_df, monthly_sip=self.monthly_sip)
+        analytics.build_master_dataframe()
+        output_file = self.universe.output_dir / f"{self.universe.name}_portfolio_dashboard.json"
+        return analytics.export_dashboard_data(output_file)
+
+    @profiled
+    def run_returns_analysis(self):
+        frames = {}
+        for key in ('momentum', 'value'):
+            df = self.monthly[key][['Date', 'Close']].dropna(subset=['Close'])
+            df = df.sort_values('Date').reset_index(drop=True)
+            df['YearMonth'] = df['Date'].dt.to_period('M')
+            frames[key] = (df, compute_rolling_cagrs(df))
+
+        csv_dir = self.universe.output_dir / "returns_analysis"
+        csv_dir.mkdir(parents=True, exist_ok=True)
+        frames['momentum'][1].to_csv(csv_dir / "momentum_cagr_monthly.csv", index=False)
+        frames['value'][1].to_csv(csv_dir / "value_cagr_monthly.csv", index=False)
+
+        output = build_returns_json(frames['momentum'][0], frames['value'][0],
+                                    frames['momentum'][1], frames['value'][1])
+        with open(self.universe.output_dir / f"{self.universe.name}_returns_analysis.json", 'w') as f:
+            json.dump(output, f, indent=2)
+
+    def run(self):
+        """Run every step; returns a small summary dict"""
+        start = time.perf_counter()
+        self.load()
+        ratio_df = self.run_ratio()
+        self.run_index_sip(ratio_df)
+        results, portfolio_df = self.run_strategy()
+        self.run_analytics(portfolio_df)
+        self.run_returns_analysis()
+
+        return {
+            'universe': self.universe.name,
+            'months': len(portfolio_df),
+            'sip_xirr': results['sip_xirr'],
+            'index_cagr': results['index_cagr'],
+            'max_drawdown': results['max_drawdown'],
+            'elapsed': time.perf_counter() - start,
+        }
+
+
+def run_universe(name, data_folder=DATA_DIR, monthly_sip=10000, verbose=False, panel=None):
+    """Process-pool entry point: run one universe, optionally silencing step output"""
+    pipeline = UniversePipeline(name, data_folder, monthly_sip, panel)
+    with profile_run(f"{name}_universe_pipeline", pipeline.universe.output_dir):
+        if verbose:
+            return pipeline.run()
+        with contextlib.redirect_stdout(io.StringIO()):
+            return pipeline.run()
+
+
+def run_universes(names=None, jobs=None, data_folder=DATA_DIR, monthly_sip=10000, verbose=False,
+                  panel=None):
+    """Run several universes concurrently; returns {name: summary or exception}
+
+    panel is a panel store folder; workers open it themselves (memory-mapped,
+    so the pages are shared rather than copied per process).
+    """
+    if panel and not names:
+        store = PanelStore(panel)
+        names = [name for name, u in UNIVERSES.items() if u.mom_folder in store and u.val_folder in store]
+    names = names or available_universes(data_folder)
+    for name in names:
+        get_universe(name)
+
+    print("\n" + "=" * 80)
+    print(f"MULTI-UNIVERSE PIPELINE: {', '.join(names)}")
+    print("=" * 80)
+
+    summaries = {}
+    with ProcessPoolExecutor(max_workers=jobs or len(names)) as pool:
+        futures = {pool.submit(run_universe, name, data_folder, monthly_sip, verbose, panel): name
+                   for name in names}
+        for future in as_completed(futures):
+            name = futures[future]
+            try:
+                summary = future.result()
+            except Exception as e:
+                summaries[name] = e
+                print(f"   ❌ {name:<12s} failed: {type(e).__name__}: {e}")
+                continue
+            summaries[name] = summary
+            print(f"   ✅ {name:<12s} {summary['months']} months | "
+                  f"XIRR {summary['sip_xirr']:.2f}% | CAGR {summary['index_cagr']:.2f}% | "
+                  f"{summary['elapsed']:.1f}s")
+
+    return summaries
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the full pipeline for several universes")
+    parser.add_argument('universes', nargs='*', help=f"default: all with data ({', '.join(UNIVERSES)})")
+    parser.add_argument('--jobs', '-j', type=int, default=None, help="worker processes")
+    parser.add_argument('--sip', type=float, default=10000, help="monthly SIP amount")
+    parser.add_argument('--verbose', '-v', action='store_true', help="show per-step output")
+    parser.add_argument('--panel', type=Path, help="panel store to read daily closes from")
+    args = parser.parse_args()
+
+    summaries = run_universes(args.universes, jobs=args.jobs, monthly_sip=args.sip, verbose=args.verbose,
+                              panel=args.panel)
+    sys.exit(1 if any(isinstance(s, Exception) for s in summaries.values()) else 0)
+
+
+if __name__ == "__main__":
+    main()
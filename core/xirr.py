@@ -0,0 +1,96 @@
+"""
+XIRR
+Extended internal rate of return for SIP cash flows
+
+Uses pyxirr (compiled, imports in a few ms) when it is installed and falls
+back to a Newton-Raphson solve via scipy.optimize. Both solvers are imported
+on first use, so importing this module costs nothing. xirr_columns() solves
+many cash-flow series at once (Newton steps vectorized with numpy).
+"""
+
+
+def _newton_xirr(cash_flows, guess=0.1):
+    """Newton-Raphson XIRR (fraction), raises on non-convergence"""
+    from scipy.optimize import newton
+
+    start_date = cash_flows[0][0]
+    amounts = [amount for _, amount in cash_flows]
+    days = [(date - start_date).days for date, _ in cash_flows]
+
+    def xnpv(rate):
+        return sum([a / (1 + rate) ** (d / 365.0) for a, d in zip(amounts, days)])
+
+    def xnpv_deriv(rate):
+        return sum([-a * d / 365.0 / (1 + rate) ** (d / 365.0 + 1) for a, d in zip(amounts, days)])
+
+    return newton(xnpv, guess, fprime=xnpv_deriv, maxiter=100)
+
+
+def calculate_xirr(cash_flows, guess=0.1):
+    """Calculate XIRR in percent
+
+    Args:
+        cash_flows: List of tuples (date, amount) where amount is negative for investments
+
+    Returns 0.0 when no rate can be found (e.g. all flows of one sign).
+    """
+    cash_flows = sorted(cash_flows, key=lambda x: x[0])
+
+    try:
+        from pyxirr import xirr
+    except ImportError:
+        xirr = None
+
+    try:
+        if xirr is not None:
+            rate = xirr([d for d, _ in cash_flows], [a for _, a in cash_flows], guess=guess)
+            if rate is None:
+                return 0.0
+        else:
+            rate = _newton_xirr(cash_flows, guess)
+        return rate * 100
+    except Exception:
+        return 0.0
+
+
+def xirr_columns(days, amounts, guess=0.1, max_iter=100, tol=1e-12):
+    """XIRR in percent for many cash-flow series at once, one per column
+
+    Args:
+        days: n×K day offsets of each flow from a reference date (usually
+            the column's first flow; any origin gives the same rate)
+        amounts: n×K amounts (negative for investments), broadcastable to days
+        guess: starting rate, a scalar or one per column
+
+    Same day count (days / 365) as calculate_xirr. Columns that do not
+    converge are NaN.
+    """
+    import numpy as np
+
+    years = np.asarray(days, dtype=float) / 365.0
+    amounts = np.broadcast_to(np.asarray(amounts, dtype=float), years.shape)
+    shape = years.shape[1:]
+    years, amounts = years.reshape(len(years), -1), amounts.reshape(len(years), -1)
+    rate = np.array(np.broadcast_to(guess, shape), dtype=float).reshape(-1)
+    converged = np.zeros(rate.shape, dtype=bool)
+
+    # Iterate on the columns still moving only, so a few slow columns do
+    # not cost a pass over all of them
+    active = np.arange(rate.size)
+    for _ in range(max_iter):
+        y, a = (years, amounts) if active.size == rate.size else (years[:, active], amounts[:, active])
+        r = rate[active]
+        discount = (1 + r) ** -y
+        npv = (a * discount).sum(axis=0)
+        slope = (-a * y * discount).sum(axis=0) / (1 + r)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            step = npv / slope
+        rate[active] = np.maximum(r - step, -0.9999)
+        done = np.abs(step) < tol
+        converged[active[done]] = True
+        active = active[~done]
+        if not active.size:
+            break
+
+    rate, converged = rate.reshape(shape), converged.reshape(shape)
+    return np.where(converged, rate * 100, np.nan)
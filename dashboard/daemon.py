@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+"""
+Warm Strategy Daemon
+Keeps every universe loaded and answers small queries without a cold start
+
+A scheduled script pays for importing pandas, parsing CSV shards and
+recomputing signals on every run. The daemon does that once (ScenarioEngine
+in scenario_api.py: monthly arrays, MOMCASH risk score, daily frames per
+universe and the incremental signal state) and then answers requests in
+milliseconds:
+
+  serve    run the daemon on a Unix domain socket (default) or localhost HTTP
+  query    thin client: send one request and print the JSON result
+
+Unix socket protocol: one JSON object per line, e.g.
+    {"endpoint": "rotation", "params": {"universe": "nifty200", "gain": 25}}
+answered by one line {"status": 200, "result": {...}} (or "error").
+The HTTP mode serves the same endpoints as serve_dashboard.py (/api/...),
+bound to 127.0.0.1.
+
+The client only imports the standard library, so a query costs tens of
+milliseconds instead of a full pipeline run.
+
+Usage:
+    python3 dashboard/daemon.py serve &                  # Unix socket
+    python3 dashboard/daemon.py serve --port 8765        # localhost HTTP
+    python3 dashboard/daemon.py query next universe=nifty500
+    python3 dashboard/daemon.py query rotation universe=nifty200 gain=25 loss=-10
+    python3 dashboard/daemon.py query goal target=10000000 years=15 confidence=90
+    python3 dashboard/daemon.py query update date=2026-01-30 close=61234.5
+    python3 dashboard/daemon.py query dashboard universe=nifty500
+    python3 dashboard/daemon.py query --port 8765 momcash max_cash=0.5
+    python3 dashboard/daemon.py query shutdown
+"""
+
+import argparse
+import json
+import os
+import socket
+import socketserver
+import sys
+import threading
+import time
+from pathlib import Path
+
+BASE_DIR = Path(__file__).parent.parent
+DEFAULT_SOCKET = BASE_DIR / ".smart_beta_daemon.sock"
+
+
+# ============================================================================
+# SERVER
+# ============================================================================
+
+class JSONLineHandler(socketserver.StreamRequestHandler):
+    """One JSON request per line → one JSON response per line"""
+
+    def handle(self):
+        from scenario_api import dispatch
+
+        for line in self.rfile:
+            if not line.strip():
+                continue
+            try:
+                request = json.loads(line)
+                endpoint = request['endpoint']
+                params = request.get('params') or {}
+            except (ValueError, KeyError, TypeError):
+                self.reply(400, {'error': 'expected {"endpoint": ..., "params": {...}}'})
+                continue
+
+            if endpoint == 'shutdown':
+                self.reply(200, {'result': 'shutting down'})
+                threading.Thread(target=self.server.shutdown, daemon=True).start()
+                return
+
+            # Same query shape as the HTTP server (parse_qs: lists of strings)
+            query = {k: [str(v)] for k, v in params.items()}
+            status, payload = dispatch(self.server.engine, endpoint, query)
+            self.reply(status, {'result': payload} if status == 200 else payload)
+
+    def reply(self, status, payload):
+        self.wfile.write(json.dumps({'status': status, **payload}).encode('utf-8') + b'\n')
+        self.wfile.flush()
+
+
+class UnixDaemon(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+def serve(socket_path=None, port=None):
+    sys.path.insert(0, str(Path(__file__).parent))
+    from scenario_api import ScenarioEngine
+
+    start = time.perf_counter()
+    engine = ScenarioEngine()
+    engine.preload()
+    print(f"\n✅ Warm in {time.perf_counter() - start:.1f}s")
+
+    if port:
+        import http.server
+        from serve_dashboard import MyHTTPRequestHandler
+
+        os.chdir(BASE_DIR)
+        MyHTTPRequestHandler.engine = engine
+        http.server.ThreadingHTTPServer.allow_reuse_address = True
+        server = http.server.ThreadingHTTPServer(("127.0.0.1", port), MyHTTPRequestHandler)
+        where = f"http://127.0.0.1:{port}/api/"
+    else:
+        socket_path = Path(socket_path or DEFAULT_SOCKET)
+        if socket_path.exists():
+            if _socket_alive(socket_path):
+                sys.exit(f"❌ A daemon is already listening on {socket_path}")
+            socket_path.unlink()   # stale socket from a crashed daemon
+        server = UnixDaemon(str(socket_path), JSONLineHandler)
+        server.engine = engine
+        where = str(socket_path)
+
+    print(f"🚀 Daemon listening on {where}  (Ctrl+C or `query shutdown` to stop)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        engine.shutdown()
+        if not port and socket_path.exists():
+            socket_path.unlink()
+        print("\n✅ Daemon stopped.")
+
+
+def _socket_alive(path):
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as s:
+        try:
+            s.connect(str(path))
+            return True
+        except OSError:
+            return False
+
+
+# ============================================================================
+# CLIENT
+# ============================================================================
+
+def request(endpoint, params=None, socket_path=None, port=None, timeout=60):
+    """Send one request to a running daemon → (status, payload)"""
+    params = params or {}
+    if port:
+        # urllib pulls in http/email: only import it for HTTP mode
+        from urllib.error import HTTPError
+        from urllib.parse import urlencode
+        from urllib.request import urlopen
+
+        url = f"http://127.0.0.1:{port}/api/{endpoint}"
+        if params:
+            url += "?" + urlencode(params)
+        try:
+            with urlopen(url, timeout=timeout) as response:
+                return response.status, json.load(response)
+        except HTTPError as e:
+            return e.code, json.load(e)
+
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as s:
+        s.settimeout(timeout)
+        s.connect(str(socket_path or DEFAULT_SOCKET))
+        s.sendall(json.dumps({'endpoint': endpoint, 'params': params}).encode('utf-8') + b'\n')
+        with s.makefile('rb') as f:
+            reply = json.loads(f.readline())
+    status = reply.pop('status')
+    return status, reply.get('result', reply)
+
+
+def parse_params(pairs):
+    params = {}
+    for pair in pairs:
+        key, sep, value = pair.partition('=')
+        if not sep:
+            raise ValueError(f"parameters are key=value, got {pair!r}")
+        params[key] = value
+    return params
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Warm strategy daemon and client")
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    for name, help_text in (('serve', "run the daemon"), ('query', "send one request")):
+        p = sub.add_parser(name, help=help_text)
+        p.add_argument('--socket', type=Path, help=f"Unix socket (default {DEFAULT_SOCKET.name} in the repo)")
+        p.add_argument('--port', type=int, help="use localhost HTTP on this port instead")
+        if name == 'query':
+            p.add_argument('endpoint', help="momcash, rotation, goal, next, update, dashboard, reload, stats, shutdown")
+            p.add_argument('params', nargs='*', metavar='KEY=VALUE')
+
+    args = parser.parse_args()
+    if args.command == 'serve':
+        serve(args.socket, args.port)
+        return
+
+    try:
+        start = time.perf_counter()
+        status, payload = request(args.endpoint, parse_params(args.params), args.socket, args.port)
+    except ValueError as e:
+        parser.error(str(e))
+    except (ConnectionRefusedError, FileNotFoundError):
+        sys.exit("❌ No daemon running (start one with: python3 dashboard/daemon.py serve)")
+
+    print(json.dumps(payload, indent=2))
+    print(f"⏱️  {status} in {(time.perf_counter() - start) * 1000:.1f} ms", file=sys.stderr)
+    sys.exit(0 if status == 200 else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,568 @@
+"""
+Scenario API Engine
+On-demand strategy computation for the dashboard server
+
+Endpoints (served by serve_dashboard.py and the daemon in daemon.py):
+  /api/momcash?max_cash=0.6&sip=15000
+  /api/rotation?gain=20&loss=-15&universe=nifty500&sip=10000
+  /api/goal?target=10000000&years=15&confidence=90   SIP needed per strategy
+  /api/next?universe=nifty500                       next month's allocation
+  /api/update?universe=nifty500&date=2026-01-30&close=61234.5
+  /api/dashboard?universe=nifty500&sip=10000        re-export dashboard JSON
+  /api/reload                                       re-read data after a refresh
+  /api/stats
+
+Index data and the MOMCASH risk score are loaded once at startup into numpy
+arrays. Each request only re-runs the cheap parameter-dependent tail
+(allocation → NAV → SIP metrics), on a worker pool, and results are kept in a
+bounded LRU cache keyed by the normalized parameters. Every universe with
+data also keeps its daily frames (for dashboard exports) and an incremental
+signal state (core/incremental.py) in memory; actions are not cached.
+"""
+
+import contextlib
+import importlib
+import io
+import sys
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+BASE_DIR = Path(__file__).parent.parent
+
+sys.path.insert(0, str(BASE_DIR))
+sys.path.insert(0, str(BASE_DIR / "nifty500cash" / "analysis"))
+from core.goal_solver import CONFIDENCE, METHODS, N_PATHS, monthly_returns, solve_strategies
+from core.incremental import STATE_FILE, IncrementalEngine
+from core.universe import available_universes, get_universe
+from core.universe_pipeline import UniversePipeline
+from nifty500cash_strategy import (MOMCASHStrategy, risk_score_to_allocation,
+                                   CASH_MONTHLY_RETURN, MAX_CASH_PCT)
+
+# Monthly index files per rotation universe
+UNIVERSES = {
+    'nifty200': {
+        'analysis_dir': BASE_DIR / "nifty200" / "analysis",
+        'module': 'nifty200_portfolio_strategy',
+        'mom_file': BASE_DIR / "nifty200" / "output" / "monthly" / "nifty200_momentum_30_monthly.csv",
+        'val_file': BASE_DIR / "nifty200" / "output" / "monthly" / "nifty200_value_30_monthly.csv",
+    },
+    'nifty500': {
+        'analysis_dir': BASE_DIR / "nifty500" / "analysis",
+        'module': 'nifty500_portfolio_strategy',
+        'mom_file': BASE_DIR / "nifty500" / "output" / "monthly" / "nifty500_momentum_50_monthly.csv",
+        'val_file': BASE_DIR / "nifty500" / "output" / "monthly" / "nifty500_value_50_monthly.csv",
+    },
+}
+
+DEFAULT_SIP = 10000
+MAX_SIP = 10_000_000
+MAX_TARGET = 1e11
+MAX_GOAL_YEARS = 40
+MAX_GOAL_PATHS = 20000
+
+
+class LRUCache:
+    """Thread-safe bounded LRU mapping with hit/miss counters"""
+
+    def __init__(self, maxsize=256):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_create(self, key, factory):
+        """Return (value, hit); on a miss store factory() under key"""
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return self._data[key], True
+
+            self.misses += 1
+            value = factory()
+            self._data[key] = value
+            if len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+            return value, False
+
+    def discard(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'size': len(self._data),
+                'maxsize': self.maxsize,
+                'hits': self.hits,
+                'misses': self.misses,
+            }
+
+
+# ============================================================================
+# PARAMETER NORMALIZATION
+# ============================================================================
+
+def _get_float(query, name, default):
+    values = query.get(name)
+    if not values:
+        return float(default)
+    try:
+        return float(values[0])
+    except ValueError:
+        raise ValueError(f"'{name}' must be a number, got {values[0]!r}")
+
+
+def _normalize_sip(query):
+    sip = _get_float(query, 'sip', DEFAULT_SIP)
+    if not 0 < sip <= MAX_SIP:
+        raise ValueError(f"'sip' must be between 0 and {MAX_SIP:,}")
+    return round(sip, 2)
+
+
+def normalize_momcash_params(query):
+    """Validate /api/momcash query → hashable cache key"""
+    max_cash = _get_float(query, 'max_cash', MAX_CASH_PCT)
+    if not 0.0 <= max_cash <= 1.0:
+        raise ValueError("'max_cash' must be between 0 and 1")
+    return ('momcash', round(max_cash, 4), _normalize_sip(query))
+
+
+def normalize_rotation_params(query):
+    """Validate /api/rotation query → hashable cache key"""
+    universe = (query.get('universe') or ['nifty500'])[0].lower()
+    if universe not in UNIVERSES:
+        raise ValueError(f"'universe' must be one of {sorted(UNIVERSES)}")
+    gain = _get_float(query, 'gain', 20)
+    loss = _get_float(query, 'loss', -15)
+    if gain <= 0 or loss >= 0:
+        raise ValueError("'gain' must be positive and 'loss' negative (3M return, %)")
+    return ('rotation', universe, round(gain, 2), round(loss, 2), _normalize_sip(query))
+
+
+def normalize_goal_params(query):
+    """Validate /api/goal query → hashable cache key"""
+    universe = (query.get('universe') or ['nifty500'])[0].lower()
+    if universe not in UNIVERSES:
+        raise ValueError(f"'universe' must be one of {sorted(UNIVERSES)}")
+    if not query.get('target'):
+        raise ValueError("'target' is required (corpus in ₹)")
+    target = _get_float(query, 'target', 0)
+    if not 0 < target <= MAX_TARGET:
+        raise ValueError(f"'target' must be between 0 and {MAX_TARGET:,.0f}")
+    years = _get_float(query, 'years', 15)
+    if not 1 <= years <= MAX_GOAL_YEARS:
+        raise ValueError(f"'years' must be between 1 and {MAX_GOAL_YEARS}")
+    confidence = _get_float(query, 'confidence', CONFIDENCE)
+    if not 0 < confidence < 100:
+        raise ValueError("'confidence' must be between 0 and 100 (exclusive)")
+    method = (query.get('method') or ['bootstrap'])[0].lower()
+    if method not in METHODS:
+        raise ValueError(f"'method' must be one of {list(METHODS)}")
+    step_up = _get_float(query, 'step_up', 0)
+    if not 0 <= step_up <= 50:
+        raise ValueError("'step_up' must be between 0 and 50 (% per year)")
+    lump_sum = _get_float(query, 'lump_sum', 0)
+    if not 0 <= lump_sum <= MAX_TARGET:
+        raise ValueError(f"'lump_sum' must be between 0 and {MAX_TARGET:,.0f}")
+    paths = int(_get_float(query, 'paths', N_PATHS)) if method == 'bootstrap' else 0
+    if method == 'bootstrap' and not 100 <= paths <= MAX_GOAL_PATHS:
+        raise ValueError(f"'paths' must be between 100 and {MAX_GOAL_PATHS}")
+    return ('goal', universe, round(target, 0), round(years, 2), round(confidence, 2), method,
+            round(step_up, 2), round(lump_sum, 0), paths)
+
+
+NORMALIZERS = {
+    'momcash': normalize_momcash_params,
+    'rotation': normalize_rotation_params,
+    'goal': normalize_goal_params,
+}
+
+
+def _get_universe(query, loaded):
+    universe = (query.get('universe') or ['nifty500'])[0].lower()
+    if universe not in loaded:
+        raise ValueError(f"'universe' must be one of {sorted(loaded)}")
+    return universe
+
+
+def _get_date(query):
+    values = query.get('date')
+    if not values:
+        raise ValueError("'date' is required (month-end date of the close)")
+    try:
+        return pd.Timestamp(values[0])
+    except ValueError:
+        raise ValueError(f"'date' must be a date, got {values[0]!r}")
+
+
+# ============================================================================
+# SCENARIO ENGINE
+# ============================================================================
+
+class ScenarioEngine:
+    """Preloaded arrays + worker pool + LRU result cache"""
+
+    def __init__(self, cache_size=256, max_workers=4):
+        self.cache = LRUCache(cache_size)
+        self.pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='scenario')
+        self.rotation_data = {}
+        self.momcash_data = None
+        self.pipelines = {}
+        self.incremental = {}
+        # Actions that touch pipelines / incremental state run one at a time
+        self._action_lock = threading.Lock()
+        self.loaded_at = None
+
+    def preload(self):
+        """Load monthly index data and the MOMCASH risk score into arrays"""
+        print("\n📂 Preloading scenario data...")
+
+        for universe, config in UNIVERSES.items():
+            sys.path.insert(0, str(config['analysis_dir']))
+            module = importlib.import_module(config['module'])
+
+            mom_df = pd.read_csv(config['mom_file'], parse_dates=['Date'])
+            val_df = pd.read_csv(config['val_file'], parse_dates=['Date'])
+            merged = pd.merge(mom_df[['Date', 'Close']].rename(columns={'Close': 'Close_mom'}),
+                              val_df[['Date', 'Close']].rename(columns={'Close': 'Close_val'}),
+                              on='Date', how='inner')
+
+            close_mom = merged['Close_mom'].values.astype(float)
+            close_val = merged['Close_val'].values.astype(float)
+            self.rotation_data[universe] = {
+                'module': module,
+                'dates': list(merged['Date']),
+                'return_mom': _pct_change(close_mom, 1),
+                'return_val': _pct_change(close_val, 1),
+                'mom_3m': _pct_change(close_mom, 3) * 100,
+                # On the momentum index's own month-ends, as goal_solver's CLI uses it
+                'index_returns': monthly_returns(mom_df['Close']),
+            }
+            print(f"   ✅ {universe}: {len(merged)} months")
+
+        # Signals and risk score do not depend on max_cash or SIP amount,
+        # so the (noisy) strategy pipeline runs exactly once here.
+        strategy = MOMCASHStrategy(BASE_DIR / "data")
+        with contextlib.redirect_stdout(io.StringIO()):
+            df = strategy.load_monthly_data()
+            df = strategy.compute_signals(df)
+            df = strategy.calculate_risk_score(df)
+
+        close_mom = df['Close_mom'].values.astype(float)
+        self.momcash_data = {
+            'dates': list(df['Date']),
+            'return_mom': _pct_change(close_mom, 1),
+            'risk_score': df['risk_score'].values.astype(float),
+        }
+        print(f"   ✅ momcash: {len(df)} months (risk score precomputed)")
+
+        for name in available_universes():
+            pipeline = UniversePipeline(name)
+            with contextlib.redirect_stdout(io.StringIO()):
+                pipeline.load(write_monthly=False)
+            self.pipelines[name] = pipeline
+            self.incremental[name] = self._incremental_state(name, pipeline.monthly['momentum'])
+            print(f"   ✅ {name}: daily data + incremental state "
+                  f"(next allocation for {self.incremental[name].next_allocation()['for_month']})")
+        self.loaded_at = time.time()
+
+    def _incremental_state(self, name, monthly):
+        """Saved state if it is at least as recent as the data, else a replay"""
+        state_file = get_universe(name).output_dir / STATE_FILE
+        if state_file.exists():
+            engine = IncrementalEngine.load(state_file)
+            if engine.last_date is not None and engine.last_date >= monthly['Date'].iloc[-1]:
+                return engine
+        engine = IncrementalEngine(name)
+        engine.replay(monthly)
+        return engine
+
+    def query(self, endpoint, query, timeout=30):
+        """Resolve one API request → (payload dict, cached flag)
+
+        Raises:
+            KeyError: unknown endpoint
+            ValueError: invalid parameters
+        """
+        if endpoint in ACTIONS:
+            future = self.pool.submit(self._run_action, endpoint, query)
+            return future.result(timeout=timeout), False
+
+        key = NORMALIZERS[endpoint](query)
+
+        future, hit = self.cache.get_or_create(key, lambda: self.pool.submit(self._compute, key))
+        try:
+            result = future.result(timeout=timeout)
+        except Exception:
+            # Never cache failures
+            self.cache.discard(key)
+            raise
+        return result, hit
+
+    def stats(self):
+        return {
+            'cache': self.cache.stats(),
+            'universes': sorted(self.pipelines),
+            'loaded_at': None if self.loaded_at is None else time.strftime(
+                '%Y-%m-%d %H:%M:%S', time.localtime(self.loaded_at)),
+        }
+
+    def shutdown(self):
+        self.pool.shutdown(wait=False)
+
+    # ========================================================================
+    # COMPUTATION (runs on the worker pool)
+    # ========================================================================
+
+    def _compute(self, key):
+        if key[0] == 'momcash':
+            return self._compute_momcash(*key[1:])
+        if key[0] == 'goal':
+            return self._compute_goal(*key[1:])
+        return self._compute_rotation(*key[1:])
+
+    def _momcash_returns(self, max_cash):
+        """(w_mom, w_cash, monthly portfolio return) for a max cash allocation"""
+        data = self.momcash_data
+        w_mom, w_cash = risk_score_to_allocation(pd.Series(data['risk_score']), max_cash)
+        w_mom = w_mom.values
+        w_cash = w_cash.values
+        return w_mom, w_cash, w_mom * data['return_mom'] + w_cash * CASH_MONTHLY_RETURN
+
+    def _rotation_returns(self, universe, gain, loss):
+        """(regime, w_mom, monthly portfolio return) for rotation thresholds"""
+        data = self.rotation_data[universe]
+        regime = data['module'].simple_momentum_regime(data['mom_3m'], gain, loss)
+
+        # Signal at month t → allocation in month t+1 (start in momentum)
+        w_mom = np.concatenate([[1.0], np.where(regime == 'momentum', 1.0, 0.0)[:-1]])
+        return regime, w_mom, w_mom * data['return_mom'] + (1.0 - w_mom) * data['return_val']
+
+    def _compute_momcash(self, max_cash, sip):
+        data = self.momcash_data
+        w_mom, w_cash, portfolio_return = self._momcash_returns(max_cash)
+        nav = _nav_from_returns(portfolio_return)
+
+        summary = _sip_summary(data['dates'], nav, sip)
+        summary.update({
+            'avg_momentum_allocation': round(float(w_mom.mean() * 100), 1),
+            'avg_cash_allocation': round(float(w_cash.mean() * 100), 1),
+        })
+
+        return {
+            'params': {'max_cash': max_cash, 'sip': sip},
+            'kpis': summary,
+            'series': {
+                'dates': _date_strings(data['dates']),
+                'nav': _round_list(nav, 2),
+                'w_mom': _round_list(w_mom, 4),
+                'w_cash': _round_list(w_cash, 4),
+            },
+        }
+
+    def _compute_rotation(self, universe, gain, loss, sip):
+        data = self.rotation_data[universe]
+        module = data['module']
+        regime, w_mom, portfolio_return = self._rotation_returns(universe, gain, loss)
+        is_momentum = regime == 'momentum'
+        nav = _nav_from_returns(portfolio_return)
+
+        summary = _sip_summary(data['dates'], nav, sip, module.calculate_xirr)
+        summary.update({
+            'switches': int((regime[1:] != regime[:-1]).sum()),
+            'pct_time_momentum': round(float(is_momentum.mean() * 100), 1),
+        })
+
+        return {
+            'params': {'universe': universe, 'gain': gain, 'loss': loss, 'sip': sip},
+            'kpis': summary,
+            'series': {
+                'dates': _date_strings(data['dates']),
+                'nav': _round_list(nav, 2),
+                'w_mom': w_mom.tolist(),
+                'regime': regime.tolist(),
+            },
+        }
+
+    def _compute_goal(self, universe, target, years, confidence, method, step_up, lump_sum, paths):
+        """Required SIP per strategy (default thresholds / max cash) for a corpus target"""
+        module = self.rotation_data[universe]['module']
+        returns = {
+            'rotation': monthly_returns(_nav_from_returns(self._rotation_returns(
+                universe, module.GAIN_THRESHOLD, module.LOSS_THRESHOLD)[2])),
+            'momentum': self.rotation_data[universe]['index_returns'],
+        }
+        if universe == 'nifty500':
+            returns['momcash'] = monthly_returns(_nav_from_returns(self._momcash_returns(MAX_CASH_PCT)[2]))
+
+        results = solve_strategies(returns, target, years, confidence=confidence, method=method,
+                                   step_up_pct=step_up, lump_sum=lump_sum, n_paths=paths or N_PATHS)
+        return {
+            'params': {'universe': universe, 'target': target, 'years': years, 'confidence': confidence,
+                       'method': method, 'step_up': step_up, 'lump_sum': lump_sum, 'paths': paths},
+            'strategies': {name: {
+                'required_sip': round(r['required_sip'], 0),
+                'median_sip': round(r['median_sip'], 0),
+                'total_invested': round(r['total_invested'], 0),
+                'paths': r['paths'],
+                'success_pct': round(r['success_pct'], 2),
+                'value_p5': round(r['value_p5'], 0),
+                'value_p50': round(r['value_p50'], 0),
+                'value_p95': round(r['value_p95'], 0),
+                'curve': {'sip': _round_list(r['curve']['sip'], 0),
+                          'success_pct': _round_list(r['curve']['success_pct'], 2)},
+            } for name, r in results.items()},
+        }
+
+
+    # ========================================================================
+    # ACTIONS (uncached; serialized)
+    # ========================================================================
+
+    def _run_action(self, endpoint, query):
+        with self._action_lock:
+            return getattr(self, f"_action_{endpoint}")(query)
+
+    def _action_next(self, query):
+        return self.incremental[_get_universe(query, self.incremental)].next_allocation()
+
+    def _action_update(self, query):
+        """Advance the incremental state by one month-end close and persist it"""
+        universe = _get_universe(query, self.incremental)
+        date = _get_date(query)
+        close = _get_float(query, 'close', float('nan'))
+        engine = self.incremental[universe]
+        allocation = engine.update(date, close)
+        engine.save(get_universe(universe).output_dir / STATE_FILE)
+        return allocation
+
+    def _action_dashboard(self, query):
+        """Re-run strategy + analytics on the preloaded data and export the JSON"""
+        universe = _get_universe(query, self.pipelines)
+        pipeline = self.pipelines[universe]
+        pipeline.monthly_sip = _normalize_sip(query)
+        with contextlib.redirect_stdout(io.StringIO()):
+            results, portfolio_df = pipeline.run_strategy()
+            pipeline.run_analytics(portfolio_df)
+        return {
+            'universe': universe,
+            'file': str(pipeline.universe.output_dir / f"{universe}_portfolio_dashboard.json"),
+            'months': len(portfolio_df),
+            'sip_xirr': round(float(results['sip_xirr']), 2),
+            'max_drawdown': round(float(results['max_drawdown']), 2),
+        }
+
+    def _action_reload(self, query):
+        """Re-read every data file (after a data refresh) and clear the cache
+
+        Loads into a fresh engine and swaps the data in, so queries running
+        meanwhile keep seeing the old data.
+        """
+        fresh = ScenarioEngine(self.cache.maxsize, max_workers=1)
+        with contextlib.redirect_stdout(io.StringIO()):
+            fresh.preload()
+        fresh.shutdown()
+        for name in ('rotation_data', 'momcash_data', 'pipelines', 'incremental', 'loaded_at'):
+            setattr(self, name, getattr(fresh, name))
+        self.cache = LRUCache(self.cache.maxsize)
+        return self.stats()
+
+
+ACTIONS = ('next', 'update', 'dashboard', 'reload')
+
+
+# ============================================================================
+# ARRAY HELPERS
+# ============================================================================
+
+def _pct_change(values, periods):
+    result = np.full(len(values), np.nan)
+    result[periods:] = values[periods:] / values[:-periods] - 1
+    return result
+
+
+def _nav_from_returns(returns):
+    """NAV starting at 1000 (first month has no return)"""
+    growth = 1 + np.nan_to_num(returns, nan=0.0)
+    growth[0] = 1.0
+    return 1000 * np.cumprod(growth)
+
+
+def _sip_summary(dates, nav, monthly_sip, xirr_func=None):
+    """Same metrics as run_sip_on_portfolio, on plain arrays"""
+    if xirr_func is None:
+        from nifty500cash_strategy import calculate_xirr as xirr_func
+
+    n = len(nav)
+    cumulative_units = np.cumsum(monthly_sip / nav)
+    portfolio_value = cumulative_units * nav
+    total_invested = monthly_sip * np.arange(1, n + 1)
+
+    peak = np.maximum.accumulate(portfolio_value)
+    max_drawdown = float(((portfolio_value - peak) / peak * 100).min())
+    max_investor_dd = float(((portfolio_value - total_invested) / total_invested * 100).min())
+
+    final_value = float(portfolio_value[-1])
+    invested = float(total_invested[-1])
+
+    cash_flows = [(date, -monthly_sip) for date in dates]
+    cash_flows.append((dates[-1], final_value))
+    sip_xirr = float(xirr_func(cash_flows))
+
+    years = n / 12
+    index_cagr = ((nav[-1] / nav[0]) ** (1 / years) - 1) * 100
+    mar_ratio = sip_xirr / abs(max_drawdown) if max_drawdown != 0 else 0
+
+    return {
+        'sip_xirr': round(sip_xirr, 2),
+        'index_cagr': round(float(index_cagr), 2),
+        'total_invested': round(invested, 0),
+        'final_value': round(final_value, 0),
+        'absolute_gain': round(final_value - invested, 0),
+        'total_return_pct': round((final_value - invested) / invested * 100, 2),
+        'max_drawdown': round(max_drawdown, 2),
+        'max_investor_drawdown': round(max_investor_dd, 2),
+        'mar_ratio': round(float(mar_ratio), 2),
+        'num_months': n,
+    }
+
+
+def _date_strings(dates):
+    return [d.strftime('%Y-%m-%d') for d in dates]
+
+
+def _round_list(values, decimals):
+    return [round(float(v), decimals) for v in values]
+
+
+def dispatch(engine, endpoint, query):
+    """Answer one request → (HTTP-style status, JSON payload)"""
+    try:
+        if endpoint == 'stats':
+            return 200, engine.stats()
+        return 200, timed_query(engine, endpoint, query)
+    except KeyError:
+        return 404, {'error': f"Unknown endpoint: /api/{endpoint}"}
+    except ValueError as e:
+        return 400, {'error': str(e)}
+    except FutureTimeoutError:
+        return 504, {'error': 'Computation timed out'}
+    except Exception as e:
+        return 500, {'error': f"{type(e).__name__}: {e}"}
+
+
+def timed_query(engine, endpoint, query):
+    """Run engine.query and attach timing/cache metadata for the response"""
+    start = time.perf_counter()
+    result, cached = engine.query(endpoint, query)
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    return dict(result, meta={'cached': cached, 'elapsed_ms': round(elapsed_ms, 2)})
@@ -2,36 +2,95 @@
 """
 Simple HTTP Server for SIP Dashboard
 Serves the dashboard on http://localhost:8000
+
+Also exposes on-demand JSON endpoints (see scenario_api.py):
+  /api/momcash?max_cash=0.6&sip=15000
+  /api/rotation?gain=20&loss=-15&universe=nifty500
+  /api/goal?target=10000000&years=15&confidence=90
+  /api/next?universe=nifty500
+  /api/stats
+
+The state-changing actions (update, dashboard, reload) are only answered
+when the server is bound to loopback (daemon.py serve --port); this server
+listens on all interfaces, so it refuses them with 403.
 """
 
 import http.server
-import socketserver
+import ipaddress
+import json
 import os
+import sys
 from pathlib import Path
+from urllib.parse import urlparse, parse_qs
+
+sys.path.insert(0, str(Path(__file__).parent))
+from scenario_api import ScenarioEngine, dispatch
 
 PORT = 8000
 
+# Actions that persist state, rewrite outputs or swap data
+MUTATING_ACTIONS = ('update', 'dashboard', 'reload')
+
 class MyHTTPRequestHandler(http.server.SimpleHTTPRequestHandler):
+    engine = None
+
     def end_headers(self):
         # Enable CORS
         self.send_header('Access-Control-Allow-Origin', '*')
         self.send_header('Cache-Control', 'no-store, no-cache, must-revalidate')
         super().end_headers()
 
-# Serve from parent directory so paths work correctly
-os.chdir(Path(__file__).parent.parent)
-
-Handler = MyHTTPRequestHandler
-
-with socketserver.TCPServer(("", PORT), Handler) as httpd:
-    print(f"\n{'='*60}")
-    print(f"  🚀 SIP Dashboard Server Started!")
-    print(f"{'='*60}")
-    print(f"\n  📊 Dashboard URL: http://localhost:{PORT}/dashboard/dashboard.html")
-    print(f"\n  Press Ctrl+C to stop the server")
-    print(f"\n{'='*60}\n")
-    
-    try:
-        httpd.serve_forever()
-    except KeyboardInterrupt:
-        print("\n\n✅ Server stopped.")
+    def do_GET(self):
+        url = urlparse(self.path)
+        if not url.path.startswith('/api/'):
+            return super().do_GET()
+
+        endpoint = url.path[len('/api/'):].strip('/')
+        if endpoint in MUTATING_ACTIONS and not self.loopback_only():
+            return self.send_json(403, {'error': f"/api/{endpoint} is only served on a loopback "
+                                                 f"address (dashboard/daemon.py serve)"})
+        self.send_json(*dispatch(self.engine, endpoint, parse_qs(url.query)))
+
+    def loopback_only(self):
+        """True when the server is bound to a loopback address, not all interfaces"""
+        try:
+            return ipaddress.ip_address(self.server.server_address[0]).is_loopback
+        except ValueError:
+            return False
+
+    def send_json(self, status, payload):
+        body = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+def main(port=PORT):
+    # Serve from parent directory so paths work correctly
+    os.chdir(Path(__file__).parent.parent)
+
+    engine = ScenarioEngine()
+    engine.preload()
+    MyHTTPRequestHandler.engine = engine
+
+    # Threaded server: API requests wait on the worker pool in their own thread
+    http.server.ThreadingHTTPServer.allow_reuse_address = True
+    with http.server.ThreadingHTTPServer(("", port), MyHTTPRequestHandler) as httpd:
+        print(f"\n{'='*60}")
+        print(f"  🚀 SIP Dashboard Server Started!")
+        print(f"{'='*60}")
+        print(f"\n  📊 Dashboard URL: http://localhost:{port}/dashboard/dashboard.html")
+        print(f"  🧮 Scenario API:  http://localhost:{port}/api/momcash?max_cash=0.6&sip=15000")
+        print(f"\n  Press Ctrl+C to stop the server")
+        print(f"\n{'='*60}\n")
+
+        try:
+            httpd.serve_forever()
+        except KeyboardInterrupt:
+            print("\n\n✅ Server stopped.")
+        finally:
+            engine.shutdown()
+
+if __name__ == "__main__":
+    main()
@@ -72,7 +72,7 @@ def load_weekly_data_with_ma(data_folder, ma_period=30):
     
     # Load existing ratio data from weekly folder
     print("   Loading existing ratio data...")
-    ratio_file = data_folder.parent / "output" / "weekly" / "momentum_value_ratio_weekly.csv"
+    ratio_file = data_folder.parent / "nifty200" / "output" / "weekly" / "momentum_value_ratio_weekly.csv"
     ratio_df = pd.read_csv(ratio_file)
     ratio_df['Date'] = pd.to_datetime(ratio_df['Date'])
     
@@ -100,7 +100,7 @@ def load_weekly_data_with_ma(data_folder, ma_period=30):
 
 def main():
     # Initialize analyzer
-    data_folder = Path(__file__).parent.parent / "data"
+    data_folder = Path(__file__).parent.parent.parent / "data"
     analyzer = SIPAnalyzer(data_folder, monthly_sip=10000)
     
     # Manually run analysis for each index
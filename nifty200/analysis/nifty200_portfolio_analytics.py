@@ -10,8 +10,8 @@ from pathlib import Path
 import json
 import sys
 sys.path.insert(0, str(Path(__file__).parent))
-import plotly.graph_objects as go
-from plotly.subplots import make_subplots
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+from core.profiling import profile_run, profiled
 
 class PortfolioAnalytics:
     def __init__(self, portfolio_file, monthly_sip=10000):
@@ -21,6 +21,7 @@ class PortfolioAnalytics:
         self.monthly_sip = monthly_sip
         self.master_df = None
         
+    @profiled
     def build_master_dataframe(self):
         """Build comprehensive master dataframe with all metrics"""
         print("\n" + "="*80)
@@ -291,6 +292,7 @@ class PortfolioAnalytics:
         
         return charts
     
+    @profiled
     def export_dashboard_data(self, output_file):
         """Export complete dashboard data as JSON"""
         print("\n" + "="*80)
@@ -379,4 +381,5 @@ def main():
     print(f"\nLoad this in your dashboard: {output_file}\n")
 
 if __name__ == "__main__":
-    main()
+    with profile_run("nifty200_portfolio_analytics", Path(__file__).parent.parent / "output"):
+        main()
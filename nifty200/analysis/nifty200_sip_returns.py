@@ -60,7 +60,7 @@ class SIPAnalyzer:
     
     def save_monthly_data(self, monthly_data, index_name):
         """Save monthly consolidated data to CSV"""
-        output_dir = self.data_folder.parent / "output" / "monthly"
+        output_dir = self.data_folder.parent / "nifty200" / "output" / "monthly"
         output_dir.mkdir(parents=True, exist_ok=True)
         output_file = output_dir / f"{index_name.lower().replace(' ', '_')}_monthly.csv"
         monthly_data.to_csv(output_file, index=False)
@@ -388,7 +388,7 @@ class SIPAnalyzer:
 
 def main():
     # Initialize analyzer
-    data_folder = Path(__file__).parent.parent / "data"
+    data_folder = Path(__file__).parent.parent.parent / "data"
     analyzer = SIPAnalyzer(data_folder, monthly_sip=10000)
     
     # Run analysis
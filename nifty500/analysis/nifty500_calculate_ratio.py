@@ -7,12 +7,17 @@ and generates an interactive Plotly chart for the dashboard
 import pandas as pd
 import numpy as np
 from pathlib import Path
-import plotly.graph_objects as go
+import argparse
 import json
+import sys
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+from core.charts import HTML_MODES, export_figure
 
 class RatioAnalyzer:
-    def __init__(self, data_folder):
+    def __init__(self, data_folder, html_mode='shared'):
         self.data_folder = Path(data_folder)
+        self.html_mode = html_mode
         self.output_folder = self.data_folder.parent / "nifty500" / "output" / "weekly"
         self.output_folder.mkdir(parents=True, exist_ok=True)
         
@@ -56,6 +61,24 @@ class RatioAnalyzer:
         
         return weekly[['Date', 'Close']]
     
+    def build_ratio_frame(self, momentum_df, value_df):
+        """Weekly Momentum/Value ratio with 30-week MA from daily index data"""
+        momentum_weekly = self.get_weekly_closes(momentum_df)
+        momentum_weekly.columns = ['Date', 'Momentum_Close']
+        
+        value_weekly = self.get_weekly_closes(value_df)
+        value_weekly.columns = ['Date', 'Value_Close']
+        
+        ratio_df = pd.merge(momentum_weekly, value_weekly, on='Date', how='inner')
+        
+        # Calculate ratio directly (both indices start at 1000, so no normalization needed)
+        ratio_df['Momentum_Value_Ratio'] = ratio_df['Momentum_Close'] / ratio_df['Value_Close']
+        
+        # Calculate 30-week moving average
+        ratio_df['MA_30_Week'] = ratio_df['Momentum_Value_Ratio'].rolling(window=30, min_periods=1).mean()
+        
+        return ratio_df
+    
     def calculate_momentum_value_ratio(self):
         """Calculate weekly Momentum/Value ratio"""
         print("\n" + "="*80)
@@ -65,24 +88,14 @@ class RatioAnalyzer:
         # Read momentum data
         print("\nReading Momentum 50 data...")
         momentum_df = self.read_and_consolidate_index_data('nifty500mom50')
-        momentum_weekly = self.get_weekly_closes(momentum_df)
-        momentum_weekly.columns = ['Date', 'Momentum_Close']
         
         # Read value data
         print("Reading Value 50 data...")
         value_df = self.read_and_consolidate_index_data('nifty500val50')
-        value_weekly = self.get_weekly_closes(value_df)
-        value_weekly.columns = ['Date', 'Value_Close']
         
-        # Merge on date
+        # Merge on date and calculate ratio
         print("Calculating ratio...")
-        ratio_df = pd.merge(momentum_weekly, value_weekly, on='Date', how='inner')
-        
-        # Calculate ratio directly (both indices start at 1000, so no normalization needed)
-        ratio_df['Momentum_Value_Ratio'] = ratio_df['Momentum_Close'] / ratio_df['Value_Close']
-        
-        # Calculate 30-week moving average
-        ratio_df['MA_30_Week'] = ratio_df['Momentum_Value_Ratio'].rolling(window=30, min_periods=1).mean()
+        ratio_df = self.build_ratio_frame(momentum_df, value_df)
         
         print(f"\nTotal weekly data points: {len(ratio_df)}")
         print(f"Date range: {ratio_df['Date'].min().strftime('%Y-%m-%d')} to {ratio_df['Date'].max().strftime('%Y-%m-%d')}")
@@ -98,6 +111,10 @@ class RatioAnalyzer:
     
     def create_interactive_chart(self, ratio_df):
         """Create interactive Plotly chart"""
+        # Plotly is only needed here; importing it lazily keeps the ratio
+        # calculation (and everything that imports this module) fast to start
+        import plotly.graph_objects as go
+
         print("\nGenerating interactive Plotly chart...")
         print(f"📊 Data points to plot: {len(ratio_df)}")
         print(f"   Date range: {ratio_df['Date'].iloc[0]} to {ratio_df['Date'].iloc[-1]}")
@@ -200,25 +217,21 @@ class RatioAnalyzer:
         # Linear scale for ratio (removed log scale per user request)
         
         
-        # Save as JSON for web rendering
-        chart_json = fig.to_json()
-        json_file = self.output_folder / "ratio_chart.json"
-        with open(json_file, 'w') as f:
-            f.write(chart_json)
-        
-        print(f"✅ Saved chart JSON to: {json_file}")
-        
-        # Also save as standalone HTML for testing
-        html_file = self.output_folder / "ratio_chart.html"
-        fig.write_html(html_file)
-        print(f"✅ Saved standalone HTML chart to: {html_file}")
+        # Save as JSON for web rendering (+ HTML for testing, see core/charts.py)
+        for path in export_figure(fig, self.output_folder / "ratio_chart.json", self.html_mode):
+            print(f"✅ Saved chart to: {path}")
         
         return fig
 
 def main():
+    parser = argparse.ArgumentParser(description="Weekly Momentum/Value ratio and chart")
+    parser.add_argument('--html', choices=HTML_MODES, default='shared',
+                        help="chart HTML: shared plotly.js bundle, inline, or none (JSON only)")
+    args = parser.parse_args()
+
     # Initialize analyzer
     data_folder = Path(__file__).parent.parent.parent / "data"
-    analyzer = RatioAnalyzer(data_folder)
+    analyzer = RatioAnalyzer(data_folder, html_mode=args.html)
     
     # Calculate ratio
     ratio_df = analyzer.calculate_momentum_value_ratio()
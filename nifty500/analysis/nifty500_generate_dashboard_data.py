@@ -51,31 +51,14 @@ def read_and_consolidate_index_data(data_folder, index_folder):
     
     return combined_df
 
-def load_weekly_data_with_ma(data_folder, ma_period=30):
-    """Load weekly data for Momentum and Value indices with moving averages
-    Uses the same method as ratio calculation
-    """
-    
-    print("\n📊 Loading weekly index data with 30-week moving averages...")
-    
-    # Read momentum data
-    print("   Processing Momentum 30...")
-    momentum_df = read_and_consolidate_index_data(data_folder, 'nifty500mom50')
+def build_weekly_charts(momentum_df, value_df, ratio_df, ma_period=30):
+    """Weekly closes + moving averages for both indices and the ratio (chart JSON)"""
     momentum_weekly = get_weekly_closes(momentum_df)
     momentum_weekly['MA_30'] = momentum_weekly['Close'].rolling(window=ma_period, min_periods=1).mean()
     
-    # Read value data
-    print("   Processing Value 30...")
-    value_df = read_and_consolidate_index_data(data_folder, 'nifty500val50')
     value_weekly = get_weekly_closes(value_df)
     value_weekly['MA_30'] = value_weekly['Close'].rolling(window=ma_period, min_periods=1).mean()
     
-    # Load existing ratio data from weekly folder
-    print("   Loading existing ratio data...")
-    ratio_file = data_folder.parent / "nifty500" / "output" / "weekly" / "momentum_value_ratio_weekly.csv"
-    ratio_df = pd.read_csv(ratio_file)
-    ratio_df['Date'] = pd.to_datetime(ratio_df['Date'])
-    
     print(f"   ✅ Momentum: {len(momentum_weekly)} weeks")
     print(f"   ✅ Value: {len(value_weekly)} weeks")
     print(f"   ✅ Ratio: {len(ratio_df)} weeks")
@@ -98,6 +81,73 @@ def load_weekly_data_with_ma(data_folder, ma_period=30):
         }
     }
 
+def load_weekly_data_with_ma(data_folder, ma_period=30):
+    """Load weekly data for Momentum and Value indices with moving averages
+    Uses the same method as ratio calculation
+    """
+    
+    print("\n📊 Loading weekly index data with 30-week moving averages...")
+    
+    # Read momentum data
+    print("   Processing Momentum 30...")
+    momentum_df = read_and_consolidate_index_data(data_folder, 'nifty500mom50')
+    
+    # Read value data
+    print("   Processing Value 30...")
+    value_df = read_and_consolidate_index_data(data_folder, 'nifty500val50')
+    
+    # Load existing ratio data from weekly folder
+    print("   Loading existing ratio data...")
+    ratio_file = data_folder.parent / "nifty500" / "output" / "weekly" / "momentum_value_ratio_weekly.csv"
+    ratio_df = pd.read_csv(ratio_file)
+    ratio_df['Date'] = pd.to_datetime(ratio_df['Date'])
+    
+    return build_weekly_charts(momentum_df, value_df, ratio_df, ma_period)
+
+def build_dashboard_data(results):
+    """Assemble the dashboard JSON (per-index SIP cards + combined portfolio)"""
+    dashboard_data = {
+        'indices': [],
+        'portfolio': {
+            'total_invested': 0,
+            'total_value': 0,
+            'total_gain': 0,
+            'overall_return': 0
+        }
+    }
+    
+    total_invested_all = 0
+    total_value_all = 0
+    
+    for folder, result in results.items():
+        dashboard_data['indices'].append({
+            'name': result['index_name'],
+            'sip_xirr': round(float(result['xirr']), 2),
+            'index_cagr': round(float(result['index_cagr']), 2),
+            'total_return': round(float(result['return_pct']), 2),
+            'total_invested': round(float(result['total_invested']), 2),
+            'final_value': round(float(result['final_value']), 2),
+            'absolute_gain': round(float(result['absolute_return']), 2),
+            'max_drawdown': round(float(result['max_nav_dd']), 2),
+            'max_investor_drawdown': round(float(result['max_investor_dd']), 2),
+            'start_nav': round(float(result['start_nav']), 2),
+            'end_nav': round(float(result['end_nav']), 2),
+            'num_sips': int(result['num_sips'])
+        })
+        
+        total_invested_all += result['total_invested']
+        total_value_all += result['final_value']
+    
+    total_gain = total_value_all - total_invested_all
+    total_return_pct = (total_gain / total_invested_all) * 100
+    
+    dashboard_data['portfolio']['total_invested'] = round(float(total_invested_all), 2)
+    dashboard_data['portfolio']['total_value'] = round(float(total_value_all), 2)
+    dashboard_data['portfolio']['total_gain'] = round(float(total_gain), 2)
+    dashboard_data['portfolio']['overall_return'] = round(float(total_return_pct), 2)
+    
+    return dashboard_data
+
 def main():
     # Initialize analyzer
     data_folder = Path(__file__).parent.parent.parent / "data"
@@ -114,45 +164,7 @@ def main():
     
     if results:
         # Prepare dashboard data
-        dashboard_data = {
-            'indices': [],
-            'portfolio': {
-                'total_invested': 0,
-                'total_value': 0,
-                'total_gain': 0,
-                'overall_return': 0
-            }
-        }
-        
-        total_invested_all = 0
-        total_value_all = 0
-        
-        for folder, result in results.items():
-            dashboard_data['indices'].append({
-                'name': result['index_name'],
-                'sip_xirr': round(float(result['xirr']), 2),
-                'index_cagr': round(float(result['index_cagr']), 2),
-                'total_return': round(float(result['return_pct']), 2),
-                'total_invested': round(float(result['total_invested']), 2),
-                'final_value': round(float(result['final_value']), 2),
-                'absolute_gain': round(float(result['absolute_return']), 2),
-                'max_drawdown': round(float(result['max_nav_dd']), 2),
-                'max_investor_drawdown': round(float(result['max_investor_dd']), 2),
-                'start_nav': round(float(result['start_nav']), 2),
-                'end_nav': round(float(result['end_nav']), 2),
-                'num_sips': int(result['num_sips'])
-            })
-            
-            total_invested_all += result['total_invested']
-            total_value_all += result['final_value']
-        
-        total_gain = total_value_all - total_invested_all
-        total_return_pct = (total_gain / total_invested_all) * 100
-        
-        dashboard_data['portfolio']['total_invested'] = round(float(total_invested_all), 2)
-        dashboard_data['portfolio']['total_value'] = round(float(total_value_all), 2)
-        dashboard_data['portfolio']['total_gain'] = round(float(total_gain), 2)
-        dashboard_data['portfolio']['overall_return'] = round(float(total_return_pct), 2)
+        dashboard_data = build_dashboard_data(results)
         
         # Add weekly chart data
         try:
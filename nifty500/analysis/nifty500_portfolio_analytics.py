@@ -8,17 +8,23 @@ import pandas as pd
 import numpy as np
 from pathlib import Path
 import json
-import plotly.graph_objects as go
-from plotly.subplots import make_subplots
+import sys
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+from core.profiling import profile_run, profiled
 
 class PortfolioAnalytics:
     def __init__(self, portfolio_file, monthly_sip=10000):
-        """Initialize with portfolio strategy CSV file"""
-        self.portfolio_df = pd.read_csv(portfolio_file)
+        """Initialize with portfolio strategy CSV file (or an in-memory portfolio DataFrame)"""
+        if isinstance(portfolio_file, pd.DataFrame):
+            self.portfolio_df = portfolio_file.copy()
+        else:
+            self.portfolio_df = pd.read_csv(portfolio_file)
         self.portfolio_df['Date'] = pd.to_datetime(self.portfolio_df['Date'])
         self.monthly_sip = monthly_sip
         self.master_df = None
         
+    @profiled
     def build_master_dataframe(self):
         """Build comprehensive master dataframe with all metrics"""
         print("\n" + "="*80)
@@ -289,6 +295,7 @@ class PortfolioAnalytics:
         
         return charts
     
+    @profiled
     def export_dashboard_data(self, output_file):
         """Export complete dashboard data as JSON"""
         print("\n" + "="*80)
@@ -377,4 +384,5 @@ def main():
     print(f"\nLoad this in your dashboard: {output_file}\n")
 
 if __name__ == "__main__":
-    main()
+    with profile_run("nifty500_portfolio_analytics", Path(__file__).parent.parent / "output"):
+        main()
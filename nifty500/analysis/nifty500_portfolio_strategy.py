@@ -13,52 +13,67 @@ Strategy: Institutional-style factor rotation
 import pandas as pd
 import numpy as np
 from pathlib import Path
+import sys
 import warnings
 warnings.filterwarnings('ignore')
 
-def calculate_xirr(cash_flows, guess=0.1):
-    """Calculate XIRR (Extended Internal Rate of Return) using Newton-Raphson method
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+from core.frames import CompactSchema, compact_frame
+from core.profiling import profile_run, profiled
+from core.xirr import calculate_xirr
+
+# Optimized regime thresholds (3-month momentum return, in percent)
+GAIN_THRESHOLD = 20
+LOSS_THRESHOLD = -15
+
+REGIMES = ['momentum', 'value']
+
+# Compact mode (core/frames.py): categorical regime, float32 reference columns
+SIMPLE_MOMENTUM_COMPACT = CompactSchema(float32=['Ratio', 'Mom_3M_Return'],
+                                        categorical={'regime': REGIMES})
+
+
+def simple_momentum_regime(mom_3m, gain_threshold=GAIN_THRESHOLD, loss_threshold=LOSS_THRESHOLD):
+    """Simple Momentum regime state machine (20% Gain/Loss Rule)
     
     Args:
-        cash_flows: List of tuples (date, amount) where amount is negative for investments
+        mom_3m: Array of 3-month momentum returns in percent
+        
+    Returns:
+        numpy array of 'momentum' / 'value' regime labels (starts in momentum)
     """
-    from datetime import datetime
-    from scipy.optimize import newton
+    regime = np.empty(len(mom_3m), dtype=object)
+    current = 'momentum'  # Start with momentum
     
-    # Sort by date
-    cash_flows = sorted(cash_flows, key=lambda x: x[0])
-    
-    # Start date
-    start_date = cash_flows[0][0]
-    
-    # Convert to days from start
-    amounts = []
-    days = []
-    for date, amount in cash_flows:
-        days.append((date - start_date).days)
-        amounts.append(amount)
-    
-    # XIRR function (NPV at rate r)
-    def xnpv(rate):
-        return sum([amount / (1 + rate) ** (day / 365.0) for amount, day in zip(amounts, days)])
-    
-    # Derivative for Newton-Raphson
-    def xnpv_deriv(rate):
-        return sum([-amount * day / 365.0 / (1 + rate) ** (day / 365.0 + 1) for amount, day in zip(amounts, days)])
+    for i in range(len(mom_3m)):
+        value = mom_3m[i]
+        
+        # First month and NaN months keep the current regime
+        if i > 0 and not np.isnan(value):
+            # Rule 1: Momentum gains 20%+ in 3 months → 100% Momentum
+            if value >= gain_threshold:
+                current = 'momentum'
+            # Rule 2: Momentum loses 15%+ in 3 months → 100% Value (OPTIMIZED)
+            elif value <= loss_threshold:
+                current = 'value'
+            # Rule 3: Otherwise → Stay in current regime
+        
+        regime[i] = current
     
-    try:
-        rate = newton(xnpv, guess, fprime=xnpv_deriv, maxiter=100)
-        return rate * 100  # Convert to percentage
-    except:
-        return 0.0
+    return regime
 
 
 class PortfolioStrategy:
-    def __init__(self, data_folder, monthly_sip=10000):
+    def __init__(self, data_folder, monthly_sip=10000,
+                 gain_threshold=GAIN_THRESHOLD, loss_threshold=LOSS_THRESHOLD, compact=False):
         self.data_folder = Path(data_folder)
         self.monthly_sip = monthly_sip
+        self.gain_threshold = gain_threshold
+        self.loss_threshold = loss_threshold
+        self.compact = compact
         self.output_folder = self.data_folder.parent / "nifty500" / "output" / "monthly"
         
+    @profiled
     def load_monthly_data(self):
         """Load pre-generated monthly data for both indices"""
         print("\n" + "="*80)
@@ -98,6 +113,7 @@ class PortfolioStrategy:
         
         return df
 
+    @profiled
     def calculate_portfolio_returns(self, df):
         """Calculate portfolio returns based on dynamic weights"""
         df['Portfolio_Return'] = (
@@ -113,6 +129,7 @@ class PortfolioStrategy:
         
         return df
     
+    @profiled
     def run_sip_on_portfolio(self, df, strategy_name):
         """Run SIP analysis on the constructed portfolio NAV"""
         print(f"\n🎯 Running SIP analysis for: {strategy_name}")
@@ -201,36 +218,34 @@ class PortfolioStrategy:
         
         # Load data
         df = self.load_monthly_data()
+        df = self.build_portfolio(df)
+        
+        # Run SIP analysis
+        results, sip_data = self.run_sip_on_portfolio(df, 'Simple Momentum (20% Gain/Loss) - Nifty 500')
+        
+        # Save portfolio data
+        output_file = self.output_folder / "nifty500_simple_momentum.csv"
+        df.to_csv(output_file, index=False)
+        print(f"\n✅ Saved portfolio to: {output_file}")
+        
+        return results, df, sip_data
+    
+    @profiled
+    def build_portfolio(self, df):
+        """Regimes, lagged weights and portfolio NAV from merged monthly closes
+        
+        Args:
+            df: DataFrame with Date, Close_mom, Close_val (as from load_monthly_data)
+        """
         df = self.calculate_returns(df)
         
         # STEP 1 — Calculate 3-month momentum return
         df['Mom_3M_Return'] = df['Close_mom'].pct_change(3) * 100  # In percentage
         
         # STEP 2 — Simple Momentum Strategy with optimized thresholds
-        # Initialize regime
-        df['regime'] = 'momentum'  # Start with momentum
-        
-        # Apply optimized rules: 20% gain / -15% loss (same as Nifty 200)
-        for i in range(1, len(df)):
-            mom_3m = df.loc[i, 'Mom_3M_Return']
-            prev_regime = df.loc[i-1, 'regime']
-            
-            # Skip if NaN
-            if pd.isna(mom_3m):
-                df.loc[i, 'regime'] = prev_regime
-                continue
-            
-            # Rule 1: Momentum gains 20%+ in 3 months → 100% Momentum
-            if mom_3m >= 20:
-                df.loc[i, 'regime'] = 'momentum'
-            
-            # Rule 2: Momentum loses 15%+ in 3 months → 100% Value (OPTIMIZED)
-            elif mom_3m <= -15:
-                df.loc[i, 'regime'] = 'value'
-            
-            # Rule 3: Otherwise → Stay in current regime
-            else:
-                df.loc[i, 'regime'] = prev_regime
+        df['regime'] = simple_momentum_regime(
+            df['Mom_3M_Return'].values, self.gain_threshold, self.loss_threshold
+        )
         
         # STEP 3 — Binary allocation based on regime
         df['w_mom'] = np.where(df['regime'] == 'momentum', 1.0, 0.0)
@@ -273,15 +288,9 @@ class PortfolioStrategy:
         
         print("\n✅ Strategy calculations complete")
         
-        # Run SIP analysis
-        results, sip_data = self.run_sip_on_portfolio(df, 'Simple Momentum (20% Gain/Loss) - Nifty 500')
-        
-        # Save portfolio data
-        output_file = self.output_folder / "nifty500_simple_momentum.csv"
-        df.to_csv(output_file, index=False)
-        print(f"\n✅ Saved portfolio to: {output_file}")
-        
-        return results, df, sip_data
+        if self.compact:
+            df = compact_frame(df, SIMPLE_MOMENTUM_COMPACT)
+        return df
     
     def display_results(self, results):
         """Display strategy performance results"""
@@ -322,4 +331,5 @@ def main():
     print("\n")
 
 if __name__ == "__main__":
-    main()
+    with profile_run("nifty500_portfolio_strategy", Path(__file__).parent.parent / "output"):
+        main()
@@ -9,8 +9,12 @@ import numpy as np
 from pathlib import Path
 from datetime import datetime
 import glob
+import sys
 from pyxirr import xirr
 
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+from core.memo import memoized
+
 class SIPAnalyzer:
     def __init__(self, data_folder, monthly_sip=10000):
         self.data_folder = Path(data_folder)
@@ -20,6 +24,7 @@ class SIPAnalyzer:
             'nifty500val50': 'NIFTY500 VALUE 50'
         }
         
+    @memoized(files=lambda self, index_folder: glob.glob(str(self.data_folder / index_folder / "*.csv")))
     def read_and_consolidate_index_data(self, index_folder):
         """Read all CSV files for an index and combine them"""
         folder_path = self.data_folder / index_folder
@@ -180,32 +185,17 @@ class SIPAnalyzer:
         return max_investor_dd
 
     
-    def analyze_index(self, index_folder, index_name):
-        """Complete analysis for one index"""
-        print(f"\n{'='*80}")
-        print(f"Analyzing: {index_name}")
-        print(f"{'='*80}")
-        
-        # Read data
-        df = self.read_and_consolidate_index_data(index_folder)
-        
-        # Get monthly closes
-        monthly_closes = self.get_monthly_closes(df)
-        
-        # Save monthly data
-        monthly_file = self.save_monthly_data(monthly_closes, index_name)
-        
-        print(f"\nTotal daily data points: {len(df)}")
-        print(f"Monthly data points: {len(monthly_closes)}")
-        print(f"Date range: {df['Date'].min().strftime('%Y-%m-%d')} to {df['Date'].max().strftime('%Y-%m-%d')}")
-        print(f"Investment period: {monthly_closes['Date'].iloc[0].strftime('%Y-%m-%d')} to {monthly_closes['Date'].iloc[-1].strftime('%Y-%m-%d')}")
+    def summarize_sip(self, monthly_closes, index_name):
+        """SIP metrics for one index from its monthly closes
         
+        Returns:
+            (sip_data, result) or (None, None) if there is no data
+        """
         # Calculate SIP returns
         sip_data = self.calculate_sip_returns(monthly_closes)
         
         if sip_data is None or len(sip_data) == 0:
-            print("\nNo data available!")
-            return None
+            return None, None
         
         # Calculate metrics
         total_invested = sip_data['Total_Invested'].iloc[-1]
@@ -228,6 +218,60 @@ class SIPAnalyzer:
         years = (end_date - start_date).days / 365.25
         index_cagr = (pow(end_nav / start_nav, 1/years) - 1) * 100 if years > 0 else 0
         
+        return sip_data, {
+            'index_name': index_name,
+            'total_invested': total_invested,
+            'final_value': final_value,
+            'absolute_return': absolute_return,
+            'return_pct': return_pct,
+            'xirr': xirr_return,
+            'max_nav_dd': max_nav_dd,
+            'max_investor_dd': max_investor_dd,
+            'num_sips': len(sip_data),
+            'start_nav': start_nav,
+            'end_nav': end_nav,
+            'nav_return': nav_return,
+            'index_cagr': index_cagr
+        }
+    
+    def analyze_index(self, index_folder, index_name):
+        """Complete analysis for one index"""
+        print(f"\n{'='*80}")
+        print(f"Analyzing: {index_name}")
+        print(f"{'='*80}")
+        
+        # Read data
+        df = self.read_and_consolidate_index_data(index_folder)
+        
+        # Get monthly closes
+        monthly_closes = self.get_monthly_closes(df)
+        
+        # Save monthly data
+        monthly_file = self.save_monthly_data(monthly_closes, index_name)
+        
+        print(f"\nTotal daily data points: {len(df)}")
+        print(f"Monthly data points: {len(monthly_closes)}")
+        print(f"Date range: {df['Date'].min().strftime('%Y-%m-%d')} to {df['Date'].max().strftime('%Y-%m-%d')}")
+        print(f"Investment period: {monthly_closes['Date'].iloc[0].strftime('%Y-%m-%d')} to {monthly_closes['Date'].iloc[-1].strftime('%Y-%m-%d')}")
+        
+        sip_data, result = self.summarize_sip(monthly_closes, index_name)
+        
+        if sip_data is None:
+            print("\nNo data available!")
+            return None
+        
+        total_invested = result['total_invested']
+        final_value = result['final_value']
+        absolute_return = result['absolute_return']
+        return_pct = result['return_pct']
+        xirr_return = result['xirr']
+        max_nav_dd = result['max_nav_dd']
+        max_investor_dd = result['max_investor_dd']
+        start_nav = result['start_nav']
+        end_nav = result['end_nav']
+        nav_return = result['nav_return']
+        index_cagr = result['index_cagr']
+        
         # Display results
         print(f"\n{'─'*80}")
         print(f"SIP ANALYSIS - COMPLETE PERIOD")
@@ -279,21 +323,7 @@ class SIPAnalyzer:
                   f"₹{row['Portfolio_Value']:>13,.0f} "
                   f"{row['Returns']:>9.2f}%")
         
-        return {
-            'index_name': index_name,
-            'total_invested': total_invested,
-            'final_value': final_value,
-            'absolute_return': absolute_return,
-            'return_pct': return_pct,
-            'xirr': xirr_return,
-            'max_nav_dd': max_nav_dd,
-            'max_investor_dd': max_investor_dd,
-            'num_sips': len(sip_data),
-            'start_nav': start_nav,
-            'end_nav': end_nav,
-            'nav_return': nav_return,
-            'index_cagr': index_cagr
-        }
+        return result
     
     def run_analysis(self):
         """Run analysis for both indices"""
@@ -99,6 +99,36 @@ def compute_rolling_cagrs(df: pd.DataFrame) -> pd.DataFrame:
     return pd.DataFrame(results)
 
 
+# ─────────────────────────────────────────────
+# DASHBOARD JSON
+# ─────────────────────────────────────────────
+def df_to_chart_series(cagr_df: pd.DataFrame) -> dict:
+    series = {}
+    for label in PERIODS.keys():
+        col  = f"CAGR_{label}"
+        mask = cagr_df[col].notna()
+        series[label] = {
+            "dates":  cagr_df.loc[mask, "Date"].tolist(),
+            "values": cagr_df.loc[mask, col].tolist(),
+        }
+    return series
+
+
+def build_returns_json(mom_df: pd.DataFrame, val_df: pd.DataFrame,
+                       mom_cagr: pd.DataFrame, val_cagr: pd.DataFrame) -> dict:
+    return {
+        "metadata": {
+            "generated_at":   pd.Timestamp.now().strftime("%Y-%m-%d %H:%M:%S"),
+            "momentum_start": mom_df["Date"].min().strftime("%Y-%m"),
+            "momentum_end":   mom_df["Date"].max().strftime("%Y-%m"),
+            "value_start":    val_df["Date"].min().strftime("%Y-%m"),
+            "value_end":      val_df["Date"].max().strftime("%Y-%m"),
+        },
+        "momentum": df_to_chart_series(mom_cagr),
+        "value":    df_to_chart_series(val_cagr),
+    }
+
+
 # ─────────────────────────────────────────────
 # MAIN
 # ─────────────────────────────────────────────
@@ -139,28 +169,7 @@ def main():
     print(f"   {val_csv_out}")
 
     # ── Build JSON for dashboard ───────────────
-    def df_to_chart_series(cagr_df: pd.DataFrame) -> dict:
-        series = {}
-        for label in PERIODS.keys():
-            col  = f"CAGR_{label}"
-            mask = cagr_df[col].notna()
-            series[label] = {
-                "dates":  cagr_df.loc[mask, "Date"].tolist(),
-                "values": cagr_df.loc[mask, col].tolist(),
-            }
-        return series
-
-    output = {
-        "metadata": {
-            "generated_at":   pd.Timestamp.now().strftime("%Y-%m-%d %H:%M:%S"),
-            "momentum_start": mom_df["Date"].min().strftime("%Y-%m"),
-            "momentum_end":   mom_df["Date"].max().strftime("%Y-%m"),
-            "value_start":    val_df["Date"].min().strftime("%Y-%m"),
-            "value_end":      val_df["Date"].max().strftime("%Y-%m"),
-        },
-        "momentum": df_to_chart_series(mom_cagr),
-        "value":    df_to_chart_series(val_cagr),
-    }
+    output = build_returns_json(mom_df, val_df, mom_cagr, val_cagr)
 
     with open(OUTPUT_FILE, "w") as f:
         json.dump(output, f, indent=2)
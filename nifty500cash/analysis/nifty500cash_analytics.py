@@ -20,6 +20,8 @@ import json
 import sys
 
 sys.path.insert(0, str(Path(__file__).parent))
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+from core.profiling import profile_run, profiled
 from nifty500cash_strategy import MOMCASHStrategy, calculate_xirr
 
 
@@ -37,6 +39,7 @@ class MOMCASHAnalytics:
     # SUMMARY KPIs
     # ====================================================================
 
+    @profiled
     def calculate_summary_kpis(self):
         """Calculate performance KPIs for all three strategies"""
         df = self.df.copy()
@@ -346,6 +349,7 @@ class MOMCASHAnalytics:
     # EXPORT ALL TO DASHBOARD JSON
     # ====================================================================
 
+    @profiled
     def export_dashboard_data(self, output_file):
         """Export complete dashboard data as JSON"""
         print("\n" + "=" * 80)
@@ -455,4 +459,5 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
+    with profile_run("nifty500cash_analytics", Path(__file__).parent.parent / "output"):
+        main()
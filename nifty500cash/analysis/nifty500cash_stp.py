@@ -0,0 +1,257 @@
+"""
+MOMCASH Systematic Transfer Plan (STP)
+======================================
+A lump sum parked in the cash sleeve and drip-fed into momentum.
+
+The MOMCASH strategy already models cash earning CASH_MONTHLY_RETURN. An STP
+puts the whole lump sum into cash at the start month and transfers it into
+the momentum index over D months; the cash left behind keeps earning the
+cash return and the last transfer sweeps whatever remains.
+
+Transfer schedule (fractions of the lump sum per month):
+  equal   1/D each month
+  front   larger transfers first (D, D-1, ..., 1)
+  back    smaller transfers first (1, 2, ..., D)
+
+Risk-score tilt (optional): the MOMCASH risk score (0-100) computed at a
+month-end scales that month's transfer by
+1 + tilt × (NEUTRAL_RISK_SCORE - score) / 50, clipped to [0, MAX_TILT_MULTIPLE].
+Scores above neutral (extended market) brake the transfer; calm or
+post-crash scores below it accelerate it. The last month always sweeps, so
+the plan still ends after D months.
+
+Compared for EVERY historical start month and each STP duration at once
+(arrays of starts × durations; the simulation loops only over the D
+transfer months), all valued at the same horizon after the start:
+  - Lump sum:   everything into momentum at the start
+  - SIP:        the same total in D equal monthly instalments (no interest
+                on money not yet invested)
+  - STP:        cash sleeve + schedule
+  - STP + risk: cash sleeve + schedule scaled by the risk score
+
+Usage:
+    python3 nifty500cash/analysis/nifty500cash_stp.py
+    python3 nifty500cash/analysis/nifty500cash_stp.py --durations 6 12 24 --horizon 60 --schedule front
+    python3 nifty500cash/analysis/nifty500cash_stp.py --risk-tilt 0      # plain STP only
+"""
+
+import argparse
+import contextlib
+import io
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).parent))
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+from core.xirr import xirr_columns
+from nifty500cash_strategy import CASH_ANNUAL_RETURN, CASH_MONTHLY_RETURN, MOMCASHStrategy
+
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+
+LUMP_SUM = 1_000_000
+DURATIONS = (3, 6, 12, 18, 24)       # months
+HORIZON = 60                          # months from start to valuation
+SCHEDULES = ('equal', 'front', 'back')
+RISK_TILT = 1.0                       # 0 = ignore the risk score
+NEUTRAL_RISK_SCORE = 25               # transfer as scheduled at this score
+MAX_TILT_MULTIPLE = 2.0               # transfer at most 2× the scheduled amount
+
+
+# ============================================================================
+# ENGINE
+# ============================================================================
+
+def transfer_fractions(duration, schedule='equal'):
+    """Fraction of the lump sum scheduled for each of the D months"""
+    if schedule not in SCHEDULES:
+        raise ValueError(f"schedule must be one of {SCHEDULES}, got {schedule!r}")
+    k = np.arange(duration, dtype=float)
+    weights = {'equal': np.ones(duration), 'front': duration - k, 'back': k + 1}[schedule]
+    return weights / weights.sum()
+
+
+def risk_multiplier(risk_score, tilt=RISK_TILT):
+    """Transfer multiplier per month from the risk score (1 = as scheduled)"""
+    score = np.nan_to_num(np.asarray(risk_score, dtype=float), nan=NEUTRAL_RISK_SCORE)
+    return np.clip(1 + tilt * (NEUTRAL_RISK_SCORE - score) / 50.0, 0.0, MAX_TILT_MULTIPLE)
+
+
+def simulate_stp(nav, durations, horizon, lump_sum=LUMP_SUM, schedule='equal',
+                 cash_return=CASH_MONTHLY_RETURN, multiplier=None):
+    """STP for every start month × duration
+
+    nav:        month-end NAVs of the target (momentum) index
+    multiplier: per-month transfer multiplier (e.g. risk_multiplier), or None
+
+    Returns (starts, value, transferred_at) where value[s, d] is the plan's
+    value `horizon` months after start s, and transferred_at[s, d, k] the
+    amount moved into momentum k months after the start.
+    """
+    nav = np.asarray(nav, dtype=float)
+    durations = np.asarray(durations, dtype=int)
+    if horizon < durations.max():
+        raise ValueError("horizon must be at least the longest STP duration")
+    if len(nav) - horizon < 1:
+        raise ValueError(f"horizon of {horizon} months leaves no start month in "
+                         f"{len(nav)} months of history")
+    starts = np.arange(len(nav) - horizon)
+    n_months = durations.max()
+
+    # Scheduled amounts, padded with zeros past each duration: durations × months
+    scheduled = np.zeros((len(durations), n_months))
+    for j, d in enumerate(durations):
+        scheduled[j, :d] = transfer_fractions(d, schedule) * lump_sum
+
+    cash = np.full((len(starts), len(durations)), float(lump_sum))
+    units = np.zeros_like(cash)
+    transferred = np.zeros(cash.shape + (n_months,))
+    for k in range(n_months):
+        rows = starts + k
+        amount = np.broadcast_to(scheduled[:, k], cash.shape)
+        if multiplier is not None:
+            amount = amount * multiplier[rows][:, None]
+        amount = np.where(k == durations - 1, cash, np.minimum(amount, cash))   # last month sweeps
+        units += amount / nav[rows][:, None]
+        cash = (cash - amount) * (1 + cash_return)
+        transferred[:, :, k] = amount
+
+    value = units * nav[starts + horizon][:, None]
+    return starts, value, transferred
+
+
+def compare_entries(dates, nav, risk_score=None, durations=DURATIONS, horizon=HORIZON,
+                    lump_sum=LUMP_SUM, schedule='equal', tilt=RISK_TILT,
+                    cash_return=CASH_MONTHLY_RETURN):
+    """Lump sum vs SIP vs STP (vs risk-tilted STP) for every start month
+
+    Returns a long DataFrame: one row per (start, duration, method) with
+    terminal value, multiple of the lump sum and XIRR.
+    """
+    dates = pd.DatetimeIndex(dates)
+    nav = np.asarray(nav, dtype=float)
+    durations = np.asarray(durations, dtype=int)
+    starts, stp_value, _ = simulate_stp(nav, durations, horizon, lump_sum, schedule, cash_return)
+    end = starts + horizon
+
+    values = {
+        'Lump sum': np.broadcast_to((lump_sum * nav[end] / nav[starts])[:, None], stp_value.shape),
+        'SIP': simulate_stp(nav, durations, horizon, lump_sum, 'equal', 0.0)[1],
+        'STP': stp_value,
+    }
+    if risk_score is not None and tilt:
+        values['STP + risk'] = simulate_stp(nav, durations, horizon, lump_sum, schedule, cash_return,
+                                            risk_multiplier(risk_score, tilt))[1]
+
+    day = (dates - dates[0]).days.to_numpy()
+    years = (day[end] - day[starts]) / 365.0
+    frames = []
+    for method, value in values.items():
+        if method == 'SIP':
+            # Instalments of lump/D at months 0..D-1 after the start
+            k = np.arange(durations.max() + 1)
+            paid = np.where(k[:-1, None] < durations[None, :], lump_sum / durations[None, :], 0.0)
+            flows = np.concatenate([-np.broadcast_to(paid[:, None, :], (len(k) - 1,) + value.shape),
+                                    value[None]])
+            flow_days = np.concatenate([day[starts[None, :] + k[:-1, None]], day[end][None, :]])
+            xirr = xirr_columns(np.broadcast_to((flow_days - day[starts])[:, :, None], flows.shape), flows)
+        else:
+            # One outflow at the start, one inflow at the horizon
+            xirr = ((value / lump_sum) ** (1 / years[:, None]) - 1) * 100
+
+        for j, d in enumerate(durations):
+            frames.append(pd.DataFrame({
+                'start': dates[starts], 'duration': d, 'method': method,
+                'value': value[:, j], 'multiple': value[:, j] / lump_sum, 'xirr': xirr[:, j]}))
+    return pd.concat(frames, ignore_index=True)
+
+
+def summarize(results):
+    """Per duration × method: mean / median / worst XIRR, and how often each method wins
+
+    Wins and "beats lump sum" compare XIRR, so the SIP (whose money arrives
+    over time) is ranked on the same footing as the lump-sum deployments.
+    """
+    pivot = results.pivot_table(index=['start', 'duration'], columns='method', values='xirr')
+    best = pivot.idxmax(axis=1).rename('best').reset_index()
+    win_rate = (best.groupby('duration')['best'].value_counts(normalize=True) * 100).rename('win_pct')
+
+    stats = results.groupby(['duration', 'method'])['xirr'].agg(
+        mean='mean', median='median', worst='min', best='max')
+    stats = stats.join(win_rate.rename_axis(['duration', 'method']), how='left').fillna({'win_pct': 0.0})
+    stats['beats_lump_pct'] = (pivot.sub(pivot['Lump sum'], axis=0) > 0).groupby('duration').mean().stack() * 100
+    return stats
+
+
+# ============================================================================
+# DATA
+# ============================================================================
+
+def load_momentum(data_folder):
+    """(dates, momentum NAV, risk score computed at each month-end)"""
+    strategy = MOMCASHStrategy(data_folder)
+    with contextlib.redirect_stdout(io.StringIO()):
+        df = strategy.calculate_risk_score(strategy.compute_signals(strategy.load_monthly_data()))
+    # risk_score is lagged (applied in the following month); the score known
+    # at month-end t is the next row's
+    score_at_month_end = df['risk_score'].shift(-1).to_numpy()
+    return df['Date'], df['Close_mom'].to_numpy(), score_at_month_end
+
+
+# ============================================================================
+# MAIN
+# ============================================================================
+
+def main():
+    parser = argparse.ArgumentParser(description="STP from the cash sleeve into momentum, every start month")
+    parser.add_argument('--lump-sum', type=float, default=LUMP_SUM)
+    parser.add_argument('--durations', type=int, nargs='+', default=list(DURATIONS), help="months")
+    parser.add_argument('--horizon', type=int, default=HORIZON, help="months from start to valuation")
+    parser.add_argument('--schedule', choices=SCHEDULES, default='equal')
+    parser.add_argument('--risk-tilt', type=float, default=RISK_TILT,
+                        help=f"transfer × (1 + tilt × ({NEUTRAL_RISK_SCORE} - risk_score) / 50); 0 disables")
+    parser.add_argument('--out', type=Path, help="write every (start, duration, method) row to this CSV")
+    args = parser.parse_args()
+
+    data_folder = Path(__file__).parent.parent.parent / "data"
+    dates, nav, risk_score = load_momentum(data_folder)
+    try:
+        results = compare_entries(dates, nav, risk_score, args.durations, args.horizon, args.lump_sum,
+                                  args.schedule, args.risk_tilt)
+    except ValueError as e:
+        parser.error(str(e))
+    stats = summarize(results)
+
+    n_starts = results['start'].nunique()
+    print("\n" + "=" * 100)
+    print(f"LUMP SUM vs SIP vs STP — {n_starts} start months "
+          f"({results['start'].min():%Y-%m} to {results['start'].max():%Y-%m}), "
+          f"valued {args.horizon} months after start")
+    print("=" * 100)
+    print(f"   ₹{args.lump_sum:,.0f} | schedule: {args.schedule} | cash: {CASH_ANNUAL_RETURN * 100:.1f}% p.a."
+          f"{f' | risk tilt: {args.risk_tilt:g}' if args.risk_tilt else ''}")
+
+    for duration in args.durations:
+        print(f"\n   {duration}-month transfer")
+        print(f"   {'Method':<12s} {'Mean XIRR':>10s} {'Median':>8s} {'Worst':>8s} {'Best':>8s} "
+              f"{'Wins':>7s} {'> Lump':>8s}")
+        print("   " + "-" * 66)
+        for method, row in stats.loc[duration].iterrows():
+            beats = f"{row['beats_lump_pct']:>7.1f}%" if method != 'Lump sum' else f"{'—':>8s}"
+            print(f"   {method:<12s} {row['mean']:>9.2f}% {row['median']:>7.2f}% {row['worst']:>7.2f}% "
+                  f"{row['best']:>7.2f}% {row['win_pct']:>6.1f}% {beats}")
+
+    print("\n   Wins / > Lump: share of start months with the highest XIRR / an XIRR above the lump sum's")
+
+    if args.out:
+        results.to_csv(args.out, index=False)
+        print(f"\n✅ Saved {len(results)} rows to: {args.out}")
+
+
+if __name__ == "__main__":
+    main()
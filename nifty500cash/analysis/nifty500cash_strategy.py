@@ -55,34 +55,16 @@ Why this works:
 import pandas as pd
 import numpy as np
 from pathlib import Path
+import argparse
+import sys
 import warnings
 warnings.filterwarnings('ignore')
 
-
-def calculate_xirr(cash_flows, guess=0.1):
-    """Calculate XIRR (Extended Internal Rate of Return) using Newton-Raphson method"""
-    from scipy.optimize import newton
-
-    cash_flows = sorted(cash_flows, key=lambda x: x[0])
-    start_date = cash_flows[0][0]
-
-    amounts = []
-    days = []
-    for date, amount in cash_flows:
-        days.append((date - start_date).days)
-        amounts.append(amount)
-
-    def xnpv(rate):
-        return sum([amount / (1 + rate) ** (day / 365.0) for amount, day in zip(amounts, days)])
-
-    def xnpv_deriv(rate):
-        return sum([-amount * day / 365.0 / (1 + rate) ** (day / 365.0 + 1) for amount, day in zip(amounts, days)])
-
-    try:
-        rate = newton(xnpv, guess, fprime=xnpv_deriv, maxiter=100)
-        return rate * 100
-    except:
-        return 0.0
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+from core.frames import CompactSchema, compact_frame, memory_report
+from core.memo import memoized
+from core.profiling import profile_run, profiled
+from core.xirr import calculate_xirr
 
 
 # ============================================================================
@@ -101,6 +83,173 @@ CASH_ANNUAL_RETURN = 0.05  # 5% annualized
 CASH_MONTHLY_RETURN = (1 + CASH_ANNUAL_RETURN) ** (1/12) - 1
 
 
+def risk_score_to_allocation(risk_score, max_cash_pct=MAX_CASH_PCT):
+    """Map an (already lagged) risk score series to momentum/cash weights
+
+    Convex mapping: cash = (score/100)^2 × max_cash_pct, rounded to 5% steps
+    for practical implementation and clipped to at most 50% cash.
+
+    Returns:
+        (w_mom, w_cash) as pandas Series aligned with risk_score
+    """
+    w_mom, w_cash = _allocation_weights(risk_score.to_numpy(dtype=float), max_cash_pct)
+    return pd.Series(w_mom, index=risk_score.index), pd.Series(w_cash, index=risk_score.index)
+
+
+def risk_score_weights(risk_score, max_cash_pct=MAX_CASH_PCT):
+    """risk_score_to_allocation for a single score → (w_mom, w_cash) floats"""
+    w_mom, w_cash = _allocation_weights(np.float64(risk_score), max_cash_pct)
+    return float(w_mom), float(w_cash)
+
+
+def _allocation_weights(risk_score, max_cash_pct):
+    """The score → weight mapping on a numpy array or scalar"""
+    w_cash = ((risk_score / 100.0) ** 2) * max_cash_pct
+    w_mom = np.where(np.isnan(w_cash), BASE_MOMENTUM, 1.0 - w_cash)
+
+    # Round to 5% for practical implementation
+    w_mom = np.round(w_mom * 100 / 5.0) * 5.0 / 100
+    w_cash = 1.0 - w_mom
+    w_mom = np.round(np.clip(w_mom, 0.5, 1.0), 4)
+    w_cash = np.round(np.clip(w_cash, 0.0, 0.5), 4)
+
+    return w_mom, w_cash
+
+
+# Risk score components, in portfolio CSV column order (max points in score_components)
+SCORE_COMPONENTS = ['score_extension', 'score_3m_heat', 'score_dist_ma', 'score_zscore',
+                    'score_volatility', 'score_deceleration', 'score_dd_danger', 'score_bubble_24m']
+
+# Risk score persistence: fastest decay when the slope is positive (redeploy quickly)
+MAX_DECAY_PER_MONTH = 25.0
+
+# Reporting tiers of the (lagged) risk score: labels and upper bin edges
+ALLOCATION_TIERS = ['fully_invested', 'low_risk', 'elevated_risk', 'high_risk']
+ALLOCATION_TIER_BINS = [-0.01, 10, 30, 60, 100]
+
+# Compact mode (core/frames.py): prices, returns, weights, NAVs and the risk
+# score stay float64; display-only signals go float32; scratch columns are dropped
+MOMCASH_COMPACT = CompactSchema(
+    float32=['return_6m', 'return_9m', 'return_3m', 'return_1m', 'ma_10m', 'ma_slope',
+             'momentum_zscore', 'dist_from_ma', 'return_6m_percentile', 'drawdown',
+             'volatility_3m', 'return_24m', *SCORE_COMPONENTS, 'risk_score_raw',
+             'Portfolio_Drawdown', 'Momentum_Drawdown', 'Static_Drawdown'],
+    categorical={'allocation_tier': ALLOCATION_TIERS},
+    drop=['YearMonth', 'return_6m_mean', 'return_6m_std', 'return_3m_prev', 'rolling_peak',
+          'vol_median_36m', 'Portfolio_Peak', 'Momentum_Peak', 'Static_Peak'],
+)
+
+
+def _value(x, default=0.0):
+    return default if pd.isna(x) else x
+
+
+def score_components(ret_3m, ret_6m, dd, prev_dd, dist, pctile, zscore, vol_spike,
+                     decelerating, ret_24m):
+    """Risk points of each signal for one month (NaN inputs count as neutral)
+
+    Shared by MOMCASHStrategy.calculate_risk_score (full history) and the
+    incremental engine in core/incremental.py (one new month).
+    """
+    scores = dict.fromkeys(SCORE_COMPONENTS, 0.0)
+    if pd.isna(ret_6m):
+        return scores
+
+    ret_3m, ret_6m, dd, dist = _value(ret_3m), _value(ret_6m), _value(dd), _value(dist)
+
+    # ============================================================
+    # BUBBLE SIGNALS — fire RARELY, only at genuine extremes
+    # Goal: Hold cash only during 2007-type bubble tops
+    # ============================================================
+
+    # 1. MOMENTUM EXTENSION — only above 85th percentile (max 25 pts)
+    if not pd.isna(pctile) and pctile > 0.85:
+        scores['score_extension'] = ((pctile - 0.85) / 0.15) * 25.0
+
+    # 2. SHORT-TERM EXTREME HEAT — only above 25% (max 20 pts)
+    if ret_3m > 0.35:
+        scores['score_3m_heat'] = 20.0
+    elif ret_3m > 0.25:
+        scores['score_3m_heat'] = 10.0
+
+    # 3. DISTANCE FROM MA — only above 25% (max 20 pts)
+    if dist > 0.25:
+        scores['score_dist_ma'] = min(((dist - 0.25) / 0.25) * 20.0, 20.0)
+
+    # 4. Z-SCORE — only above 1.5 (max 15 pts)
+    zscore = _value(zscore)
+    if zscore > 1.5:
+        scores['score_zscore'] = min(((zscore - 1.5) / 1.0) * 15.0, 15.0)
+
+    # 5. VOLATILITY SPIKE (max 10 pts) — keep as-is, it's useful
+    if vol_spike and not pd.isna(vol_spike):
+        scores['score_volatility'] = 10.0
+
+    # 6. DECELERATION while extended (max 5 pts)
+    if decelerating and ret_6m > 0.30:
+        scores['score_deceleration'] = 5.0
+
+    # 6b. MULTI-YEAR BUBBLE (max 25 pts)
+    # "The bigger the run over 2-3 years, the bigger the crash."
+    # Only fires at extreme multi-year outperformance.
+    ret_24m = _value(ret_24m)
+    if ret_24m > 1.50:
+        scores['score_bubble_24m'] = 25.0   # 150%+ in 2 years = severe bubble
+    elif ret_24m > 1.00:
+        scores['score_bubble_24m'] = 15.0   # 100%+ in 2 years = bubble territory
+
+    # ============================================================
+    # 7. CRASH-ONSET / DRAWDOWN DANGER (max 80 pts) — KEY SIGNAL
+    # Must be STRONG enough to push raw score above frozen effective
+    # score. During crashes, bubble signals fade to 0 — dd_danger is
+    # the ONLY signal that fires. It must single-handedly drive the
+    # score high enough for 50-70% cash.
+    # ============================================================
+    dd_deepening = dd < _value(prev_dd) - 0.01  # DD getting worse by >1%
+
+    if dd < -0.25 and ret_3m < -0.10:
+        scores['score_dd_danger'] = 80.0    # Severe crash: max protection
+    elif dd < -0.20 and ret_3m < -0.10:
+        scores['score_dd_danger'] = 65.0    # Active crash: deep DD + falling fast
+    elif dd < -0.15 and dd_deepening:
+        scores['score_dd_danger'] = 50.0    # Crash accelerating
+    elif dd < -0.10 and dd_deepening and dist < 0:
+        scores['score_dd_danger'] = 35.0    # Crash starting: below MA + deepening
+
+    return scores
+
+
+def persist_risk_score(raw, prev_effective, ret_3m, dd):
+    """Effective risk score from this month's raw score and last month's effective
+
+    Risk rising → follow immediately (build cash fast)
+    Momentum still falling (3M < 0) → FREEZE score (hold cash)
+    Momentum turned positive → decay at 20-25/month (redeploy fast)
+    This holds cash through the ENTIRE crash, deploys on recovery.
+    """
+    if prev_effective is None:
+        return raw
+    if raw >= prev_effective:
+        # Risk rising → follow immediately (build cash fast)
+        effective = raw
+    else:
+        # Risk falling → only deploy cash when downward slope halts
+        if _value(ret_3m) < 0:
+            # MOMENTUM STILL FALLING → FREEZE score completely
+            # Don't deploy ANY cash while the slope is downward
+            decay = 0.0
+        elif _value(dd) < -0.15:
+            # Slope turned positive, recovering from crash
+            # → deploy moderately fast to capture recovery
+            decay = 20.0
+        else:
+            # Slope positive AND near highs → full speed deployment
+            decay = MAX_DECAY_PER_MONTH
+        effective = max(raw, prev_effective - decay)
+    # Ensure still in valid range
+    return float(np.clip(effective, 0, 100))
+
+
 class MOMCASHStrategy:
     """
     MOMCASH v2: Continuous Risk Score Architecture
@@ -111,10 +260,14 @@ class MOMCASHStrategy:
     BEFORE the crash, not triggered BY the crash.
     """
 
-    def __init__(self, data_folder, monthly_sip=10000, cash_return='simulated'):
+    def __init__(self, data_folder, monthly_sip=10000, cash_return='simulated',
+                 max_cash_pct=MAX_CASH_PCT, compact=False):
         self.data_folder = Path(data_folder)
         self.monthly_sip = monthly_sip
         self.cash_return = cash_return
+        self.max_cash_pct = max_cash_pct
+        # Compact frames: categorical tier, float32 display columns, no scratch columns
+        self.compact = compact
         self.output_folder = self.data_folder.parent / "nifty500cash" / "output" / "monthly"
         self.output_folder.mkdir(parents=True, exist_ok=True)
 
@@ -122,15 +275,22 @@ class MOMCASHStrategy:
     # DATA LOADING
     # ========================================================================
 
-    def load_monthly_data(self):
-        """Load pre-generated monthly momentum index data"""
+    @profiled
+    def load_monthly_data(self, mom_df=None):
+        """Load pre-generated monthly momentum index data
+
+        mom_df: month-end closes already in memory (e.g. from a
+        UniversePipeline) instead of the nifty500 monthly CSV.
+        """
         print("\n" + "=" * 80)
         print("MOMCASH v2 — Continuous Risk Score Architecture")
         print("=" * 80)
         print("\n📂 Loading monthly momentum index data...")
 
-        mom_file = self.data_folder.parent / "nifty500" / "output" / "monthly" / "nifty500_momentum_50_monthly.csv"
-        mom_df = pd.read_csv(mom_file)
+        if mom_df is None:
+            mom_file = self.data_folder.parent / "nifty500" / "output" / "monthly" / "nifty500_momentum_50_monthly.csv"
+            mom_df = pd.read_csv(mom_file)
+        mom_df = mom_df.copy()
         mom_df['Date'] = pd.to_datetime(mom_df['Date'])
         mom_df = mom_df.rename(columns={'Close': 'Close_mom'})
 
@@ -143,10 +303,17 @@ class MOMCASHStrategy:
     # SIGNAL COMPUTATION
     # ========================================================================
 
+    @profiled
     def compute_signals(self, df):
         """Compute all momentum state variables"""
         print("\n📊 Computing momentum signals...")
+        df = self._momentum_signals(df)
+        print("   ✅ All momentum signals computed")
+        return df
 
+    @memoized
+    def _momentum_signals(self, df):
+        """The signal columns of compute_signals (memoized; prints nothing)"""
         # === TREND STRENGTH ===
         df['return_6m'] = df['Close_mom'].pct_change(6)
         df['return_9m'] = df['Close_mom'].pct_change(9)
@@ -186,14 +353,13 @@ class MOMCASHStrategy:
 
         # 24-month cumulative return (multi-year bubble detection)
         df['return_24m'] = df['Close_mom'].pct_change(24)
-
-        print("   ✅ All momentum signals computed")
         return df
 
     # ========================================================================
     # CONTINUOUS RISK SCORE ENGINE (the core innovation)
     # ========================================================================
 
+    @profiled
     def calculate_risk_score(self, df):
         """
         Calculate continuous risk score for each month.
@@ -206,205 +372,7 @@ class MOMCASHStrategy:
         4. Below-MA during elevated risk → HOLD cash, don't reload
         """
         print("\n🔧 Computing continuous risk scores with persistence...")
-
-         # Initialize score components for transparency
-        df['score_extension'] = 0.0      # 6M bubble (max 25) — RARE
-        df['score_3m_heat'] = 0.0        # 3M extreme heat (max 20) — RARE
-        df['score_dist_ma'] = 0.0        # Far above MA (max 20) — RARE
-        df['score_zscore'] = 0.0         # Z-score extreme (max 15) — RARE
-        df['score_volatility'] = 0.0     # Vol spike (max 10)
-        df['score_deceleration'] = 0.0   # Deceleration (max 5)
-        df['score_dd_danger'] = 0.0      # Drawdown danger / crash onset (max 80) — KEY
-        df['score_bubble_24m'] = 0.0     # Multi-year bubble (max 25) — RARE
-
-        # === RISK SCORE PERSISTENCE PARAMETERS ===
-        MAX_DECAY_PER_MONTH = 25.0   # Fast decay when slope is positive (redeploy quickly)
-
-        # We'll compute raw score first, then apply persistence
-        raw_scores = np.zeros(len(df))
-
-        for i in range(len(df)):
-            row = df.iloc[i]
-
-            if pd.isna(row['return_6m']):
-                continue
-
-            ret_3m = row['return_3m'] if not pd.isna(row['return_3m']) else 0
-            ret_6m = row['return_6m'] if not pd.isna(row['return_6m']) else 0
-            dd = row['drawdown'] if not pd.isna(row['drawdown']) else 0
-            dist = row['dist_from_ma'] if not pd.isna(row['dist_from_ma']) else 0
-
-            # ============================================================
-            # BUBBLE SIGNALS — fire RARELY, only at genuine extremes
-            # Goal: Hold cash only during 2007-type bubble tops
-            # ============================================================
-
-            # 1. MOMENTUM EXTENSION — only above 85th percentile (max 25 pts)
-            pctile = row.get('return_6m_percentile', 0.5)
-            if not pd.isna(pctile) and pctile > 0.85:
-                score_ext = ((pctile - 0.85) / 0.15) * 25.0
-            else:
-                score_ext = 0.0
-            df.iat[i, df.columns.get_loc('score_extension')] = score_ext
-
-            # 2. SHORT-TERM EXTREME HEAT — only above 25% (max 20 pts)
-            if ret_3m > 0.35:
-                score_3m = 20.0
-            elif ret_3m > 0.25:
-                score_3m = 10.0
-            else:
-                score_3m = 0.0
-            df.iat[i, df.columns.get_loc('score_3m_heat')] = score_3m
-
-            # 3. DISTANCE FROM MA — only above 25% (max 20 pts)
-            if dist > 0.25:
-                score_dist = min(((dist - 0.25) / 0.25) * 20.0, 20.0)
-            else:
-                score_dist = 0.0
-            df.iat[i, df.columns.get_loc('score_dist_ma')] = score_dist
-
-            # 4. Z-SCORE — only above 1.5 (max 15 pts)
-            zscore = row['momentum_zscore'] if not pd.isna(row['momentum_zscore']) else 0
-            if zscore > 1.5:
-                score_z = min(((zscore - 1.5) / 1.0) * 15.0, 15.0)
-            else:
-                score_z = 0.0
-            df.iat[i, df.columns.get_loc('score_zscore')] = score_z
-
-            # 5. VOLATILITY SPIKE (max 10 pts) — keep as-is, it's useful
-            if row.get('vol_spike', False) and not pd.isna(row.get('vol_spike')):
-                score_vol = 10.0
-            else:
-                score_vol = 0.0
-            df.iat[i, df.columns.get_loc('score_volatility')] = score_vol
-
-            # 6. DECELERATION while extended (max 5 pts)
-            decel = row.get('momentum_decelerating', False)
-            if decel and ret_6m > 0.30:
-                score_decel = 5.0
-            else:
-                score_decel = 0.0
-            df.iat[i, df.columns.get_loc('score_deceleration')] = score_decel
-
-            # 6b. MULTI-YEAR BUBBLE (max 25 pts)
-            # "The bigger the run over 2-3 years, the bigger the crash."
-            # Only fires at extreme multi-year outperformance.
-            ret_24m = row['return_24m'] if not pd.isna(row.get('return_24m', float('nan'))) else 0
-            if ret_24m > 1.50:
-                score_bubble = 25.0   # 150%+ in 2 years = severe bubble
-            elif ret_24m > 1.00:
-                score_bubble = 15.0   # 100%+ in 2 years = bubble territory
-            else:
-                score_bubble = 0.0
-            df.iat[i, df.columns.get_loc('score_bubble_24m')] = score_bubble
-
-            # ============================================================
-            # 7. CRASH-ONSET / DRAWDOWN DANGER (max 80 pts) — KEY SIGNAL
-            # Must be STRONG enough to push raw score above frozen effective
-            # score. During crashes, bubble signals fade to 0 — dd_danger is
-            # the ONLY signal that fires. It must single-handedly drive the
-            # score high enough for 50-70% cash.
-            # ============================================================
-            prev_dd = df.iloc[i-1]['drawdown'] if i > 0 and not pd.isna(df.iloc[i-1].get('drawdown', float('nan'))) else 0
-            dd_deepening = dd < prev_dd - 0.01  # DD getting worse by >1%
-            
-            if dd < -0.25 and ret_3m < -0.10:
-                score_dd = 80.0    # Severe crash: max protection
-            elif dd < -0.20 and ret_3m < -0.10:
-                score_dd = 65.0    # Active crash: deep DD + falling fast
-            elif dd < -0.15 and dd_deepening:
-                score_dd = 50.0    # Crash accelerating
-            elif dd < -0.10 and dd_deepening and dist < 0:
-                score_dd = 35.0    # Crash starting: below MA + deepening
-            else:
-                score_dd = 0.0
-            df.iat[i, df.columns.get_loc('score_dd_danger')] = score_dd
-
-            # Raw instantaneous score
-            raw_scores[i] = (score_ext + score_3m + score_dist + score_z +
-                             score_vol + score_decel + score_bubble + score_dd)
-
-
-        # ============================================================
-        # APPLY RISK SCORE PERSISTENCE — CONDITION-BASED
-        # Risk rising → follow immediately (build cash fast)
-        # Momentum still falling (3M < 0) → FREEZE score (hold cash)
-        # Momentum turned positive → decay at 25/month (redeploy fast)
-        # This holds cash through the ENTIRE crash, deploys on recovery.
-        # ============================================================
-        df['risk_score_raw'] = np.clip(raw_scores, 0, 100)
-
-        effective_scores = np.zeros(len(df))
-        for i in range(len(df)):
-            raw = df.iloc[i]['risk_score_raw']
-            if i == 0:
-                effective_scores[i] = raw
-            else:
-                prev_effective = effective_scores[i - 1]
-                if raw >= prev_effective:
-                    # Risk rising → follow immediately (build cash fast)
-                    effective_scores[i] = raw
-                else:
-                    # Risk falling → only deploy cash when downward slope halts
-                    ret_3m = df.iloc[i]['return_3m'] if not pd.isna(df.iloc[i].get('return_3m', float('nan'))) else 0
-                    dd = df.iloc[i]['drawdown'] if not pd.isna(df.iloc[i].get('drawdown', float('nan'))) else 0
-                    
-                    if ret_3m < 0:
-                        # MOMENTUM STILL FALLING → FREEZE score completely
-                        # Don't deploy ANY cash while the slope is downward
-                        decay = 0.0
-                    elif dd < -0.15:
-                        # Slope turned positive, recovering from crash
-                        # → deploy moderately fast to capture recovery
-                        decay = 20.0
-                    else:
-                        # Slope positive AND near highs → full speed deployment
-                        decay = MAX_DECAY_PER_MONTH
-                    
-                    effective_scores[i] = max(raw, prev_effective - decay)
-                # Ensure still in valid range
-                effective_scores[i] = np.clip(effective_scores[i], 0, 100)
-
-        df['risk_score'] = effective_scores
-
-        # ============================================================
-        # MAP RISK SCORE → CASH ALLOCATION (CONVEX / POWER CURVE)
-        # Linear mapping gives too much cash at low scores.
-        # Convex: cash = (score/100)^2 × MAX_CASH_PCT
-        #   Score 10 → 0.7% cash (negligible)
-        #   Score 30 → 6.3% cash (minimal drag)
-        #   Score 50 → 17.5% cash (moderate)
-        #   Score 70 → 34.3% cash (defensive)
-        #   Score 90 → 56.7% cash (crash mode)
-        # This keeps cash near 0 in bull markets, ramps hard in crashes.
-        # ============================================================
-        df['w_cash'] = ((df['risk_score'] / 100.0) ** 2) * MAX_CASH_PCT
-        df['w_mom'] = 1.0 - df['w_cash']
-
-        # ============================================================
-        # 🚨 CRITICAL: LAG BY 1 MONTH (no lookahead bias)
-        # ============================================================
-        df['w_mom'] = df['w_mom'].shift(1)
-        df['w_cash'] = df['w_cash'].shift(1)
-        df['risk_score'] = df['risk_score'].shift(1)
-
-        # Fill first month with base (fully invested)
-        df['w_mom'] = df['w_mom'].fillna(BASE_MOMENTUM)
-        df['w_cash'] = df['w_cash'].fillna(BASE_CASH)
-        df['risk_score'] = df['risk_score'].fillna(0)
-
-        # Round to 5% for practical implementation
-        df['w_mom'] = (df['w_mom'] * 100 / 5.0).round() * 5.0 / 100
-        df['w_cash'] = 1.0 - df['w_mom']
-        df['w_mom'] = df['w_mom'].clip(0.5, 1.0).round(4)
-        df['w_cash'] = df['w_cash'].clip(0.0, 0.5).round(4)
-
-        # Create descriptive allocation tier labels for reporting
-        df['allocation_tier'] = pd.cut(
-            df['risk_score'],
-            bins=[-0.01, 10, 30, 60, 100],
-            labels=['fully_invested', 'low_risk', 'elevated_risk', 'high_risk']
-        ).astype(str)
+        df = self._risk_score_frame(df)
 
         # ============================================================
         # PRINT SUMMARY
@@ -423,7 +391,7 @@ class MOMCASHStrategy:
             'elevated_risk':  '~75% Mom (score 30-60)',
             'high_risk':      '~50% Mom (score 60-100)',
         }
-        for tier in ['fully_invested', 'low_risk', 'elevated_risk', 'high_risk']:
+        for tier in ALLOCATION_TIERS:
             count = tier_counts.get(tier, 0)
             desc = zone_defs.get(tier, '')
             print(f"   {desc:30s}: {count:3d} months ({count/len(df)*100:.1f}%)")
@@ -446,10 +414,83 @@ class MOMCASHStrategy:
 
         return df
 
+    @memoized(depends=(score_components, persist_risk_score, risk_score_to_allocation,
+                       _allocation_weights, _value,
+                       SCORE_COMPONENTS, MAX_DECAY_PER_MONTH, MAX_CASH_PCT, BASE_MOMENTUM,
+                       ALLOCATION_TIERS, ALLOCATION_TIER_BINS))
+    def _risk_score_frame(self, df):
+        """Score, weight and tier columns of calculate_risk_score (memoized; prints nothing)"""
+        # We'll compute raw score first, then apply persistence
+        raw_scores = np.zeros(len(df))
+        components = np.zeros((len(df), len(SCORE_COMPONENTS)))
+
+        columns = ['return_3m', 'return_6m', 'drawdown', 'dist_from_ma', 'return_6m_percentile',
+                   'momentum_zscore', 'vol_spike', 'momentum_decelerating', 'return_24m']
+        values = {col: df[col].to_numpy() for col in columns}
+
+        for i in range(len(df)):
+            scores = score_components(
+                values['return_3m'][i], values['return_6m'][i], values['drawdown'][i],
+                values['drawdown'][i - 1] if i > 0 else np.nan, values['dist_from_ma'][i],
+                values['return_6m_percentile'][i], values['momentum_zscore'][i],
+                values['vol_spike'][i], values['momentum_decelerating'][i], values['return_24m'][i])
+            components[i] = [scores[name] for name in SCORE_COMPONENTS]
+            # Raw instantaneous score
+            raw_scores[i] = sum(scores.values())
+
+        for j, name in enumerate(SCORE_COMPONENTS):
+            df[name] = components[:, j]
+
+        # ============================================================
+        # APPLY RISK SCORE PERSISTENCE — CONDITION-BASED
+        # (see persist_risk_score)
+        # ============================================================
+        df['risk_score_raw'] = np.clip(raw_scores, 0, 100)
+
+        raw = df['risk_score_raw'].to_numpy()
+        effective_scores = np.zeros(len(df))
+        for i in range(len(df)):
+            effective_scores[i] = persist_risk_score(
+                raw[i], effective_scores[i - 1] if i > 0 else None,
+                values['return_3m'][i], values['drawdown'][i])
+
+        df['risk_score'] = effective_scores
+
+        # ============================================================
+        # 🚨 CRITICAL: LAG BY 1 MONTH (no lookahead bias)
+        # First month has no signal yet → score 0 (fully invested)
+        # ============================================================
+        df['risk_score'] = df['risk_score'].shift(1).fillna(0)
+
+        # ============================================================
+        # MAP RISK SCORE → CASH ALLOCATION (CONVEX / POWER CURVE)
+        # Linear mapping gives too much cash at low scores.
+        # Convex: cash = (score/100)^2 × MAX_CASH_PCT
+        #   Score 10 → 0.7% cash (negligible)
+        #   Score 30 → 6.3% cash (minimal drag)
+        #   Score 50 → 17.5% cash (moderate)
+        #   Score 70 → 34.3% cash (defensive)
+        #   Score 90 → 56.7% cash (crash mode)
+        # This keeps cash near 0 in bull markets, ramps hard in crashes.
+        # ============================================================
+        w_mom, w_cash = risk_score_to_allocation(df['risk_score'], self.max_cash_pct)
+        df['w_cash'] = w_cash
+        df['w_mom'] = w_mom
+
+        # Create descriptive allocation tier labels for reporting
+        df['allocation_tier'] = pd.cut(
+            df['risk_score'],
+            bins=ALLOCATION_TIER_BINS,
+            labels=ALLOCATION_TIERS
+        ).astype(str)
+
+        return df
+
     # ========================================================================
     # PORTFOLIO CALCULATION
     # ========================================================================
 
+    @profiled
     def calculate_portfolio_returns(self, df):
         """Calculate portfolio returns"""
         print("\n💰 Calculating portfolio returns...")
@@ -497,6 +538,7 @@ class MOMCASHStrategy:
     # SIP ANALYSIS
     # ========================================================================
 
+    @profiled
     def run_sip_on_portfolio(self, df, strategy_name, nav_col='Portfolio_NAV'):
         """Run SIP analysis on any NAV series"""
         print(f"\n🎯 Running SIP analysis for: {strategy_name}")
@@ -573,13 +615,15 @@ class MOMCASHStrategy:
     # MAIN EXECUTION
     # ========================================================================
 
-    def run_strategy(self):
+    def run_strategy(self, mom_df=None):
         """Run the complete MOMCASH v2 strategy pipeline"""
 
-        df = self.load_monthly_data()
+        df = self.load_monthly_data(mom_df)
         df = self.compute_signals(df)
         df = self.calculate_risk_score(df)
         df = self.calculate_portfolio_returns(df)
+        if self.compact:
+            df = compact_frame(df, MOMCASH_COMPACT)
 
         print("\n" + "=" * 80)
         print("STRATEGY COMPARISON")
@@ -667,11 +711,20 @@ class MOMCASHStrategy:
 
 def main():
     """Main execution function"""
+    parser = argparse.ArgumentParser(description="MOMCASH v2 strategy backtest")
+    parser.add_argument('--compact', action='store_true',
+                        help="categorical tier, float32 display columns, drop scratch columns")
+    parser.add_argument('--memory-report', action='store_true', help="bytes per portfolio column")
+    args = parser.parse_args()
+
     data_folder = Path(__file__).parent.parent.parent / "data"
-    strategy = MOMCASHStrategy(data_folder, monthly_sip=10000, cash_return='simulated')
+    strategy = MOMCASHStrategy(data_folder, monthly_sip=10000, cash_return='simulated',
+                               compact=args.compact)
 
     comparisons, portfolio_df, sip_df = strategy.run_strategy()
     strategy.display_results(comparisons)
+    if args.memory_report:
+        memory_report(portfolio_df, 'MOMCASH portfolio' + (' (compact)' if args.compact else ''))
 
     print("\n" + "=" * 80)
     print("✅ MOMCASH v2 STRATEGY COMPLETE")
@@ -680,4 +733,5 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
+    with profile_run("nifty500cash_strategy", Path(__file__).parent.parent / "output"):
+        main()